@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark of running a deep circuit with a cached execution plan.
+
+Compares applying the commands of a compiled program one at a time through
+:meth:`.Operation.apply`, as the engine used to do, with :meth:`.Engine.run`
+executing the cached execution plan of the program. The engine is reset
+between the runs. Small cutoffs are used, so that the per-command overhead
+is significant compared to the numerics.
+
+Usage::
+
+    python benchmarks/engine_execution_plan.py [--backend fock] [--gates 1000 5000] [--runs 10]
+"""
+import argparse
+import time
+
+import numpy as np
+
+import strawberryfields as sf
+from strawberryfields import ops
+
+
+def circuit(gates):
+    """Random rotations, displacements and beamsplitters on two modes"""
+    prog = sf.Program(2)
+    pars = np.random.uniform(0, 0.1, size=(gates, 2))
+    with prog.context as q:
+        for k, (x, y) in enumerate(pars):
+            if k % 3 == 0:
+                ops.Rgate(x) | q[k % 2]
+            elif k % 3 == 1:
+                ops.Dgate(x, y) | q[k % 2]
+            else:
+                ops.BSgate(x, y) | q
+    return prog
+
+
+def run(backend, gate_range, runs):
+    """Print the time per run of both methods."""
+    options = {"cutoff_dim": 3} if backend == "fock" else {}
+    print("{:>8} {:>12} {:>12} {:>10}".format("gates", "apply", "plan", "speedup"))
+
+    for gates in gate_range:
+        eng = sf.Engine(backend, **options)
+        prog = circuit(gates)
+        expected = eng.run(prog)
+        compiled = eng.run_progs[-1]
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            eng.reset()
+            for cmd in compiled.circuit:
+                cmd.op.apply(cmd.reg, eng.backend, hbar=eng.hbar)
+        apply = (time.perf_counter() - start) / runs
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            eng.reset()
+            state = eng.run(prog)
+        plan = (time.perf_counter() - start) / runs
+
+        assert state == expected
+        print("{:>8} {:>10.1f}ms {:>10.1f}ms {:>9.1f}x".format(gates, 1e3 * apply, 1e3 * plan, apply / plan))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", default="fock")
+    parser.add_argument("--gates", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    run(args.backend, args.gates, args.runs)
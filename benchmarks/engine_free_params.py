@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark of running a program with free parameters.
+
+Compares building and compiling a new program for each parameter value with
+compiling a program with free parameters once, and binding the values to it
+in :meth:`.Engine.run`. The circuit contains gates which are decomposed and
+merged by the compiler, so that the compilation is a significant part of a run.
+
+Usage::
+
+    python benchmarks/engine_free_params.py [--backend gaussian] [--modes 4 8] [--layers 4] [--points 200]
+"""
+import argparse
+import time
+
+import numpy as np
+
+import strawberryfields as sf
+from strawberryfields import ops
+
+
+def circuit(prog, layers, r, phi):
+    """Layers of squeezers, quadratic phase and controlled-X gates"""
+    with prog.context as q:
+        for _ in range(layers):
+            for k, m in enumerate(q):
+                ops.Sgate(r) | m
+                ops.Sgate(r / 2) | m
+                ops.Pgate(phi * k) | m
+            for k in range(0, len(q) - 1):
+                ops.CXgate(phi) | (q[k], q[k + 1])
+    return prog
+
+
+def run(backend, mode_range, layers, points):
+    """Print the time per point of rebuilding the program and of binding the parameters."""
+    values = np.random.uniform(0, 0.5, size=(points, 2))
+    options = {"cutoff_dim": 4} if backend == "fock" else {}
+    eng = sf.Engine(backend, **options)
+    print("{:>6} {:>12} {:>12} {:>10}".format("modes", "rebuild", "bind", "speedup"))
+
+    for modes in mode_range:
+        start = time.perf_counter()
+        expected = []
+        for r, phi in values:
+            state = eng.run(circuit(sf.Program(modes), layers, r, phi))
+            expected.append(state.mean_photon(0)[0])
+            eng.reset()
+        rebuild = (time.perf_counter() - start) / points
+
+        start = time.perf_counter()
+        prog = sf.Program(modes)
+        circuit(prog, layers, *prog.params("r", "phi"))
+        res = []
+        for r, phi in values:
+            state = eng.run(prog, args={"r": r, "phi": phi})
+            res.append(state.mean_photon(0)[0])
+            eng.reset()
+        bind = (time.perf_counter() - start) / points
+
+        assert np.allclose(res, expected)
+        print("{:>6} {:>10.2f}ms {:>10.2f}ms {:>9.1f}x".format(modes, 1e3 * rebuild, 1e3 * bind, rebuild / bind))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", default="gaussian")
+    parser.add_argument("--modes", type=int, nargs="+", default=[4, 8])
+    parser.add_argument("--layers", type=int, default=4)
+    parser.add_argument("--points", type=int, default=200)
+    args = parser.parse_args()
+
+    run(args.backend, args.modes, args.layers, args.points)
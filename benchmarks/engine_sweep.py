@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark of parameter sweeps with Engine.run_sweep.
+
+Compares running a program at each point of a parameter grid with a new
+engine per point, as a loop over :meth:`.Engine.run`, with
+:meth:`.Engine.run_sweep` using one or several worker processes.
+
+Usage::
+
+    python benchmarks/engine_sweep.py [--backend fock] [--points 2000] [--processes 1 4] [--chunksize 50]
+"""
+import argparse
+import time
+
+import numpy as np
+
+import strawberryfields as sf
+from strawberryfields import ops
+
+
+def circuit(r, phi):
+    """Squeezed states interfering on a chain of beamsplitters"""
+    prog = sf.Program(3)
+    with prog.context as q:
+        ops.Sgate(r) | q[0]
+        ops.Sgate(r) | q[1]
+        ops.BSgate(phi) | (q[0], q[1])
+        ops.BSgate(phi) | (q[1], q[2])
+    return prog
+
+
+def photons(state):
+    """Mean photon number of the last mode"""
+    return state.mean_photon(2)[0]
+
+
+def run(backend, points, process_range, chunksize):
+    """Print the time of the loop and of the sweeps."""
+    grid = [{"r": r, "phi": phi} for r, phi in np.random.uniform(0, 0.5, size=(points, 2))]
+    options = {"cutoff_dim": 6} if backend == "fock" else {}
+    print("{:>12} {:>10} {:>10}".format("method", "time", "speedup"))
+
+    start = time.perf_counter()
+    expected = [photons(sf.Engine(backend, **options).run(circuit(**p))) for p in grid]
+    loop = time.perf_counter() - start
+    print("{:>12} {:>9.3f}s".format("loop", loop))
+
+    eng = sf.Engine(backend, **options)
+    for processes in process_range:
+        start = time.perf_counter()
+        res = list(eng.run_sweep(circuit, grid, processes=processes, chunksize=chunksize, observable=photons))
+        total = time.perf_counter() - start
+        assert np.allclose(res, expected)
+        print("{:>12} {:>9.3f}s {:>9.1f}x".format("sweep, {}".format(processes), total, loop / total))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", default="fock")
+    parser.add_argument("--points", type=int, default=2000)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--chunksize", type=int, default=50)
+    args = parser.parse_args()
+
+    run(args.backend, args.points, args.processes, args.chunksize)
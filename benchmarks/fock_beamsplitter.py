@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark of the beamsplitter matrix construction in the Fock backend.
+
+Compares the contraction of the :math:`D^5` prefactor tensor in
+:func:`~.fockbackend.ops.beamsplitter` with the recursive construction
+:func:`~.fockbackend.ops.beamsplitter_recursive`, for a range of cutoffs.
+The prefactors are loaded before timing, and the ``lru_cache`` of both
+functions is bypassed.
+
+Usage::
+
+    python benchmarks/fock_beamsplitter.py [--cutoffs 5 10 20 30 40] [--repeat 3]
+"""
+import argparse
+import timeit
+
+import numpy as np
+
+from strawberryfields.backends import shared_ops as so
+from strawberryfields.backends.fockbackend import ops
+
+
+METHODS = {
+    "prefactors": ops.beamsplitter.__wrapped__,
+    "recursive": ops.beamsplitter_recursive.__wrapped__,
+}
+
+
+def run(cutoffs, repeat):
+    """Print the best construction time for each method, and the largest deviation between them."""
+    t, r, phi = np.cos(0.4), np.sin(0.4), 0.1
+    print("{:>6} ".format("cutoff") + "".join("{:>12}".format(k) for k in METHODS) + "{:>12}".format("max diff"))
+
+    for D in cutoffs:
+        so.cached_bs_factors(D)
+        times = [min(timeit.repeat(lambda: fn(t, r, phi, D), number=1, repeat=repeat)) for fn in METHODS.values()]
+        diff = np.max(np.abs(METHODS["prefactors"](t, r, phi, D) - METHODS["recursive"](t, r, phi, D)))
+        print("{:>6} ".format(D) + "".join("{:>11.4f}s".format(i) for i in times) + "{:>12.2e}".format(diff))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cutoffs", type=int, nargs="+", default=[5, 10, 15, 20, 25, 30, 35, 40])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    run(args.cutoffs, args.repeat)
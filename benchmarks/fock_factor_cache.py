@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark of beamsplitter factor loading in concurrent worker processes.
+
+Starts a number of worker processes which each load the beamsplitter
+prefactors for a given cutoff, either from the shipped sparse ``.npz`` data
+files (:func:`~.shared_ops.load_bs_factors`) or from the memory-mapped
+``.npy`` cache (:func:`~.shared_ops.cached_bs_factors`), and reports the load
+time and the private (unshared) memory of each worker.
+
+Usage::
+
+    python benchmarks/fock_factor_cache.py [--cutoff 20] [--workers 4] [--cache-dir DIR]
+
+The cache directory defaults to a temporary directory.
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from strawberryfields.backends import shared_ops as so
+
+
+LOADERS = {
+    "npz": so.load_bs_factors,
+    "mmap": so.cached_bs_factors,
+}
+
+
+def private_memory():
+    """Private memory of the current process in MiB, from /proc/self/smaps_rollup."""
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+    except OSError:  # pragma: no cover
+        return float("nan")
+    kb = sum(int(fields[k].split()[0]) for k in ("Private_Clean", "Private_Dirty"))
+    return kb / 1024
+
+
+def worker(loader, cutoff, queue):
+    """Load the factors, touch every page and report the time and memory used."""
+    base = private_memory()
+    start = time.perf_counter()
+    prefac = LOADERS[loader](cutoff)
+    np.sum(np.abs(prefac[:cutoff, :cutoff, :cutoff, :cutoff, :cutoff]))
+    queue.put((time.perf_counter() - start, private_memory() - base))
+
+
+def run(loader, cutoff, workers):
+    """Print the slowest load time and the mean private memory over all workers."""
+    queue = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=worker, args=(loader, cutoff, queue)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    results = [queue.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    times, mem = zip(*results)
+    print("{:>6} {:>8} {:>11.4f}s {:>10.1f}MiB".format(loader, workers, max(times), np.mean(mem)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cutoff", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--cache-dir", default=None)
+    args = parser.parse_args()
+
+    # the spawned workers inherit the environment
+    os.environ[so.FACTOR_CACHE_ENV] = args.cache_dir or tempfile.mkdtemp()
+
+    # populate the cache once, outside of the timed workers
+    so.cached_bs_factors(args.cutoff)
+
+    multiprocessing.set_start_method("spawn")
+    print("cutoff {}, factor cache in {}".format(args.cutoff, so.factor_cache_dir()))
+    print("{:>6} {:>8} {:>12} {:>13}".format("loader", "workers", "load time", "private mem"))
+    for name in LOADERS:
+        run(name, args.cutoff, args.workers)
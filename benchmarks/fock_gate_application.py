@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark of the Fock backend gate application engines.
+
+Compares the ``'blas'``, ``'einsum'`` and ``'gemm'`` implementations of
+:func:`~.fockbackend.ops.apply_gate_BLAS` and friends, applying a single-mode
+and a two-mode gate to pure and mixed states of increasing size. The
+beamsplitter is also applied block by block with
+:func:`~.fockbackend.ops.apply_gate_blocks`.
+
+Usage::
+
+    python benchmarks/fock_gate_application.py [--cutoff 10] [--repeat 3]
+"""
+import argparse
+import timeit
+
+import numpy as np
+
+from strawberryfields.backends.fockbackend import ops
+
+
+ENGINES = {
+    "blas": ops.apply_gate_BLAS,
+    "einsum": ops.apply_gate_einsum,
+    "gemm": ops.apply_gate_GEMM,
+}
+
+
+def run(cutoff, repeat, mode_range, pure):
+    """Print the best time per gate application for each engine."""
+    label = "pure" if pure else "mixed"
+    print("\n{} states, cutoff {}".format(label, cutoff))
+    print("{:>6} {:>6} ".format("modes", "gate") + "".join("{:>12}".format(k) for k in ENGINES) + "{:>12}".format("blocks"))
+
+    single = ops.displacement(0.3, cutoff)
+    two = ops.beamsplitter(np.cos(0.4), np.sin(0.4), 0.1, cutoff)
+    blocks = ops.beamsplitter_blocks(np.cos(0.4), np.sin(0.4), 0.1, cutoff)
+
+    for n in mode_range:
+        if pure:
+            state = np.random.random([cutoff]*n) + 0j
+        else:
+            state = np.random.random([cutoff]*(2*n)) + 0j
+
+        for name, mat, modes in (("1-mode", single, [n//2]), ("2-mode", two, [0, n-1])):
+            times = []
+            for fn in ENGINES.values():
+                t = timeit.repeat(lambda: fn(mat, state, pure, modes, n, cutoff), number=1, repeat=repeat)
+                times.append(min(t))
+            row = "{:>6} {:>6} ".format(n, name) + "".join("{:>11.4f}s".format(t) for t in times)
+
+            if name == "2-mode":
+                t = timeit.repeat(lambda: ops.apply_gate_blocks(blocks, state, pure, modes, n, cutoff), number=1, repeat=repeat)
+                row += "{:>11.4f}s".format(min(t))
+            print(row)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cutoff", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    run(args.cutoff, args.repeat, range(2, 7), pure=True)
+    run(args.cutoff, args.repeat, range(2, 4), pure=False)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark of homodyne measurements in the Fock backend.
+
+Measures the time and the peak memory allocated by a single homodyne
+measurement, and by drawing many shots at once from the same probability
+density, as a function of the cutoff dimension.
+
+Usage::
+
+    python benchmarks/fock_homodyne.py [--modes 2] [--cutoffs 10 20 40] [--shots 10000]
+"""
+import argparse
+import time
+import tracemalloc
+
+from strawberryfields.backends.fockbackend import FockBackend
+
+
+def measure(modes, cutoff, **kwargs):
+    """Time and peak memory of a homodyne measurement of a squeezed coherent state."""
+    backend = FockBackend()
+    backend.begin_circuit(modes, cutoff_dim=cutoff)
+    backend.prepare_displaced_squeezed_state(0.5, 0.3, 0, 0)
+    backend.beamsplitter(0.8, 0.6, 0, 1)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    backend.measure_homodyne(0.2, 0, **kwargs)
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return total, peak
+
+
+def run(modes, cutoffs, shots):
+    """Print the time and peak memory of a single measurement, and of many shots."""
+    print("{:>7} {:>12} {:>12} {:>16}".format("cutoff", "single", "peak", str(shots) + " shots"))
+
+    for cutoff in cutoffs:
+        single, peak = measure(modes, cutoff)
+        many, _ = measure(modes, cutoff, shots=shots)
+        print("{:>7} {:>11.4f}s {:>10.1f}MB {:>15.4f}s".format(cutoff, single, peak / 1e6, many))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", type=int, default=2)
+    parser.add_argument("--cutoffs", type=int, nargs="+", default=[10, 20, 40])
+    parser.add_argument("--shots", type=int, default=10000)
+    args = parser.parse_args()
+
+    run(args.modes, args.cutoffs, args.shots)
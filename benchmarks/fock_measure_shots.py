@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark of Fock measurements with several shots in the Fock backend.
+
+Compares running a program once per shot with drawing all the shots of the
+final state at once by passing ``shots`` to :meth:`.Engine.run`.
+
+Usage::
+
+    python benchmarks/fock_measure_shots.py [--modes 3] [--cutoff 8] [--shots 100 1000]
+"""
+import argparse
+import time
+
+import strawberryfields as sf
+from strawberryfields import ops
+
+
+def program(modes):
+    """Squeezed states followed by a chain of beamsplitters"""
+    prog = sf.Program(modes)
+    with prog.context as q:
+        for k in range(modes):
+            ops.Sgate(0.4) | q[k]
+        for k in range(modes - 1):
+            ops.BSgate() | (q[k], q[k + 1])
+        ops.MeasureFock() | q
+    return prog
+
+
+def run(modes, cutoff, shot_range):
+    """Print the time of both approaches for each number of shots."""
+    prog = program(modes)
+    eng = sf.Engine("fock", cutoff_dim=cutoff)
+    print("{:>8} {:>12} {:>12} {:>10}".format("shots", "loop", "vectorized", "speedup"))
+
+    for shots in shot_range:
+        start = time.perf_counter()
+        for _ in range(shots):
+            eng.run(prog)
+            eng.reset()
+        loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        eng.run(prog, shots=shots)
+        eng.reset()
+        vectorized = time.perf_counter() - start
+        print("{:>8} {:>11.3f}s {:>11.4f}s {:>9.0f}x".format(shots, loop, vectorized, loop / vectorized))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", type=int, default=3)
+    parser.add_argument("--cutoff", type=int, default=8)
+    parser.add_argument("--shots", type=int, nargs="+", default=[100, 1000])
+    args = parser.parse_args()
+
+    run(args.modes, args.cutoff, args.shots)
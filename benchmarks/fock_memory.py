@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark of the Fock backend memory usage.
+
+Runs a layered circuit of single-mode and two-mode gates on a pure state on the Fock simulator
+:class:`~.fockbackend.circuit.Circuit`, and reports the peak resident set size
+of the process, the peak scratch memory allocated by the gates on top of the
+state (traced by :mod:`tracemalloc`), and the number of minor page faults,
+which measures the allocator churn. Since the circuit alternates between two
+preallocated state buffers, gates should not allocate any state-sized arrays.
+
+Each configuration is run in a fresh subprocess, so that the peak RSS values
+are not polluted by previous runs.
+
+Usage::
+
+    python benchmarks/fock_memory.py [--modes 6] [--cutoff 10] [--layers 1 5 20]
+"""
+import argparse
+import resource
+import subprocess
+import sys
+import tracemalloc
+
+import numpy as np
+
+from strawberryfields.backends.fockbackend.circuit import Circuit
+
+
+def layer(c, modes):
+    """Apply a single layer of gates to the circuit."""
+    for i in range(modes):
+        c.displacement(0.1, i)
+        c.squeeze(0.05, 0.2, i)
+    for i in range(modes - 1):
+        c.beamsplitter(np.cos(0.3), np.sin(0.3), 0., i, i+1)
+
+
+def circuit(modes, cutoff, layers, mode):
+    """Run the benchmark circuit.
+
+    The first layer is used as a warm-up, so that the gate matrix caches are
+    filled before the memory is measured.
+
+    Returns:
+        tuple[float, int]: the traced peak memory above the warmed-up state in MB,
+        and the number of minor page faults incurred by the measured layers
+    """
+    c = Circuit(modes, cutoff, pure=True, mode=mode)
+    layer(c, modes)
+
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    faults = resource.getrusage(resource.RUSAGE_SELF).ru_minflt
+
+    for _ in range(layers):
+        layer(c, modes)
+
+    faults = resource.getrusage(resource.RUSAGE_SELF).ru_minflt - faults
+    peak = tracemalloc.get_traced_memory()[1] - start
+    tracemalloc.stop()
+    return peak / 1024**2, faults
+
+
+def peak_rss_mb():
+    """Peak resident set size of the current process in MB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", type=int, default=6)
+    parser.add_argument("--cutoff", type=int, default=10)
+    parser.add_argument("--mode", default="blas")
+    parser.add_argument("--layers", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single is not None:
+        traced, faults = circuit(args.modes, args.cutoff, args.single, args.mode)
+        print("{:>8} {:>16.2f} {:>14} {:>14.1f}".format(args.single, traced, faults, peak_rss_mb()))
+        sys.exit(0)
+
+    state_mb = 16 * args.cutoff**args.modes / 1024**2
+    print("{} modes, cutoff {}, '{}' mode: state size {:.1f} MB".format(args.modes, args.cutoff, args.mode, state_mb))
+    print("{:>8} {:>16} {:>14} {:>14}".format("layers", "gate scratch/MB", "page faults", "peak RSS/MB"))
+    for layers in args.layers:
+        subprocess.run([sys.executable, __file__, "--modes", str(args.modes), "--cutoff", str(args.cutoff),
+                        "--mode", args.mode, "--single", str(layers)], check=True)
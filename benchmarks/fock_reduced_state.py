@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark of reduced states of pure states in the Fock backend.
+
+Measures the time and the peak memory allocated by :meth:`.FockBackend.state`
+when requesting the state of a single mode of a pure state, as a function of the
+number of modes, and compares the peak memory with the size of the density
+matrix of all modes.
+
+Usage::
+
+    python benchmarks/fock_reduced_state.py [--modes 4 6 8] [--cutoff 8]
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from strawberryfields.backends.fockbackend import FockBackend
+
+
+def run(mode_range, cutoff):
+    """Print the time and peak memory for each number of modes."""
+    print("{:>6} {:>12} {:>12} {:>16}".format("modes", "time", "peak", "full dm"))
+
+    for modes in mode_range:
+        backend = FockBackend()
+        backend.begin_circuit(modes, cutoff_dim=cutoff)
+        for k in range(modes - 1):
+            backend.displacement(0.3, k)
+            backend.beamsplitter(0.8, 0.6, k, k + 1)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        backend.state(modes=[0])
+        total = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        dm_size = np.dtype(np.complex128).itemsize * cutoff ** (2 * modes)
+        print("{:>6} {:>11.4f}s {:>10.1f}MB {:>14.1f}MB".format(modes, total, peak / 1e6, dm_size / 1e6))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", type=int, nargs="+", default=[4, 6, 8])
+    parser.add_argument("--cutoff", type=int, default=8)
+    args = parser.parse_args()
+
+    run(args.modes, args.cutoff)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark of derived quantities of pure Fock states.
+
+Measures the time and the peak memory allocated by the first and the repeated
+calls of :meth:`~.BaseFockState.all_fock_probs`, :meth:`~.BaseFockState.reduced_dm`
+and :meth:`~.BaseFockState.mean_photon` on a pure state, and compares the peak
+memory with the size of the density matrix of all modes.
+
+Usage::
+
+    python benchmarks/fock_state_queries.py [--modes 12] [--cutoff 3]
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from strawberryfields.backends.fockbackend import FockBackend
+
+
+def timed(fn):
+    """Returns the time and peak memory of calling fn."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return total, peak
+
+
+def run(modes, cutoff):
+    """Print the time and peak memory of each query."""
+    backend = FockBackend()
+    backend.begin_circuit(modes, cutoff_dim=cutoff)
+    for k in range(modes - 1):
+        backend.displacement(0.3, k)
+        backend.beamsplitter(0.8, 0.6, k, k + 1)
+    state = backend.state()
+
+    queries = [
+        ("all_fock_probs", state.all_fock_probs),
+        ("reduced_dm", lambda: state.reduced_dm([0, 1])),
+        ("mean_photon", lambda: [state.mean_photon(k) for k in range(modes)]),
+    ]
+
+    dm_size = np.dtype(np.complex128).itemsize * cutoff ** (2 * modes)
+    print("full density matrix: {:.1f}MB".format(dm_size / 1e6))
+    print("{:>16} {:>12} {:>12} {:>12}".format("query", "first", "peak", "repeated"))
+    for name, fn in queries:
+        first, peak = timed(fn)
+        repeated, _ = timed(fn)
+        print("{:>16} {:>11.4f}s {:>10.1f}MB {:>11.6f}s".format(name, first, peak / 1e6, repeated))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", type=int, default=12)
+    parser.add_argument("--cutoff", type=int, default=3)
+    args = parser.parse_args()
+
+    run(args.modes, args.cutoff)
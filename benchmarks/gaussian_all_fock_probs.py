@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark of the full Fock distribution of Gaussian states.
+
+Compares :func:`~.gaussianbackend.ops.all_fock_probs`, which computes the
+probabilities of all photon number patterns below the cutoff in one pass,
+with a loop calling :func:`~.gaussianbackend.ops.fock_prob` for every pattern.
+The loop is only run up to ``--max-loop-patterns`` patterns.
+
+Usage::
+
+    python benchmarks/gaussian_all_fock_probs.py [--modes 1 2 3 4] [--cutoff 6]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from strawberryfields.backends.gaussianbackend import ops
+from strawberryfields.backends.gaussianbackend.gaussiancircuit import GaussianModes
+
+
+def random_state(modes):
+    """Random mixed Gaussian state with squeezing and displacement on every mode"""
+    circuit = GaussianModes(modes, hbar=2)
+    for k in range(modes):
+        circuit.init_thermal(0.1*np.random.random(), k)
+        circuit.squeeze(0.4, 2*np.pi*np.random.random(), k)
+        circuit.displace(0.1*(np.random.random() + 1j*np.random.random()), k)
+    for k in range(modes-1):
+        circuit.beamsplitter(np.random.random(), 2*np.pi*np.random.random(), k, k+1)
+    return circuit
+
+
+def timed(fn):
+    """Time and result of a single call"""
+    start = time.perf_counter()
+    res = fn()
+    return time.perf_counter() - start, res
+
+
+def run(mode_range, cutoff, max_loop_patterns):
+    """Print the time of each method, and the maximum difference of the probabilities."""
+    print("{:>6} {:>12} {:>12} {:>12}".format("modes", "loop", "all", "max diff"))
+
+    for n in mode_range:
+        circuit = random_state(n)
+        t_all, p_all = timed(lambda: ops.all_fock_probs(circuit, cutoff))
+        if cutoff**n > max_loop_patterns:
+            print("{:>6} {:>12} {:>11.4f}s {:>12}".format(n, "-", t_all, "-"))
+            continue
+
+        def loop():
+            return np.array([ops.fock_prob(circuit, np.uint8(ocp)) for ocp in np.ndindex(*[cutoff]*n)])
+
+        t_loop, p_loop = timed(loop)
+        diff = np.max(np.abs(p_all.ravel() - p_loop))
+        print("{:>6} {:>11.4f}s {:>11.4f}s {:>12.2e}".format(n, t_loop, t_all, diff))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", type=int, nargs="+", default=[1, 2, 3, 4])
+    parser.add_argument("--cutoff", type=int, default=6)
+    parser.add_argument("--max-loop-patterns", type=int, default=300)
+    args = parser.parse_args()
+
+    run(args.modes, args.cutoff, args.max_loop_patterns)
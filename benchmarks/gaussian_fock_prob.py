@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark of Fock probabilities in the Gaussian backend.
+
+Compares the hafnian-based :func:`~.gaussianbackend.ops.fock_prob` with the
+summation over all partitions of the photons into singles and pairs, for a
+random squeezed and displaced state. Photons are placed either one per mode
+(``--pattern spread``) or all in a single mode (``--pattern bunched``). The
+partition method is only run up to ``--max-partition-photons`` photons, since
+both its time and the memory of its memoized partitions grow factorially.
+
+Usage::
+
+    python benchmarks/gaussian_fock_prob.py [--modes 16] [--photons 2 4 6 8 10 12 14 16] [--pattern spread]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from strawberryfields.backends.gaussianbackend import ops
+from strawberryfields.backends.gaussianbackend.gaussiancircuit import GaussianModes
+
+
+def random_state(modes):
+    """Random pure Gaussian state with squeezing and displacement on every mode"""
+    circuit = GaussianModes(modes, hbar=2)
+    for k in range(modes):
+        circuit.squeeze(0.5, 2*np.pi*np.random.random(), k)
+        circuit.displace(0.1*(np.random.random() + 1j*np.random.random()), k)
+    for _ in range(modes):
+        for k in range(modes-1):
+            circuit.beamsplitter(np.random.random(), 2*np.pi*np.random.random(), k, k+1)
+    return circuit
+
+
+def timed(fn):
+    """Time and result of a single call"""
+    start = time.perf_counter()
+    res = fn()
+    return time.perf_counter() - start, res
+
+
+def run(modes, photons, pattern, max_partition_photons):
+    """Print the time of each method, and the relative difference of the probabilities."""
+    circuit = random_state(modes)
+    print("{:>8} {:>12} {:>12} {:>12}".format("photons", "partitions", "hafnian", "rel diff"))
+
+    for n in photons:
+        ocp = np.zeros(modes, dtype=np.uint8)
+        if pattern == "spread":
+            ocp[:n] = 1
+        else:
+            ocp[0] = n
+
+        t_haf, p_haf = timed(lambda: ops.fock_prob(circuit, ocp))
+        if n > max_partition_photons:
+            print("{:>8} {:>12} {:>11.4f}s {:>12}".format(n, "-", t_haf, "-"))
+            continue
+
+        t_part, p_part = timed(lambda: ops.fock_prob(circuit, ocp, method="partitions"))
+        diff = abs(p_haf - p_part) / abs(p_part)
+        print("{:>8} {:>11.4f}s {:>11.4f}s {:>12.2e}".format(n, t_part, t_haf, diff))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", type=int, default=16)
+    parser.add_argument("--photons", type=int, nargs="+", default=[2, 4, 6, 8, 10, 12, 14, 16])
+    parser.add_argument("--pattern", choices=["spread", "bunched"], default="spread")
+    parser.add_argument("--max-partition-photons", type=int, default=6)
+    args = parser.parse_args()
+
+    run(args.modes, args.photons, args.pattern, args.max_partition_photons)
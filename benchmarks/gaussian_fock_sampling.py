@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark of photon number sampling in the Gaussian backend.
+
+Measures the time of :func:`~.gaussianbackend.ops.fock_samples` for a
+Gaussian boson sampling state (squeezed inputs and a random interferometer)
+as a function of the number of shots. Since the marginal probabilities are
+computed once and shared by all the shots, the time per shot decreases with
+the number of shots.
+
+Usage::
+
+    python benchmarks/gaussian_fock_sampling.py [--modes 4] [--shots 100 10000 1000000] [--cutoff 6]
+"""
+import argparse
+import time
+
+from scipy.stats import unitary_group
+
+from strawberryfields.backends.gaussianbackend import ops
+from strawberryfields.backends.gaussianbackend.gaussiancircuit import GaussianModes
+
+
+def gbs_state(modes, r):
+    """Squeezed vacuum inputs followed by a random interferometer"""
+    circuit = GaussianModes(modes, hbar=2)
+    for k in range(modes):
+        circuit.squeeze(r, 0, k)
+    circuit.apply_u(unitary_group.rvs(modes))
+    return circuit
+
+
+def run(modes, shot_range, cutoff, r):
+    """Print the total time and the time per shot for each number of shots."""
+    circuit = gbs_state(modes, r)
+    print("{:>8} {:>12} {:>14}".format("shots", "total", "per shot"))
+
+    for shots in shot_range:
+        start = time.perf_counter()
+        ops.fock_samples(circuit, range(modes), shots, cutoff)
+        total = time.perf_counter() - start
+        print("{:>8} {:>11.3f}s {:>12.2f}us".format(shots, total, total / shots * 1e6))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", type=int, default=4)
+    parser.add_argument("--shots", type=int, nargs="+", default=[100, 10000, 1000000])
+    parser.add_argument("--cutoff", type=int, default=6)
+    parser.add_argument("--squeezing", type=float, default=0.5)
+    args = parser.parse_args()
+
+    run(args.modes, args.shots, args.cutoff, args.squeezing)
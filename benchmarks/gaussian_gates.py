@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark of the gate application in the Gaussian backend.
+
+Measures the time per gate of :meth:`~.GaussianModes.squeeze`,
+:meth:`~.GaussianModes.phase_shift` and :meth:`~.GaussianModes.beamsplitter`
+as a function of the number of modes, applying each gate to random modes.
+
+Usage::
+
+    python benchmarks/gaussian_gates.py [--modes 10 50 100 200 400] [--gates 1000]
+"""
+import argparse
+import timeit
+
+import numpy as np
+
+from strawberryfields.backends.gaussianbackend.gaussiancircuit import GaussianModes
+
+
+def run(mode_range, gates):
+    """Print the mean time per gate in microseconds for each gate and number of modes."""
+    print("{:>6} {:>12} {:>12} {:>12}".format("modes", "squeeze", "phase", "beamsplitter"))
+
+    for n in mode_range:
+        circuit = GaussianModes(n, hbar=2)
+        modes = np.random.randint(n, size=(gates, 2))
+        modes[:, 1] = (modes[:, 0] + np.random.randint(1, n, size=gates)) % n
+
+        def squeeze():
+            for k, _ in modes:
+                circuit.squeeze(0.1, 0.3, k)
+
+        def phase():
+            for k, _ in modes:
+                circuit.phase_shift(0.3, k)
+
+        def beamsplitter():
+            for k, l in modes:
+                circuit.beamsplitter(0.4, 0.2, k, l)
+
+        times = [min(timeit.repeat(fn, number=1, repeat=3)) / gates * 1e6 for fn in (squeeze, phase, beamsplitter)]
+        print("{:>6} ".format(n) + "".join("{:>10.1f}us".format(t) for t in times))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", type=int, nargs="+", default=[10, 50, 100, 200, 400])
+    parser.add_argument("--gates", type=int, default=1000)
+    args = parser.parse_args()
+
+    run(args.modes, args.gates)
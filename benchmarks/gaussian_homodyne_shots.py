@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark of homodyne sampling with several shots in the Gaussian backend.
+
+Compares preparing the state and measuring it once per shot with drawing all
+the shots at once using the ``shots`` keyword argument of
+:meth:`~.GaussianBackend.measure_homodyne`.
+
+Usage::
+
+    python benchmarks/gaussian_homodyne_shots.py [--modes 8] [--shots 1000 10000]
+"""
+import argparse
+import time
+
+from scipy.stats import unitary_group
+
+from strawberryfields.backends.gaussianbackend import GaussianBackend
+
+
+def prepare(backend, modes, U, r):
+    """Squeezed vacuum inputs followed by an interferometer"""
+    backend.reset()
+    for k in range(modes):
+        backend.squeeze(r, k)
+    backend.circuit.apply_u(U)
+
+
+def run(modes, shot_range, r):
+    """Print the time of both approaches for each number of shots."""
+    backend = GaussianBackend()
+    backend.begin_circuit(modes)
+    U = unitary_group.rvs(modes)
+    print("{:>8} {:>12} {:>12} {:>10}".format("shots", "loop", "vectorized", "speedup"))
+
+    for shots in shot_range:
+        start = time.perf_counter()
+        for _ in range(shots):
+            prepare(backend, modes, U, r)
+            backend.measure_homodyne(0, 0)
+        loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        prepare(backend, modes, U, r)
+        backend.measure_homodyne(0, 0, shots=shots)
+        vectorized = time.perf_counter() - start
+        print("{:>8} {:>11.3f}s {:>11.4f}s {:>9.0f}x".format(shots, loop, vectorized, loop / vectorized))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", type=int, default=8)
+    parser.add_argument("--shots", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--squeezing", type=float, default=0.5)
+    args = parser.parse_args()
+
+    run(args.modes, args.shots, args.squeezing)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark of repeated state queries in the Gaussian backend.
+
+Measures the time of :meth:`~.GaussianBackend.state` followed by a vacuum
+fidelity, as a function of the number of modes. The first query after a gate
+computes the covariance matrices, the Q matrix and its inverse; the following
+queries reuse them from the cache of :class:`~.GaussianModes`.
+
+Usage::
+
+    python benchmarks/gaussian_state_queries.py [--modes 10 50 100 200] [--queries 20]
+"""
+import argparse
+import time
+
+from strawberryfields.backends.gaussianbackend import GaussianBackend
+
+
+def run(mode_range, queries):
+    """Print the time of the first query after a gate and the mean time of the following queries."""
+    print("{:>6} {:>12} {:>12}".format("modes", "first", "repeated"))
+
+    for n in mode_range:
+        backend = GaussianBackend()
+        backend.begin_circuit(n)
+        for k in range(n):
+            backend.squeeze(0.1, k)
+        backend.beamsplitter(0.6, 0.8, 0, 1)
+
+        start = time.perf_counter()
+        backend.state().fidelity_vacuum()
+        first = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(queries):
+            backend.state().fidelity_vacuum()
+        repeated = (time.perf_counter() - start) / queries
+
+        print("{:>6} {:>10.2f}ms {:>10.2f}ms".format(n, first*1e3, repeated*1e3))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    run(args.modes, args.queries)
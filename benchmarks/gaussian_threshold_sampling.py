@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark of threshold detector sampling in the Gaussian backend.
+
+Measures the time of :func:`~.gaussianbackend.ops.threshold_samples` for a
+Gaussian boson sampling state (squeezed inputs and a random interferometer)
+as a function of the number of modes, together with the mean number of clicks.
+No Fock space cutoff is involved; the cost grows with the number of clicks.
+
+Usage::
+
+    python benchmarks/gaussian_threshold_sampling.py [--modes 4 8 12 16 20] [--shots 1000]
+"""
+import argparse
+import time
+
+from scipy.stats import unitary_group
+
+from strawberryfields.backends.gaussianbackend import ops
+from strawberryfields.backends.gaussianbackend.gaussiancircuit import GaussianModes
+
+
+def gbs_state(modes, r):
+    """Squeezed vacuum inputs followed by a random interferometer"""
+    circuit = GaussianModes(modes, hbar=2)
+    for k in range(modes):
+        circuit.squeeze(r, 0, k)
+    circuit.apply_u(unitary_group.rvs(modes))
+    return circuit
+
+
+def run(mode_range, shots, r):
+    """Print the total time, the time per shot and the mean number of clicks for each number of modes."""
+    print("{:>6} {:>12} {:>14} {:>8}".format("modes", "total", "per shot", "clicks"))
+
+    for n in mode_range:
+        circuit = gbs_state(n, r)
+        start = time.perf_counter()
+        samples = ops.threshold_samples(circuit, range(n), shots)
+        total = time.perf_counter() - start
+        clicks = samples.sum(axis=1).mean()
+        print("{:>6} {:>11.3f}s {:>12.2f}us {:>8.2f}".format(n, total, total / shots * 1e6, clicks))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", type=int, nargs="+", default=[4, 8, 12, 16, 20])
+    parser.add_argument("--shots", type=int, default=1000)
+    parser.add_argument("--squeezing", type=float, default=0.5)
+    args = parser.parse_args()
+
+    run(args.modes, args.shots, args.squeezing)
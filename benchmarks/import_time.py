@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark of the import time of Strawberry Fields.
+
+Measures the wall time and the peak resident memory of fresh interpreters that
+import Strawberry Fields and run a small program on the Gaussian backend, and
+of interpreters that also load the TensorFlow backend. Asserts that TensorFlow
+is not imported by the Gaussian run.
+
+Usage::
+
+    python benchmarks/import_time.py [--repeat 5]
+"""
+import argparse
+import resource
+import subprocess
+import sys
+import time
+
+GAUSSIAN_RUN = """
+import sys
+import strawberryfields as sf
+from strawberryfields import ops
+
+prog = sf.Program(2)
+with prog.context as q:
+    ops.Sgate(0.3) | q[0]
+    ops.BSgate(0.4) | q
+    ops.MeasureX | q[0]
+sf.Engine("gaussian").run(prog)
+
+assert "tensorflow" not in sys.modules, "TensorFlow was imported by a Gaussian run"
+"""
+
+TF_LOAD = """
+import strawberryfields as sf
+sf.Engine("tf", cutoff_dim=3)
+"""
+
+
+def measure(code, repeat, quiet=False):
+    """Returns the smallest wall time and the peak resident memory in MB of running code.
+    If quiet is True, the standard error of the interpreters is discarded."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, stderr=subprocess.DEVNULL if quiet else None)
+        times.append(time.perf_counter() - start)
+
+    # ru_maxrss of the children is the largest of all the children so far, in kB on Linux
+    return min(times), resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1e3
+
+
+def run(repeat):
+    """Print the time and memory of the Gaussian run, and of loading the TF backend."""
+    print("{:>14} {:>10} {:>12}".format("workload", "time", "peak RSS"))
+
+    t, rss = measure(GAUSSIAN_RUN, repeat)
+    print("{:>14} {:>9.3f}s {:>10.1f}MB".format("gaussian", t, rss))
+
+    try:
+        t, rss = measure(TF_LOAD, repeat, quiet=True)
+    except subprocess.CalledProcessError:
+        print("{:>14} {:>10}".format("tf", "TensorFlow not available"))
+        return
+    print("{:>14} {:>9.3f}s {:>10.1f}MB".format("tf", t, rss))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    run(args.repeat)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark of the circuit optimizer on multimode circuits.
+
+Compiles a circuit made of consecutive interferometers and repeated
+two-mode gates with and without optimization, and prints the number of
+compiled commands, the compilation time and the run time on the backend.
+
+Usage::
+
+    python benchmarks/program_optimize.py [--backend gaussian] [--modes 4 8] [--layers 10]
+"""
+import argparse
+import time
+
+import numpy as np
+
+import strawberryfields as sf
+from strawberryfields import ops
+from strawberryfields.utils import random_interferometer
+
+
+def circuit(modes, layers):
+    """Squeezers followed by layers of interferometers and beamsplitter pairs"""
+    prog = sf.Program(modes)
+    with prog.context as q:
+        for m in q:
+            ops.Sgate(0.1) | m
+        for _ in range(layers):
+            ops.Interferometer(random_interferometer(modes)) | q
+            ops.Interferometer(random_interferometer(modes)) | q
+            for k in range(modes - 1):
+                ops.BSgate(0.3, 0.1) | (q[k], q[k + 1])
+                ops.BSgate(0.2, 0.1) | (q[k], q[k + 1])
+                ops.CXgate(0.5) | (q[k], q[k + 1])
+                ops.CXgate(0.5).H | (q[k], q[k + 1])
+    return prog
+
+
+def run(backend, mode_range, layers):
+    """Print the compiled length, compilation and run times with and without optimization."""
+    options = {"cutoff_dim": 3} if backend == "fock" else {}
+    print("{:>6} {:>9} {:>10} {:>10} {:>10}".format("modes", "optimize", "commands", "compile", "run"))
+
+    for modes in mode_range:
+        prog = circuit(modes, layers)
+        states = []
+        for optimize in (False, True):
+            start = time.perf_counter()
+            compiled = prog.compile(backend, optimize=optimize)
+            comp = time.perf_counter() - start
+
+            start = time.perf_counter()
+            states.append(sf.Engine(backend, **options).run(compiled, compile=False))
+            total = time.perf_counter() - start
+            print("{:>6} {:>9} {:>10} {:>9.3f}s {:>9.3f}s".format(modes, str(optimize), len(compiled), comp, total))
+
+        if backend == "gaussian":
+            assert np.allclose(states[0].cov(), states[1].cov())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", default="gaussian")
+    parser.add_argument("--modes", type=int, nargs="+", default=[4, 8])
+    parser.add_argument("--layers", type=int, default=10)
+    args = parser.parse_args()
+
+    run(args.backend, args.modes, args.layers)
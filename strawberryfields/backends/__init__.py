@@ -11,20 +11,45 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-"""This module loads the required backend classes"""
+"""This module loads the required backend classes.
+
+The TensorFlow backend, and thereby TensorFlow itself, is only imported when
+it is first loaded, or when :class:`TFBackend` is accessed as an attribute of
+this module, so that workloads using the NumPy-based backends do not pay for
+importing TensorFlow.
+"""
+import importlib
 
 from .base import BaseBackend, BaseFock, BaseGaussian, ModeMap
-from .tfbackend import TFBackend
 from .gaussianbackend import GaussianBackend
 from .fockbackend import FockBackend
 
 __all__ = ['BaseBackend', 'BaseFock', 'BaseGaussian', 'FockBackend', 'GaussianBackend', 'TFBackend']
 
 supported_backends = {"base": BaseBackend,
-                      "tf": TFBackend,
+                      "tf": "tfbackend.TFBackend",
                       "gaussian": GaussianBackend,
                       "fock": FockBackend}
 
+
+def _backend_class(name):
+    """Returns the class of the specified backend, importing it first
+    if it is given in ``supported_backends`` as a ``'module.Class'`` string."""
+    backend = supported_backends[name]
+    if isinstance(backend, str):
+        module, cls = backend.rsplit(".", 1)
+        backend = getattr(importlib.import_module("." + module, __name__), cls)
+        supported_backends[name] = backend
+    return backend
+
+
+def __getattr__(name):
+    """Lazily imports the TensorFlow backend class on attribute access."""
+    if name == "TFBackend":
+        return _backend_class("tf")
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
 def load_backend(name):
     """Loads the specified backend by mapping a string
     to the backend type, via the ``supported_backends``
@@ -32,7 +57,7 @@ def load_backend(name):
     frontend only, and should not be user-facing.
     """
     if name in supported_backends:
-        backend = supported_backends[name]()
+        backend = _backend_class(name)()
         return backend
     else:
         raise ValueError("Backend '{}' is not supported.".format(name))
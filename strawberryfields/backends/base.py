@@ -111,6 +111,7 @@ for quantum optical circuits.
 
 .. autosummary::
     measure_heterodyne
+    measure_threshold
 
 Code details
 ~~~~~~~~~~~~
@@ -641,7 +642,7 @@ class BaseGaussian(BaseBackend):
         super().__init__()
         self._supported["gaussian"] = True
 
-    def measure_heterodyne(self, mode, select=None):
+    def measure_heterodyne(self, mode, select=None, **kwargs):
         r"""Perform a heterodyne measurement on the given mode.
 
         Updates the current state of the circuit such that the measured mode is reset to the vacuum state.
@@ -650,9 +651,25 @@ class BaseGaussian(BaseBackend):
             modes (Sequence[int]): which modes to measure
             select (complex): (Optional) desired values of measurement result.
                 Allows user to post-select on specific measurement results instead of randomly sampling.
+            **kwargs: can be used to pass the number of samples ``shots`` (default 1)
 
         Returns:
-            complex: measured values
+            complex or array: measured value, or for ``shots > 1``, an array containing the outcome of each shot
+        """
+        raise NotImplementedError
+
+    def measure_threshold(self, modes, select=None, **kwargs):
+        """Measure the given modes with threshold detectors.
+
+        Updates the current state of the circuit such that the measured modes are reset to the vacuum state.
+
+        Args:
+            modes (Sequence[int]): which modes to measure
+            select (Sequence[int]): (Optional) desired values of measurement results.
+                Allows user to post-select on specific measurement results instead of randomly sampling.
+
+        Returns:
+            tuple[int]: corresponding measurement results, 1 for a click and 0 otherwise
         """
         raise NotImplementedError
 
@@ -699,7 +716,3 @@ class BaseGaussian(BaseBackend):
     def cross_kerr_interaction(self, kappa, mode1, mode2):
         # pylint: disable=unused-argument,missing-docstring
         raise NotApplicableError
-
-    def measure_fock(self, modes, select=None):
-        # pylint: disable=unused-argument,missing-docstring
-        raise NotApplicableError
@@ -83,6 +83,7 @@ Auxiliary methods
 .. autosummary::
    reset
    get_cutoff_dim
+   gate_cache_info
 
 Code details
 ~~~~~~~~~~~~
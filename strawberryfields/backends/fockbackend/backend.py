@@ -19,17 +19,16 @@ Fock backend interface
 """
 # pylint: disable=protected-access,too-many-public-methods
 
-import string
 from cmath import phase
 import numpy as np
 
 from strawberryfields.backends import BaseFock, ModeMap
+from strawberryfields.backends.base import NotApplicableError
 from strawberryfields.backends.states import BaseFockState
 
+from . import ops
 from .circuit import Circuit
 
-indices = string.ascii_lowercase
-
 
 class FockBackend(BaseFock):
     """ Backend in the Fock basis """
@@ -69,8 +68,16 @@ class FockBackend(BaseFock):
             hbar (float): The value of :math:`\hbar` to initialise the circuit with, depending on the conventions followed.
                 By default, :math:`\hbar=2`. See :ref:`conventions` for more details.
             pure (bool): whether to begin the circuit in a pure state representation
+            **kwargs: optional keyword arguments
+
+                * **gate_cache_bytes** (*None* or *int*): memory budget in bytes of the cache of gate
+                  matrices shared by all Fock backends in this process (see :class:`~.fockbackend.ops.GateCache`).
+                  If None, the cache is unbounded. If not passed, the current budget is kept.
         """
         # pylint: disable=attribute-defined-outside-init
+        if 'gate_cache_bytes' in kwargs:
+            ops.gate_cache.resize(kwargs['gate_cache_bytes'])
+
         if cutoff_dim is None:
             raise ValueError("Argument 'cutoff_dim' must be passed to the Fock backend")
         if not isinstance(cutoff_dim, int):
@@ -269,11 +276,21 @@ class FockBackend(BaseFock):
             select (float): (Optional) desired values of measurement results
             **kwargs: Can be used to (optionally) pass user-specified numerical parameters `max` and `num_bins`.
                                 These are used numerically to build the probability distribution function (pdf) for the homdyne measurement
-                                Specifically, the pdf is discretized onto the 1D grid [-max,max], with num_bins equally spaced bins
+                                Specifically, the pdf is searched for on the 1D grid [-max,max], and then discretized
+                                onto num_bins equally spaced bins over the interval where it is non-negligible.
+                                The number of samples ``shots`` (default 1) can also be passed. For ``shots > 1``, all the
+                                samples are drawn at once from the same pdf, and the mode is then reset to the vacuum state,
+                                without conditioning the remaining modes on the outcomes. Hence the measurement must then
+                                be ``terminal`` (see :meth:`measure_fock`), and cannot be post-selected.
 
         Returns:
-            float: measurement outcome
+            float or array: measurement outcome, or for ``shots > 1``, an array containing the outcome of each shot
         """
+        if kwargs.get("shots", 1) > 1:
+            if select is not None:
+                raise NotApplicableError("Post-selection is not supported for homodyne measurements with several shots.")
+            if not kwargs.get("terminal", True):
+                raise NotApplicableError("Homodyne measurements with several shots must be terminal.")
         return self.circuit.measure_homodyne(phi, self._remap_modes(mode), select=select, **kwargs)
 
     def loss(self, T, mode):
@@ -305,6 +322,15 @@ class FockBackend(BaseFock):
         """
         return self.circuit._trunc
 
+    def gate_cache_info(self):
+        """Statistics of the cache of gate matrices.
+
+        Returns:
+            GateCacheInfo: hits, misses, evictions, current size in bytes,
+            memory budget in bytes, and number of cached matrices
+        """
+        return ops.gate_cache.cache_info()
+
 
     def state(self, modes=None, **kwargs):
         r"""Returns the state of the quantum simulation, restricted to the subsystems defined by `modes`.
@@ -323,45 +349,34 @@ class FockBackend(BaseFock):
             num_modes = len(s.shape) if pure else len(s.shape) // 2
             modes = [m for m in range(num_modes)]
         else:
-            # convert to mixed state representation
-            if pure:
-                num_modes = len(s.shape)
-                left_str = [indices[i] for i in range(0, 2 * num_modes, 2)]
-                right_str = [indices[i] for i in range(1, 2 * num_modes, 2)]
-                out_str = [indices[: 2 * num_modes]]
-                einstr = ''.join(left_str + [','] + right_str + ['->'] + out_str)
-                rho = np.einsum(einstr, s, s.conj())
-            else:
-                rho = s
-
-            # reduce rho down to specified subsystems
+            # reduce the state down to specified subsystems
             if isinstance(modes, int):
                 modes = [modes]
 
             if len(modes) != len(set(modes)):
                 raise ValueError("The specified modes cannot be duplicated.")
 
-            num_modes = len(rho.shape) // 2
+            num_modes = len(s.shape) if pure else len(s.shape) // 2
             if len(modes) > num_modes:
                 raise ValueError("The number of specified modes cannot be larger than the number of subsystems.")
 
-            keep_indices = indices[: 2 * len(modes)]
-            trace_indices = indices[2 * len(modes) : len(modes) + num_modes]
-            ind = [i * 2 for i in trace_indices]
-            ctr = 0
-
-            for m in range(num_modes):
-                if m in modes:
-                    ind.insert(m, keep_indices[2 * ctr : 2 * (ctr + 1)])
-                    ctr += 1
-
-            indStr = ''.join(ind) + '->' + keep_indices
-            red_state = np.einsum(indStr, rho)
+            traced = [m for m in range(num_modes) if m not in modes]
+            if not traced:
+                red_state = s
+            elif pure:
+                # trace out directly from the ket, the reduced state is mixed
+                red_state = ops.partial_trace_pure(s, num_modes, traced)
+                pure = False
+            else:
+                red_state = ops.partial_trace(s, num_modes, traced)
 
-            # permute indices of returned state to reflect the ordering of modes (we know and hence can assume that red_state is a mixed state)
+        # permute indices of returned state to reflect the ordering of modes
         if modes != sorted(modes):
             mode_permutation = np.argsort(modes)
-            index_permutation = [2*x+i for x in mode_permutation for i in (0, 1)]
+            if pure:
+                index_permutation = mode_permutation
+            else:
+                index_permutation = [2*x+i for x in mode_permutation for i in (0, 1)]
             red_state = np.transpose(red_state, np.argsort(index_permutation))
 
         hbar = self.circuit._hbar
@@ -412,8 +427,20 @@ class FockBackend(BaseFock):
             modes (list[int]): indices of mode where operation is carried out
             select (list[int]): (Optional) desired values of measurement results.
                                                      The length of this list must match the length of the modes list.
+            **kwargs: can be used to pass the number of samples ``shots`` (default 1). For ``shots > 1``,
+                all the samples are drawn at once from the joint photon number distribution of the modes,
+                which are then reset to the vacuum state, without conditioning the remaining modes on the outcomes.
+                Hence the measurement must then be ``terminal`` (default True), i.e. no later operation may act on
+                the measured modes or depend on the measurement results, and it cannot be post-selected.
 
         Returns:
-            list[int]: measurement outcomes
+            list[int] or array[int]: measurement outcomes, or for ``shots > 1``, an array of shape
+            ``(shots, len(modes))`` containing the outcomes of each shot
         """
-        return self.circuit.measure_fock(self._remap_modes(modes), select=select)
+        shots = kwargs.get("shots", 1)
+        if shots > 1:
+            if select is not None:
+                raise NotApplicableError("Post-selection is not supported for Fock measurements with several shots.")
+            if not kwargs.get("terminal", True):
+                raise NotApplicableError("Fock measurements with several shots must be terminal.")
+        return self.circuit.measure_fock(self._remap_modes(modes), select=select, shots=shots)
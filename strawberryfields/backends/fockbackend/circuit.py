@@ -33,18 +33,33 @@ Contents
 # pylint: disable=too-many-branches,too-many-locals,too-many-public-methods
 
 import copy
-import string
 import numbers
-from itertools import product
 
 import numpy as np
-from numpy import sqrt, pi
+from numpy import sqrt
 from scipy.special import factorial as bang
 
 from . import ops
 
-indices = string.ascii_lowercase
-MAX_MODES = len(indices) - 3
+MAX_DIMS = 64 if np.lib.NumpyVersion(np.__version__) >= '2.0.0' else 32
+"""int: maximum number of dimensions of a NumPy array. A state of :math:`n` modes has
+:math:`n` dimensions if it is pure, and :math:`2n` dimensions if it is mixed."""
+
+
+def check_num_modes(num, pure):
+    """Checks that a state of the given number of modes can be represented as a NumPy array.
+
+    Args:
+        num (int): number of modes
+        pure (bool): whether the state is pure or mixed
+
+    Raises:
+        ValueError: if the state would have more than :data:`MAX_DIMS` dimensions
+    """
+    if (num if pure else 2*num) > MAX_DIMS:
+        raise ValueError("Fock simulator has a maximum of {} modes for pure states and {} modes for mixed states "
+                         "-- got {} modes in a {} state".format(MAX_DIMS, MAX_DIMS // 2, num, "pure" if pure else "mixed"))
+
 
 class Circuit():
     """
@@ -62,14 +77,13 @@ class Circuit():
                 By default, :math:`\hbar=2`. See :ref:`conventions` for more details.
             pure (bool, optional): Whether states are pure (True) or mixed (False)
             do_checks (bool, optional): Whether arguments are to be checked first
-            mode (str, optional): Whether to use BLAS or einsum for matrix operations.
+            mode (str, optional): Whether to use BLAS (``'blas'``), einsum (``'einsum'``) or
+                a single matrix-matrix multiplication (``'gemm'``) for matrix operations.
         """
 
         # Check validity
         if num < 0:
             raise ValueError("Number of modes must be non-negative -- got {}".format(num))
-        if num > MAX_MODES:
-            raise ValueError("Fock simulator has a maximum of {} modes".format(MAX_MODES))
         if trunc <= 0:
             raise ValueError("Truncation must be positive -- got {}".format(trunc))
 
@@ -77,25 +91,83 @@ class Circuit():
         self._hbar = hbar
         self._checks = do_checks
         self._mode = mode
+        self._spare = None
         self.reset(pure=pure, cutoff_dim=trunc)
 
-    def _apply_gate(self, mat, modes):
+    def _buffer(self, pure):
+        """Returns a scratch array that the next state can be written into.
+
+        The circuit keeps the previous state array around as a spare buffer,
+        so that a sequence of operations alternates between two preallocated
+        arrays rather than allocating a new one per operation.
+
+        Args:
+            pure (bool): whether the buffer is for a pure or a mixed state
+
+        Returns:
+            array: an uninitialized array of the required shape
+        """
+        shape = tuple([self._trunc] * (self._num_modes if pure else 2*self._num_modes))
+        buf, self._spare = self._spare, None
+        if buf is not None and buf.shape == shape:
+            return buf
+        return np.empty(shape, dtype=ops.def_type)
+
+    def _swap(self, new_state):
+        """Replaces the state by `new_state`, recycling the old state array as
+        the spare buffer.
+
+        The old state is only recycled if it has not been handed out by
+        :meth:`get_state`, since it would otherwise be overwritten by a later
+        operation.
+
+        Args:
+            new_state (array): the new state of the circuit
+        """
+        old_state = self._state
+        self._state = new_state
+        if not self._exported and old_state.dtype == ops.def_type and old_state.flags.c_contiguous \
+                and old_state.flags.writeable and not np.shares_memory(old_state, new_state):
+            self._spare = old_state
+        self._exported = False
+
+    def _normalize(self):
+        """Normalizes the state."""
+        self._swap(np.divide(self._state, self.norm(), out=self._buffer(self._pure)))
+
+    def _apply_gate(self, mat, modes, structure='dense'):
         """Master gate application function. Selects between implementations based
-        on the `_mode` class parameter.
+        on the structure of the gate and the `_mode` class parameter.
 
         Args:
-            mat (array): The matrix to apply
+            mat (array): The matrix to apply. For diagonal gates, only the diagonal
+                of the matrix, with shape (in1, in2, ...). For block gates, the
+                blocks returned by :func:`~.ops.photon_number_blocks`.
             modes (list<non-negative int>): The modes to apply `mat` to
+            structure (str): The structure of the gate, either ``'dense'``, ``'diagonal'``
+                or ``'blocks'``. Diagonal gates are applied as an elementwise product with
+                the state, and block gates (two mode gates conserving the total photon
+                number) are applied separately to each photon number sector.
         """
 
         args = [mat, self._state, self._pure, modes, self._num_modes, self._trunc]
-        if self._mode == 'blas':
-            self._state = ops.apply_gate_BLAS(*args)
+        if structure == 'diagonal':
+            func = ops.apply_gate_diagonal
+        elif structure == 'blocks':
+            func = ops.apply_gate_blocks
+        elif structure != 'dense':
+            raise ValueError("Unknown gate structure '{}'".format(structure))
+        elif self._mode == 'blas':
+            func = ops.apply_gate_BLAS
         elif self._mode == 'einsum':
-            self._state = ops.apply_gate_einsum(*args)
+            func = ops.apply_gate_einsum
+        elif self._mode == 'gemm':
+            func = ops.apply_gate_GEMM
         else:
             raise NotImplementedError
 
+        self._swap(func(*args, out=self._buffer(self._pure)))
+
     def _apply_channel(self, kraus_ops, modes):
         """Master channel application function. Applies a channel represented by
         Kraus operators.
@@ -109,20 +181,49 @@ class Circuit():
         """
 
         if self._pure:
-            self._state = ops.mix(self._state, self._num_modes)
+            check_num_modes(self._num_modes, False)
+            self._swap(ops.mix(self._state, self._num_modes, out=self._buffer(False)))
             self._pure = False
 
         if len(kraus_ops) == 0:
             self._state = np.zeros([self._trunc for i in range(self._num_modes*2)], dtype=ops.def_type)
-        elif self._mode == 'blas':
-            states = [ops.apply_gate_einsum(k, np.copy(self._state), False, modes, self._num_modes, self._trunc)\
-                                    for k in kraus_ops]
-            self._state = sum(states)
-        elif self._mode == 'einsum':
-            states = [ops.apply_gate_einsum(k, self._state, False, modes, self._num_modes, self._trunc)\
-                                    for k in kraus_ops]
-            self._state = sum(states)
+            return
+
+        if self._mode in ('blas', 'einsum'):
+            func = ops.apply_gate_einsum
+        elif self._mode == 'gemm':
+            func = ops.apply_gate_GEMM
+        else:
+            raise NotImplementedError
+
+        # Accumulate the contribution of each Kraus operator into a single buffer,
+        # so that only one extra copy of the state is required.
+        args = [self._state, False, modes, self._num_modes, self._trunc]
+        ret = func(kraus_ops[0], *args, out=self._buffer(False))
+        if len(kraus_ops) > 1:
+            tmp = np.empty_like(ret)
+            for k in kraus_ops[1:]:
+                ret += func(k, *args, out=tmp)
+        self._swap(ret)
+
+    def _apply_superoperator(self, superop, mode):
+        """Applies a channel represented by a single mode superoperator,
+        with shape (out, out', in, in').
+
+        .. note::
+                Always results in a mixed state.
+
+        Args:
+            superop (array): the superoperator
+            mode (non-negative int): the mode to apply the channel to
+        """
+        if self._pure:
+            check_num_modes(self._num_modes, False)
+            self._swap(ops.mix(self._state, self._num_modes, out=self._buffer(False)))
+            self._pure = False
 
+        args = [superop, self._state, mode, self._num_modes, self._trunc]
+        self._swap(ops.apply_superoperator(*args, out=self._buffer(False)))
 
     def reset(self, pure=None, cutoff_dim=None, num_subsystems=None):
         """Resets the simulation state.
@@ -148,10 +249,12 @@ class Circuit():
                 raise ValueError("Argument 'cutoff_dim' must be a positive integer")
             self._trunc = cutoff_dim
 
+        check_num_modes(self._num_modes, self._pure)
         if self._pure:
             self._state = ops.vacuumState(self._num_modes, self._trunc)
         else:
             self._state = ops.vacuumStateMixed(self._num_modes, self._trunc)
+        self._exported = False
 
     def norm(self):
         """returns the norm of the state"""
@@ -162,6 +265,7 @@ class Circuit():
     def alloc(self, n=1):
         """allocate a number of modes at the end of the state."""
         # base_shape = [self._trunc for i in range(n)]
+        check_num_modes(self._num_modes + n, self._pure)
         if self._pure:
             vac = ops.vacuumState(n, self._trunc)
         else:
@@ -173,10 +277,11 @@ class Circuit():
     def dealloc(self, modes):
         """Traces out and deallocates the modes in `modes`"""
         if self._pure:
-            self._state = ops.mix(self._state, self._num_modes)
+            check_num_modes(self._num_modes - len(modes), False)
+            self._state = ops.partial_trace_pure(self._state, self._num_modes, modes)
             self._pure = False
-
-        self._state = ops.partial_trace(self._state, self._num_modes, modes)
+        else:
+            self._state = ops.partial_trace(self._state, self._num_modes, modes)
         self._num_modes = self._num_modes - len(modes)
 
     def prepare_multimode(self, state, modes):
@@ -228,16 +333,16 @@ class Circuit():
             self._state = state.astype(ops.def_type)
             self._pure = bool(state.shape == pure_shape)
         else:
-            if self._pure:
-                self._state = ops.mix(self._state, self._num_modes)
-                self._pure = False
-
+            check_num_modes(self._num_modes, False)
             if state.shape == pure_shape:
                 state = ops.mix(state, len(modes))
 
-            # Take the partial trace
-            # todo: For performance the partial trace could be done directly from the pure state. This would of course require a better partial trace function...
-            reduced_state = ops.partial_trace(self._state, self._num_modes, modes)
+            # Take the partial trace, directly from the ket for pure states
+            if self._pure:
+                reduced_state = ops.partial_trace_pure(self._state, self._num_modes, modes)
+                self._pure = False
+            else:
+                reduced_state = ops.partial_trace(self._state, self._num_modes, modes)
 
             # Insert state at the end (I know there is also tensor() from ops but it has extra aguments wich only confuse here)
             self._state = np.tensordot(reduced_state, state, axes=0)
@@ -321,7 +426,7 @@ class Circuit():
         """
         Applies a phase shifter.
         """
-        self._apply_gate(ops.phase(theta, self._trunc), [mode])
+        self._apply_gate(ops.phase_diagonal(theta, self._trunc), [mode], structure='diagonal')
 
     def displacement(self, alpha, mode):
         """
@@ -333,7 +438,7 @@ class Circuit():
         """
         Applies a beamsplitter.
         """
-        self._apply_gate(ops.beamsplitter(t, r, phi, self._trunc), [mode1, mode2])
+        self._apply_gate(ops.beamsplitter_blocks(t, r, phi, self._trunc), [mode1, mode2], structure='blocks')
 
     def squeeze(self, r, theta, mode):
         """
@@ -345,13 +450,13 @@ class Circuit():
         """
         Applies a Kerr interaction gate.
         """
-        self._apply_gate(ops.kerr(kappa, self._trunc), [mode])
+        self._apply_gate(ops.kerr_diagonal(kappa, self._trunc), [mode], structure='diagonal')
 
     def cross_kerr_interaction(self, kappa, mode1, mode2):
         """
         Applies a cross-Kerr interaction gate.
         """
-        self._apply_gate(ops.cross_kerr(kappa, self._trunc), [mode1, mode2])
+        self._apply_gate(ops.cross_kerr_diagonal(kappa, self._trunc), [mode1, mode2], structure='diagonal')
 
     def cubic_phase_shift(self, gamma, mode):
         """
@@ -374,27 +479,73 @@ class Circuit():
         """
         Returns the state of the system in the fock basis along with its purity.
         """
+        # the returned array is no longer owned by the circuit, and must not be reused as a buffer
+        self._exported = True
         return self._state, self._pure
 
     def loss(self, T, mode):
         """
         Applies a loss channel to the state.
         """
-        self._apply_channel(ops.lossChannel(T, self._trunc), [mode])
+        self._apply_superoperator(ops.lossSuperoperator(T, self._trunc), mode)
+
+    def reset_vacuum(self, modes):
+        """
+        Resets the given modes to the vacuum state, without conditioning the other modes.
 
-    def measure_fock(self, modes, select=None):
+        If all the modes are reset, the result is the pure vacuum state. Otherwise the
+        reduced state of the other modes is computed directly from the ket for pure states,
+        without forming the density matrix of the full state.
+        """
+        if len(modes) == self._num_modes:
+            self._state = ops.vacuumState(self._num_modes, self._trunc)
+            self._pure = True
+            return
+        self.prepare_multimode(ops.vacuumState(len(modes), self._trunc), list(modes))
+
+    def fock_marginal(self, modes):
+        """
+        Computes the joint photon number distribution of the given modes.
+
+        The axes of the returned tensor correspond to the modes in increasing order.
+        For a pure state, the distribution is computed directly from the ket,
+        without forming the density matrix.
+        """
+        if self._pure:
+            probs = np.abs(self._state) ** 2
+        else:
+            probs = ops.diagonal(self._state, self._num_modes).real
+
+        unmeasured = tuple(i for i in range(self._num_modes) if i not in modes)
+        return probs.sum(axis=unmeasured)
+
+    def measure_fock(self, modes, select=None, shots=1):
         """
         Measures a list of modes.
+
+        If shots > 1, the outcomes of all shots are drawn at once from the joint
+        distribution of the measured modes, which are then reset to the vacuum state.
+        The remaining modes are not conditioned on the outcomes. Returns an integer
+        array of shape (shots, len(modes)).
         """
         # pylint: disable=singleton-comparison
         if select is not None and np.any(np.array(select) == None):
             raise NotImplementedError("Post-selection lists must only contain numerical values.")
 
-        # Make sure the state is mixed
-        if self._pure:
-            state = ops.mix(self._state, self._num_modes)
-        else:
-            state = self._state
+        if shots > 1:
+            if select is not None:
+                raise ValueError("Post-selection is not supported for Fock measurements with several shots.")
+
+            dist = np.ravel(self.fock_marginal(modes))
+            i = np.random.choice(len(dist), size=shots, p=dist / np.sum(dist))
+
+            # the columns of the unraveled outcomes follow the increasing order of the modes
+            sorted_modes = sorted(modes)
+            permuted_outcomes = np.unravel_index(i, [self._trunc] * len(modes))
+            outcomes = np.stack([permuted_outcomes[sorted_modes.index(m)] for m in modes], axis=1)
+
+            self.reset_vacuum(modes)
+            return outcomes
 
         if select is not None:
             # perform post-selection
@@ -416,12 +567,13 @@ class Circuit():
             select_values = [s for s in select if s is not None]
 
             # project out postselected modes
-            self._state = ops.project_reset(selected, select_values, self._state, self._pure, self._num_modes, self._trunc)
+            self._swap(ops.project_reset(selected, select_values, self._state, self._pure, self._num_modes, self._trunc,
+                                         out=self._buffer(self._pure)))
 
             if self.norm() == 0:
                 raise ZeroDivisionError("Measurement has zero probability.")
 
-            self._state = self._state / self.norm()
+            self._normalize()
 
         else:
             # no post-selection; modes to measure are the modes provided
@@ -429,10 +581,7 @@ class Circuit():
 
         if len(measure) > 0:
             # sampling needs to be performed
-            # Compute distribution by tracing out modes not measured, then computing the diagonal
-            unmeasured = [i for i in range(self._num_modes) if i not in measure]
-            reduced = ops.partial_trace(state, self._num_modes, unmeasured)
-            dist = np.ravel(ops.diagonal(reduced, len(measure)).real)
+            dist = np.ravel(self.fock_marginal(measure))
 
             # Make a random choice
             if sum(dist) != 1:
@@ -450,12 +599,13 @@ class Circuit():
                 outcome[permutation[i]] = permuted_outcome[i]
 
             # Project the state onto the measurement outcome & reset in vacuum
-            self._state = ops.project_reset(measure, outcome, self._state, self._pure, self._num_modes, self._trunc)
+            self._swap(ops.project_reset(measure, outcome, self._state, self._pure, self._num_modes, self._trunc,
+                                         out=self._buffer(self._pure)))
 
             if self.norm() == 0:
                 raise ZeroDivisionError("Measurement has zero probability.")
 
-            self._state = self._state / self.norm()
+            self._normalize()
 
         # include post-selected values in measurement outcomes
         if select is not None:
@@ -466,57 +616,43 @@ class Circuit():
     def measure_homodyne(self, phi, mode, select=None, **kwargs):
         """
         Performs a homodyne measurement on a mode.
+
+        If shots > 1, all the shots are drawn at once from the quadrature distribution
+        of the mode, which is then reset to the vacuum state. The remaining modes
+        are not conditioned on the outcomes.
         """
         m_omega_over_hbar = 1/self._hbar
-
-        # Make sure the state is mixed for reduced density matrix
-        if self._pure:
-            state = ops.mix(self._state, self._num_modes)
-        else:
-            state = self._state
+        shots = kwargs.get('shots', 1)
 
         if select is not None:
+            if shots > 1:
+                raise ValueError("Post-selection is not supported for homodyne measurements with several shots.")
             meas_result = select
             if isinstance(meas_result, numbers.Number):
                 homodyne_sample = float(meas_result)
             else:
                 raise TypeError("Selected measurement result must be of numeric type.")
         else:
-             # Compute reduced density matrix
+            # Compute reduced density matrix, directly from the ket for pure states
             unmeasured = [i for i in range(self._num_modes) if not i == mode]
-            reduced = ops.partial_trace(state, self._num_modes, unmeasured)
+            if self._pure:
+                reduced = ops.partial_trace_pure(self._state, self._num_modes, unmeasured)
+            else:
+                reduced = ops.partial_trace(self._state, self._num_modes, unmeasured)
 
             # Rotate to measurement basis
-            args = [ops.phase(-phi, self._trunc), reduced, False, [0], 1, self._trunc]
-            if self._mode == 'blas':
-                reduced = ops.apply_gate_BLAS(*args)
-            elif self._mode == 'einsum':
-                reduced = ops.apply_gate_einsum(*args)
-
-            # Create pdf. Same as tf implementation, but using
-            # the recursive relation H_0(x) = 1, H_1(x) = 2x, H_{n+1}(x) = 2xH_n(x) - 2nH_{n-1}(x)
+            reduced = ops.apply_gate_diagonal(ops.phase_diagonal(-phi, self._trunc), reduced, False, [0], 1, self._trunc)
+
+            # Sample from the quadrature distribution, computed from the position wavefunctions
             q_mag = kwargs.get('max', 10)
-            num_bins = kwargs.get('num_bins', 100000)
-
-            q_tensor, Hvals = ops.hermiteVals(q_mag, num_bins, m_omega_over_hbar, self._trunc)
-            H_matrix = np.zeros((self._trunc, self._trunc, num_bins))
-            for n, m in product(range(self._trunc), repeat=2):
-                H_matrix[n][m] = 1 / sqrt(2**n * bang(n) * 2**m * bang(m)) * Hvals[n] * Hvals[m]
-            H_terms = np.expand_dims(reduced, -1) * np.expand_dims(H_matrix, 0)
-            rho_dist = np.sum(H_terms, axis=(1, 2)) \
-                                 * (m_omega_over_hbar/pi)**0.5 \
-                                 * np.exp(-m_omega_over_hbar * q_tensor**2) \
-                                 * (q_tensor[1] - q_tensor[0]) # Delta_q for normalization (only works if the bins are equally spaced)
-
-            # Sample from rho_dist. This is a bit different from tensorflow due to how
-            # numpy treats multinomial sampling. In particular, numpy returns a
-            # histogram of the samples whereas tensorflow gives the list of samples.
-            # Numpy also does not use the log probabilities
-            probs = rho_dist.flatten().real
-            probs /= np.sum(probs)
-            sample_hist = np.random.multinomial(1, probs)
-            sample_idx = list(sample_hist).index(1)
-            homodyne_sample = q_tensor[sample_idx]
+            num_bins = kwargs.get('num_bins', 10000)
+            samples = ops.homodyne_samples(reduced, m_omega_over_hbar, q_mag, num_bins, shots=shots)
+
+            if shots > 1:
+                self.reset_vacuum([mode])
+                return samples
+
+            homodyne_sample = samples[0]
 
         # Project remaining modes into the conditional state
         inf_squeezed_vac = \
@@ -530,12 +666,14 @@ class Circuit():
             eigenstate = ops.apply_gate_BLAS(*args)
         elif self._mode == 'einsum':
             eigenstate = ops.apply_gate_einsum(*args)
+        elif self._mode == 'gemm':
+            eigenstate = ops.apply_gate_GEMM(*args)
 
         vac_state = np.array([1.0 + 0.0j if i == 0 else 0.0 + 0.0j for i in range(self._trunc)], dtype=ops.def_type)
         projector = np.outer(vac_state, eigenstate.conj())
         self._apply_gate(projector, [mode])
 
         # Normalize
-        self._state = self._state / self.norm()
+        self._normalize()
 
         return homodyne_sample
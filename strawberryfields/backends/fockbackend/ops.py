@@ -39,6 +39,7 @@ Utilities
      diagonal
      trace
      partial_trace
+     partial_trace_pure
      tensor
      project_reset
 
@@ -48,6 +49,10 @@ Matrix multiplication
 .. autosummary::
      apply_gate_BLAS
      apply_gate_einsum
+     apply_gate_GEMM
+     apply_gate_diagonal
+     apply_gate_blocks
+     apply_superoperator
 
 Gates
 ----------------------
@@ -57,7 +62,15 @@ Gates
      displacement
      squeezing
      phase
+     phase_diagonal
+     kerr
+     kerr_diagonal
+     cross_kerr
+     cross_kerr_diagonal
      beamsplitter
+     beamsplitter_recursive
+     beamsplitter_blocks
+     photon_number_blocks
      addition
      controlledPhase
      projector
@@ -81,6 +94,26 @@ Channels
 
 .. autosummary::
      lossChanel
+     lossSuperoperator
+
+Homodyne measurements
+----------------------
+
+.. autosummary::
+     hermite_functions
+     homodyne_pdf
+     homodyne_samples
+
+Gate cache
+----------------------
+
+Gate and channel matrices, and states, depending on continuous parameters are
+memoised in a single least-recently-used cache, :data:`gate_cache`, shared between
+all gate kinds and bounded by a total memory budget in bytes.
+
+.. autosummary::
+     GateCache
+     GateCacheInfo
 
 """
 # pylint: disable=too-many-arguments
@@ -89,6 +122,8 @@ Channels
 
 import functools
 import string
+import threading
+from collections import OrderedDict, namedtuple
 from itertools import product
 
 import numpy as np
@@ -105,6 +140,131 @@ def_type = np.complex128
 indices = string.ascii_lowercase
 
 
+GateCacheInfo = namedtuple("GateCacheInfo", ["hits", "misses", "evictions", "currbytes", "maxbytes", "entries"])
+"""namedtuple: statistics of a :class:`GateCache`, in the style of ``functools.lru_cache().cache_info()``."""
+
+
+class GateCache:
+    """Least-recently-used cache for gate matrices, bounded by a memory budget.
+
+    Unlike ``functools.lru_cache``, a single cache is shared by all decorated
+    functions, and its size is measured in bytes of the cached arrays, so that
+    a few large beamsplitters and many small phase gates compete for the same
+    budget. Entries are evicted in least-recently-used order once the budget is
+    exceeded, and results larger than the whole budget are not cached.
+
+    Args:
+        maxbytes (int or None): the memory budget in bytes. If ``None``, the
+            cache is unbounded.
+    """
+
+    def __init__(self, maxbytes=None):
+        self.maxbytes = maxbytes
+        self._data = OrderedDict()
+        self._currbytes = 0
+        self._stats = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _nbytes(value):
+        """Size of a cached array, or tuple of arrays, in bytes"""
+        if isinstance(value, tuple):
+            return sum(np.asarray(v).nbytes for v in value)
+        return np.asarray(value).nbytes
+
+    def _evict(self):
+        """Evict the least recently used entries until the cache fits into the budget"""
+        while self.maxbytes is not None and self._currbytes > self.maxbytes:
+            (kind, _), (_, size) = self._data.popitem(last=False)
+            self._currbytes -= size
+            self._stats[kind][2] += 1
+
+    def __call__(self, func):
+        """Decorator memoising ``func`` in the cache.
+
+        The decorated function has ``cache_info()`` and ``cache_clear()``
+        methods that act on the entries of ``func`` only.
+        """
+        kind = func.__name__
+        self._stats.setdefault(kind, [0, 0, 0])
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (kind, args + tuple(sorted(kwargs.items())))
+            with self._lock:
+                if key in self._data:
+                    self._data.move_to_end(key)
+                    self._stats[kind][0] += 1
+                    return self._data[key][0]
+                self._stats[kind][1] += 1
+
+            value = func(*args, **kwargs)
+            size = self._nbytes(value)
+
+            with self._lock:
+                if (self.maxbytes is None or size <= self.maxbytes) and key not in self._data:
+                    self._data[key] = (value, size)
+                    self._currbytes += size
+                    self._evict()
+            return value
+
+        wrapper.cache_info = lambda: self.cache_info(kind)
+        wrapper.cache_clear = lambda: self.cache_clear(kind)
+        return wrapper
+
+    def cache_info(self, kind=None):
+        """Return the cache statistics.
+
+        Args:
+            kind (str or None): if given, only report the entries and statistics
+                of the decorated function with this name
+
+        Returns:
+            GateCacheInfo: hits, misses, evictions, current size in bytes,
+            memory budget in bytes, and number of entries
+        """
+        with self._lock:
+            if kind is None:
+                hits, misses, evictions = [sum(i) for i in zip([0, 0, 0], *self._stats.values())]
+                return GateCacheInfo(hits, misses, evictions, self._currbytes, self.maxbytes, len(self._data))
+
+            entries = [size for (k, _), (_, size) in self._data.items() if k == kind]
+            return GateCacheInfo(*self._stats.get(kind, [0, 0, 0]), sum(entries), self.maxbytes, len(entries))
+
+    def cache_clear(self, kind=None):
+        """Remove cached entries and reset the statistics.
+
+        Args:
+            kind (str or None): if given, only clear the entries of the
+                decorated function with this name
+        """
+        with self._lock:
+            for key in [key for key in self._data if kind is None or key[0] == kind]:
+                self._currbytes -= self._data.pop(key)[1]
+            for k in self._stats:
+                if kind is None or k == kind:
+                    self._stats[k] = [0, 0, 0]
+
+    def resize(self, maxbytes):
+        """Change the memory budget, evicting entries if necessary.
+
+        Args:
+            maxbytes (int or None): the new memory budget in bytes, or ``None`` for no bound
+        """
+        if maxbytes is not None and maxbytes < 0:
+            raise ValueError("Gate cache size must be non-negative -- got {}".format(maxbytes))
+        with self._lock:
+            self.maxbytes = maxbytes
+            self._evict()
+
+
+DEFAULT_GATE_CACHE_BYTES = 2**28
+"""int: default memory budget of :data:`gate_cache` (256 MiB)."""
+
+gate_cache = GateCache(DEFAULT_GATE_CACHE_BYTES)
+"""GateCache: the cache shared by all gate and channel matrices of the Fock backend."""
+
+
 def genOfRange(size):
     """
     Converts a range into a generator.
@@ -189,17 +349,18 @@ def dagger(mat):
     return mat.conj().T
 
 
-def mix(state, n):
+def mix(state, n, out=None):
     """
     Transforms a pure state into a mixed state. Does not do any checks on the
     shape of the input state.
+
+    If ``out`` is given, the mixed state is written into it instead of a newly
+    allocated array.
     """
 
-    left_str = [indices[i] for i in range(0, 2*n, 2)]
-    right_str = [indices[i] for i in range(1, 2*n, 2)]
-    out_str = [indices[:2*n]]
-    einstr = ''.join(left_str + [','] + right_str + ['->'] + out_str)
-    return np.einsum(einstr, state, state.conj())
+    # the einsum subscripts are given as integer lists rather than strings,
+    # so that the number of modes is not limited by the number of letters
+    return np.einsum(state, range(0, 2*n, 2), state.conj(), range(1, 2*n, 2), range(2*n), out=out)
 
 
 def diagonal(state, n):
@@ -207,10 +368,7 @@ def diagonal(state, n):
     Computes the diagonal of a density matrix.
     """
 
-    left_str = [indices[i] + indices[i] for i in range(n)]
-    out_str = [indices[:n]]
-    einstr = ''.join(left_str + ['->'] + out_str)
-    return np.einsum(einstr, state)
+    return np.einsum(state, [i//2 for i in range(2*n)], range(n))
 
 
 def trace(state, n):
@@ -218,9 +376,7 @@ def trace(state, n):
     Computes the trace of a density matrix.
     """
 
-    left_str = [indices[i] + indices[i] for i in range(n)]
-    einstr = ''.join(left_str)
-    return np.einsum(einstr, state)
+    return np.einsum(state, [i//2 for i in range(2*n)], [])
 
 
 def partial_trace(state, n, modes):
@@ -229,11 +385,24 @@ def partial_trace(state, n, modes):
 
     Expects state to be in mixed state form.
     """
-    left_str = [indices[2*i] + indices[2*i] if i in modes else indices[2*i:2*i+2] for i in range(n)]
-    out_str = ['' if i in modes else indices[2*i:2*i+2] for i in range(n)]
-    einstr = ''.join(left_str + ['->'] + out_str)
+    left_sub = [2*(i//2) if i//2 in modes else i for i in range(2*n)]
+    out_sub = [i for i in range(2*n) if not i//2 in modes]
+
+    return np.einsum(state, left_sub, out_sub)
+
+
+def partial_trace_pure(state, n, modes):
+    """
+    Computes the partial trace of a pure state over the modes in `modes`.
 
-    return np.einsum(einstr, state)
+    The ket is contracted with its conjugate over the traced modes only, without
+    forming the density matrix of the full state. Returns the mixed state of the
+    remaining modes.
+    """
+    k = n - len(modes)
+    rho = np.tensordot(state, state.conj(), axes=(modes, modes))
+    # (ket1, ket2, ..., bra1, bra2, ...) -> (ket1, bra1, ket2, bra2, ...)
+    return np.transpose(rho, [i//2 + (i % 2)*k for i in range(2*k)])
 
 
 def tensor(u, v, n, pure, pos=None):
@@ -255,10 +424,13 @@ def tensor(u, v, n, pure, pos=None):
     return w
 
 
-def project_reset(modes, x, state, pure, n, trunc):
+def project_reset(modes, x, state, pure, n, trunc, out=None):
     r"""
     Applies the operator :math:`\ket{00\dots 0}\bra{\mathbf{x}}` to the
     modes in `modes`.
+
+    If ``out`` is given, the result is written into it instead of a newly
+    allocated array. ``out`` must not share memory with ``state``.
     """
     inSlice = sliceExp(modes, dict(zip(modes, x)), n)
     outSlice = sliceExp(modes, dict(zip(modes, [0] * len(modes))), n)
@@ -267,11 +439,15 @@ def project_reset(modes, x, state, pure, n, trunc):
         # pylint: disable=missing-docstring
         return tuple([lst[i//2] for i in range(len(lst)*2)])
 
+    if out is None:
+        ret = np.zeros([trunc for i in range(n if pure else n*2)], dtype=def_type)
+    else:
+        ret = out
+        ret.fill(0)
+
     if pure:
-        ret = np.zeros([trunc for i in range(n)], dtype=def_type)
-        ret[outSlice] = state[inSlice]
+        ret[tuple(outSlice)] = state[tuple(inSlice)]
     else:
-        ret = np.zeros([trunc for i in range(n*2)], dtype=def_type)
         ret[intersperse(outSlice)] = state[intersperse(inSlice)]
 
     return ret
@@ -283,7 +459,7 @@ def project_reset(modes, x, state, pure, n, trunc):
 #
 # ============================================
 
-def apply_gate_BLAS(mat, state, pure, modes, n, trunc):
+def apply_gate_BLAS(mat, state, pure, modes, n, trunc, out=None):
     """
     Gate application based on custom indexing and matrix multiplication.
     Assumes the input matrix has shape (out1, in1, ...).
@@ -291,6 +467,10 @@ def apply_gate_BLAS(mat, state, pure, modes, n, trunc):
     This implementation uses indexing and BLAS. As per stack overflow,
     einsum doesn't actually use BLAS but rather a c implementation. In theory
     if reshaping is efficient this should be faster.
+
+    If ``out`` is given, the result is written into it instead of a newly
+    allocated array. ``out`` must be a C-contiguous array of type
+    :data:`def_type` that does not share memory with ``state``.
     """
 
     size = len(modes)
@@ -304,27 +484,29 @@ def apply_gate_BLAS(mat, state, pure, modes, n, trunc):
 
     if pure:
         if n == 1:
-            return np.dot(mat, state)
+            return np.dot(mat, state, out=out)
+
+        if out is None:
+            out = np.empty([trunc for i in range(n)], dtype=def_type)
 
         # Transpose the state into the following form:
         # |psi> |mode[0]> |mode[1]> ... |mode[n]>
-        transpose_list = [i for i in range(n) if not i in modes] + modes
+        transpose_list = [i for i in range(n) if not i in modes] + list(modes)
         view = np.transpose(state, transpose_list)
 
-        # Apply matrix to each substate
-        ret = np.zeros([trunc for i in range(n)], dtype=def_type)
+        # Apply matrix to each substate. ret is a transposed view of out,
+        # so no "untranspose" of the result is required.
+        ret = np.transpose(out, transpose_list)
         for i in product(*([range(trunc) for j in range(n - size)])):
             ret[i] = np.dot(matview, view[i].ravel()).reshape(stshape)
 
-        # "untranspose" the return matrix ret
-        untranspose_list = [0] * len(transpose_list)
-        for i in range(len(transpose_list)): # pylint: disable=consider-using-enumerate
-            untranspose_list[transpose_list[i]] = i
-
-        return np.transpose(ret, untranspose_list)
+        return out
     else:
         if n == 1:
-            return np.dot(mat, np.dot(state, dagger(mat)))
+            return np.dot(mat, np.dot(state, dagger(mat)), out=out)
+
+        if out is None:
+            out = np.empty([trunc for i in range(n*2)], dtype=def_type)
 
         # Transpose the state into the following form:
         # |psi><psi||mode[0]>|mode[1]>...|mode[n]><mode[0]|<mode[1]|...<mode[n]|
@@ -333,22 +515,20 @@ def apply_gate_BLAS(mat, state, pure, modes, n, trunc):
         view = np.transpose(state, transpose_list)
 
         # Apply matrix to each substate
-        ret = np.zeros([trunc for i in range(n*2)], dtype=def_type)
+        ret = np.transpose(out, transpose_list)
         for i in product(*([range(trunc) for j in range((n - size)*2)])):
             ret[i] = np.dot(matview, np.dot(view[i].reshape((dim, dim)), dagger(matview))).reshape(stshape + stshape)
 
-        # "untranspose" the return matrix ret
-        untranspose_list = [0] * len(transpose_list)
-        for i in range(len(transpose_list)): # pylint: disable=consider-using-enumerate
-            untranspose_list[transpose_list[i]] = i
+        return out
 
-        return np.transpose(ret, untranspose_list)
 
-
-def apply_gate_einsum(mat, state, pure, modes, n, trunc):
+def apply_gate_einsum(mat, state, pure, modes, n, trunc, out=None):
     """
     Gate application based on einsum.
     Assumes the input matrix has shape (out1, in1, ...)
+
+    If ``out`` is given, the result is written into it instead of a newly
+    allocated array (see :func:`apply_gate_BLAS`).
     """
     # pylint: disable=unused-argument
 
@@ -356,36 +536,229 @@ def apply_gate_einsum(mat, state, pure, modes, n, trunc):
 
     if pure:
         if n == 1:
-            return np.dot(mat, state)
+            return np.dot(mat, state, out=out)
 
-        left_str = [indices[:size*2]]
+        # the state is labelled by 0, ..., n-1, and the output
+        # index of the k-th gate mode by n+k
+        mat_sub = [n + k if i % 2 == 0 else modes[k] for k in range(size) for i in range(2)]
+        out_sub = [n + modes.index(i) if i in modes else i for i in range(n)]
+        return np.einsum(mat, mat_sub, state, range(n), out_sub, out=out)
+    else:
 
-        j = genOfRange(size)
-        right_str = [indices[2*next(j) + 1] if i in modes else indices[size*2 + i] \
-            for i in range(n)]
+        if n == 1:
+            return np.dot(mat, np.dot(state, dagger(mat)), out=out)
 
-        j = genOfRange(size)
-        out_str = [indices[2*next(j)] if i in modes else indices[size*2 + i] \
-            for i in range(n)]
+        # the state is labelled by 0, ..., 2n-1, and the output ket
+        # and bra indices of the k-th gate mode by 2n+2k and 2n+2k+1
+        left_sub = [2*(n + k) if i % 2 == 0 else 2*modes[k] for k in range(size) for i in range(2)]
+        right_sub = [2*(n + k) + 1 if i % 2 == 0 else 2*modes[k] + 1 for k in range(size) for i in range(2)]
+        out_sub = [2*(n + modes.index(i//2)) + i % 2 if i//2 in modes else i for i in range(2*n)]
 
-        einstring = ''.join(left_str + [','] + right_str + ['->'] + out_str)
-        return np.einsum(einstring, mat, state)
-    else:
+        # The kets and bras are contracted one after the other, rather than in
+        # a single three operand einsum, as this both avoids iterating over the
+        # kets and bras of the gate modes simultaneously, and keeps the number
+        # of distinct subscripts within the NumPy limit.
+        mid_sub = [out_sub[i] if i % 2 == 0 else i for i in range(2*n)]
+        ret = np.einsum(mat, left_sub, state, range(2*n), mid_sub)
+        return np.einsum(mat.conj(), right_sub, ret, mid_sub, out_sub, out=out)
+
+
+def apply_gate_GEMM(mat, state, pure, modes, n, trunc, out=None):
+    """
+    Gate application based on a single matrix-matrix multiplication.
+    Assumes the input matrix has shape (out1, in1, ...).
+
+    Unlike :func:`apply_gate_BLAS`, which loops over every substate of the
+    untouched modes, the state is transposed and reshaped into one
+    (rest, gate_dim) matrix, so that pure states require a single GEMM call
+    and mixed states two (one for the ket side and one for the bra side).
+
+    If ``out`` is given, the result is written into it (see :func:`apply_gate_BLAS`),
+    and it is also used as scratch space for the transposed state.
+    """
+    size = len(modes)
+    dim = trunc**size
 
+    # Apply the following matrix transposition:
+    # |m1><m1| |m2><m2| ... |mn><mn| -> |m1>|m2>...|mn><m1|<m2|...<mn|
+    transpose_list = [2*i for i in range(size)] + [2*i + 1 for i in range(size)]
+    matview = np.transpose(mat, transpose_list).reshape((dim, dim))
+
+    if pure:
+        if n == 1:
+            return np.dot(mat, state, out=out)
+
+        # Transpose the state into the following form:
+        # |psi> |mode[0]> |mode[1]> ... |mode[n]>
+        transpose_list = [i for i in range(n) if not i in modes] + list(modes)
+        view = np.transpose(state, transpose_list)
+        shape = view.shape
+        if out is not None:
+            # stage the transposed state in the output buffer, rather than
+            # letting reshape allocate a temporary copy
+            np.copyto(out.reshape(shape), view)
+            view = out
+
+        # each row of view is a substate, so right multiply by the transposed matrix
+        ret = np.dot(view.reshape((-1, dim)), matview.T).reshape(shape)
+    else:
         if n == 1:
-            return np.dot(mat, np.dot(state, dagger(mat)))
+            return np.dot(mat, np.dot(state, dagger(mat)), out=out)
+
+        # Transpose the state into the following form:
+        # |mode[0]>...|mode[n]> |psi><psi| <mode[0]|...<mode[n]|
+        rest = [i for i in range(n*2) if not i//2 in modes]
+        transpose_list = [2*i for i in modes] + rest + [2*i + 1 for i in modes]
+        view = np.transpose(state, transpose_list)
+        shape = view.shape
+        if out is not None:
+            np.copyto(out.reshape(shape), view)
+            view = out
+
+        # left multiplication acts on the kets, right multiplication on the bras
+        ret = np.dot(matview, view.reshape((dim, -1))).reshape((-1, dim))
+        if out is None:
+            ret = np.dot(ret, dagger(matview))
+        else:
+            # the staged state is no longer needed, so out can hold the product,
+            # while ret is recycled for the untransposed result below
+            np.dot(ret, dagger(matview), out=out.reshape(ret.shape))
+            np.copyto(ret.reshape(shape), out.reshape(shape))
+        ret = ret.reshape(shape)
+
+    # "untranspose" the return matrix ret
+    ret = np.transpose(ret, np.argsort(transpose_list))
+    if out is None:
+        return ret
+
+    np.copyto(out, ret)
+    return out
+
+
+def apply_gate_diagonal(diag, state, pure, modes, n, trunc, out=None):
+    """
+    Application of a gate that is diagonal in the Fock basis.
+    Assumes the input is the diagonal of the gate, with shape (in1, in2, ...).
+
+    The gate is applied as an elementwise product of the state with the
+    diagonal, broadcast over the remaining modes, which avoids both the
+    allocation of the full matrix and the matrix multiplication.
+
+    If ``out`` is given, the result is written into it instead of a newly
+    allocated array.
+    """
+    # pylint: disable=unused-argument
+
+    # Transpose the diagonal such that its axes are in the same order as the
+    # modes of the state, and insert unit axes for the remaining modes
+    order = np.argsort(modes)
+    diag = np.transpose(diag, order)
+    shape = [1] * n
+    for i in modes:
+        shape[i] = trunc
+    diag = diag.reshape(shape)
+
+    if pure:
+        return np.multiply(state, diag, out=out)
+
+    # kets are multiplied by the diagonal, bras by its complex conjugate
+    ket = diag.reshape([d for i in shape for d in (i, 1)])
+    bra = diag.conj().reshape([d for i in shape for d in (1, i)])
+    out = np.multiply(state, ket, out=out)
+    return np.multiply(out, bra, out=out)
 
-        in_str = indices[:n*2]
 
-        j = genOfRange(n*2)
-        out_str = ''.join([indices[n*2 + next(j)] if i//2 in modes else indices[i] for i in range(n*2)])
+@functools.lru_cache()
+def photon_number_sectors(trunc):
+    r"""
+    Orders the Fock basis of two modes by total photon number.
+
+    Returns a permutation of the flattened indices ``a*trunc + b`` of the two
+    mode basis states :math:`|a,b\rangle`, sorted by total photon number ``a+b``
+    and then by ``a``, together with the boundaries of each sector in the permutation.
+    """
+    a, b = np.divmod(np.arange(trunc**2), trunc)
+    perm = np.lexsort((a, a+b))
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(a+b))])
+    return perm, bounds
 
-        j = genOfRange(size*2)
-        left_str = ''.join([out_str[modes[i//2]*2] if (i%2) == 0 else in_str[modes[i//2]*2] for i in range(size*2)])
-        right_str = ''.join([out_str[modes[i//2]*2 + 1] if (i%2) == 0 else in_str[modes[i//2]*2 + 1] for i in range(size*2)])
 
-        einstring = ''.join([left_str, ',', in_str, ',', right_str, '->', out_str])
-        return np.einsum(einstring, mat, state, mat.conj())
+def apply_gate_blocks(blocks, state, pure, modes, n, trunc, out=None):
+    """
+    Application of a two mode gate that conserves the total photon number of the two modes.
+    Assumes the input is the list of blocks returned by :func:`photon_number_blocks`.
+
+    The two modes of the state are ordered by total photon number, and each
+    block is applied to its own sector with a separate matrix multiplication.
+    This costs :math:`O(D^3)` rather than :math:`O(D^4)` operations per
+    component of the remaining modes.
+
+    If ``out`` is given, the result is written into it instead of a newly
+    allocated array. Each sector is gathered, multiplied and scattered into
+    the output separately, so the only temporary arrays are of the size of
+    a single sector, i.e. at most a fraction :math:`1/D` of the state.
+    """
+    perm, bounds = photon_number_sectors(trunc)
+    # indices of the two modes for each basis state, in sector order
+    first, second = np.divmod(perm, trunc)
+
+    if out is None:
+        out = np.empty_like(state)
+
+    if pure:
+        passes = [(modes, blocks)]
+    else:
+        # kets are multiplied by the blocks, bras by their complex conjugates
+        passes = [([2*i for i in modes], blocks),
+                  ([2*i+1 for i in modes], [b.conj() for b in blocks])]
+
+    for axes, mats in passes:
+        # views with the two modes as the last axes
+        src = np.moveaxis(state, axes, [-2, -1])
+        dst = np.moveaxis(out, axes, [-2, -1])
+        for mat, start, stop in zip(mats, bounds[:-1], bounds[1:]):
+            idx = (Ellipsis, first[start:stop], second[start:stop])
+            dst[idx] = src[idx] @ mat.T
+        # the remaining passes are done in place, sectors do not overlap
+        state = out
+
+    return out
+
+
+def apply_superoperator(superop, state, mode, n, trunc, out=None):
+    """
+    Applies a single mode superoperator to a mixed state.
+    Assumes the superoperator has shape (out, out', in, in'), where the
+    primed indices act on the bra.
+
+    The state is transposed and reshaped as in :func:`apply_gate_GEMM`, so
+    that the channel is applied using a single matrix-matrix multiplication,
+    rather than a separate gate application per Kraus operator.
+
+    If ``out`` is given, the result is written into it (see :func:`apply_gate_BLAS`),
+    and it is also used as scratch space for the transposed state.
+    """
+    dim = trunc**2
+    matview = superop.reshape((dim, dim))
+
+    # Transpose the state into the following form:
+    # |psi><psi| |mode><mode|
+    transpose_list = [i for i in range(n*2) if i//2 != mode] + [2*mode, 2*mode + 1]
+    view = np.transpose(state, transpose_list)
+    shape = view.shape
+    if out is not None:
+        np.copyto(out.reshape(shape), view)
+        view = out
+
+    ret = np.dot(view.reshape((-1, dim)), matview.T).reshape(shape)
+
+    # "untranspose" the return matrix ret
+    ret = np.transpose(ret, np.argsort(transpose_list))
+    if out is None:
+        return ret
+
+    np.copyto(out, ret)
+    return out
 
 
 # ============================================
@@ -406,7 +779,7 @@ def a(trunc):
     return ret
 
 
-@functools.lru_cache()
+@gate_cache
 def displacement(alpha, trunc):
     r"""The displacement operator :math:`D(\alpha)`.
 
@@ -445,7 +818,7 @@ def displacement(alpha, trunc):
     return ret
 
 
-@functools.lru_cache()
+@gate_cache
 def squeezing(r, theta, trunc, save=False, directory=None):
     r"""The squeezing operator :math:`S(re^{i\theta})`.
 
@@ -466,12 +839,15 @@ def squeezing(r, theta, trunc, save=False, directory=None):
         n = dim_array.reshape((1, -1, 1))
         k = dim_array.reshape((1, 1, -1))
 
-        try:
-            prefac = so.load_squeeze_factors(trunc, directory)
-        except FileNotFoundError:
-            prefac = so.generate_squeeze_factors(trunc)
-            if save:
-                so.save_bs_factors(prefac, directory)
+        if directory is None:
+            prefac = so.cached_squeeze_factors(trunc)
+        else:
+            try:
+                prefac = so.load_squeeze_factors(trunc, directory)[:trunc, :trunc, :trunc]
+            except FileNotFoundError:
+                prefac = so.generate_squeeze_factors(trunc)
+                if save:
+                    so.save_squeeze_factors(prefac, directory)
 
         # we only perform the sum when n+N is divisible by 2
         # in which case we sum 0 <= k <= min(N,n)
@@ -486,29 +862,44 @@ def squeezing(r, theta, trunc, save=False, directory=None):
     return ret
 
 
-@functools.lru_cache()
+@gate_cache
 def kerr(kappa, trunc):
     r"""
     The Kerr interaction :math:`K(\kappa)`.
     """
+    return np.diag(kerr_diagonal(kappa, trunc))
+
+
+@gate_cache
+def kerr_diagonal(kappa, trunc):
+    r"""
+    The diagonal of the Kerr interaction :math:`K(\kappa)`.
+    """
     n = np.arange(trunc)
-    ret = np.diag(np.exp(1j*kappa*n**2))
-    return ret
+    return np.exp(1j*kappa*n**2)
 
 
-@functools.lru_cache()
+@gate_cache
 def cross_kerr(kappa, trunc):
     r"""
     The cross-Kerr interaction :math:`CK(\kappa)`.
     """
-    n1 = np.arange(trunc)[None, :]
-    n2 = np.arange(trunc)[:, None]
-    n1n2 = np.ravel(n1*n2)
-    ret = np.diag(np.exp(1j*kappa*n1n2)).reshape([trunc]*4).swapaxes(1, 2)
+    n1n2 = np.ravel(cross_kerr_diagonal(kappa, trunc))
+    ret = np.diag(n1n2).reshape([trunc]*4).swapaxes(1, 2)
     return ret
 
 
-@functools.lru_cache()
+@gate_cache
+def cross_kerr_diagonal(kappa, trunc):
+    r"""
+    The diagonal of the cross-Kerr interaction :math:`CK(\kappa)`, with shape (in1, in2).
+    """
+    n1 = np.arange(trunc)[:, None]
+    n2 = np.arange(trunc)[None, :]
+    return np.exp(1j*kappa*n1*n2)
+
+
+@gate_cache
 def cubicPhase(gamma, hbar, trunc):
     r"""
     The cubic phase gate :math:`\exp{(i\frac{\gamma}{3\hbar}\hat{x}^3)}`.
@@ -521,26 +912,37 @@ def cubicPhase(gamma, hbar, trunc):
     return ret
 
 
-@functools.lru_cache()
+@gate_cache
 def phase(theta, trunc):
     r"""
     The phase gate :math:`R(\theta)`
     """
-    return np.array(np.diag([exp(1j*n*theta) for n in range(trunc)]), dtype=def_type)
+    return np.diag(phase_diagonal(theta, trunc))
 
 
-@functools.lru_cache()
+@gate_cache
+def phase_diagonal(theta, trunc):
+    r"""
+    The diagonal of the phase gate :math:`R(\theta)`
+    """
+    return np.array([exp(1j*n*theta) for n in range(trunc)], dtype=def_type)
+
+
+@gate_cache
 def beamsplitter(t, r, phi, trunc, save=False, directory=None):
     r"""
     The beamsplitter :math:`B(cos^{-1} t, phi)`.
     """
     # pylint: disable=bad-whitespace
-    try:
-        prefac = so.load_bs_factors(trunc, directory)
-    except FileNotFoundError:
-        prefac = so.generate_bs_factors(trunc)
-        if save:
-            so.save_bs_factors(prefac, directory)
+    if directory is None:
+        prefac = so.cached_bs_factors(trunc)
+    else:
+        try:
+            prefac = so.load_bs_factors(trunc, directory)
+        except FileNotFoundError:
+            prefac = so.generate_bs_factors(trunc)
+            if save:
+                so.save_bs_factors(prefac, directory)
 
     dim_array = np.arange(trunc)
     N = dim_array.reshape((-1, 1, 1, 1, 1))
@@ -560,6 +962,88 @@ def beamsplitter(t, r, phi, trunc, save=False, directory=None):
     return BS
 
 
+@gate_cache
+def beamsplitter_recursive(t, r, phi, trunc):
+    r"""
+    The beamsplitter :math:`B(cos^{-1} t, phi)`, built by recursion on the input photons.
+
+    Since the beamsplitter maps :math:`\hat{a}^\dagger\to t\hat{a}^\dagger + re^{i\phi}\hat{b}^\dagger`
+    and :math:`\hat{b}^\dagger\to -re^{-i\phi}\hat{a}^\dagger + t\hat{b}^\dagger`, the columns
+    of the matrix satisfy
+
+    .. math::
+        B|k+1,l\rangle &= \frac{1}{\sqrt{k+1}}(t\hat{a}^\dagger + re^{i\phi}\hat{b}^\dagger)B|k,l\rangle\\
+        B|k,l+1\rangle &= \frac{1}{\sqrt{l+1}}(-re^{-i\phi}\hat{a}^\dagger + t\hat{b}^\dagger)B|k,l\rangle
+
+    starting from :math:`B|0,0\rangle=|0,0\rangle`. This requires :math:`O(D^4)` operations
+    and no precomputed prefactors, as opposed to the :math:`O(D^5)` contraction of :func:`beamsplitter`,
+    and returns the same matrix.
+
+    Args:
+        t (float): transmittivity
+        r (float): reflectivity
+        phi (float): phase of the reflectivity
+        trunc (int): the Fock cutoff
+
+    Returns:
+        array: the beamsplitter matrix, with indices ``(out1, in1, out2, in2)``
+    """
+    rt = r*exp(1j*phi)
+    sqrt = np.sqrt(np.arange(trunc))
+
+    def create(X, c1, c2):
+        """Apply c1 a^\dagger + c2 b^\dagger to the output indices (the first two axes) of X"""
+        ret = np.zeros_like(X)
+        shape = (-1,) + (1,)*(X.ndim-2)
+        ret[1:] = c1 * sqrt[1:].reshape((-1, 1) + shape[1:]) * X[:-1]
+        ret[:, 1:] += c2 * sqrt[1:].reshape(shape) * X[:, :-1]
+        return ret
+
+    # indices (out1, out2, in1, in2)
+    BS = np.zeros([trunc]*4, dtype=def_type)
+    BS[0, 0, 0, 0] = 1
+
+    for k in range(1, trunc):
+        BS[:, :, k, 0] = create(BS[:, :, k-1, 0], t, rt) / sqrt[k]
+
+    for l in range(1, trunc):
+        BS[:, :, :, l] = create(BS[:, :, :, l-1], -np.conj(rt), t) / sqrt[l]
+
+    return BS.transpose(0, 2, 1, 3)
+
+
+def photon_number_blocks(mat, trunc):
+    r"""
+    Splits a two mode gate that conserves the total photon number into its blocks.
+
+    The block for total photon number :math:`s` contains the matrix elements
+    :math:`\langle a,s-a|U|b,s-b\rangle`, with :math:`a` and :math:`b` running over
+    the basis states of the sector in increasing order (see :func:`photon_number_sectors`).
+
+    Args:
+        mat (array): the gate, with indices ``(out1, in1, out2, in2)``
+        trunc (int): the Fock cutoff
+
+    Returns:
+        tuple[array]: the :math:`2D-1` blocks, ordered by total photon number
+    """
+    blocks = []
+    for total in range(2*trunc-1):
+        a = np.arange(max(0, total-trunc+1), min(total, trunc-1)+1)
+        blocks.append(mat[a[:, None], a[None, :], total-a[:, None], total-a[None, :]])
+    return tuple(blocks)
+
+
+@gate_cache
+def beamsplitter_blocks(t, r, phi, trunc):
+    r"""
+    The photon-number-conserving blocks of the beamsplitter :math:`B(cos^{-1} t, phi)`,
+    for use with :func:`apply_gate_blocks`.
+    """
+    # bypass the cache, so that the dense matrix does not take up space next to its blocks
+    return photon_number_blocks(beamsplitter_recursive.__wrapped__(t, r, phi, trunc), trunc)
+
+
 @functools.lru_cache()
 def proj(i, j, trunc):
     r"""
@@ -604,7 +1088,7 @@ def fockState(n, trunc):
     return array([1.0 + 0.0j if i == n else 0.0 + 0.0j for i in range(trunc)])
 
 
-@functools.lru_cache()
+@gate_cache
 def coherentState(alpha, trunc):
     r"""
     The coherent state :math:`D(\alpha)\ket{0}`.
@@ -615,7 +1099,7 @@ def coherentState(alpha, trunc):
     return exp(-abssqr(alpha) / 2) * array([entry(n) for n in range(trunc)])
 
 
-@functools.lru_cache()
+@gate_cache
 def squeezedState(r, theta, trunc):
     r"""
     The squeezed state :math:`S(re^{i\theta})`.
@@ -628,7 +1112,7 @@ def squeezedState(r, theta, trunc):
     return sqrt(1/cosh(r)) * vec
 
 
-@functools.lru_cache()
+@gate_cache
 def displacedSqueezed(alpha, r, phi, trunc):
     r"""
     The displaced squeezed state :math:`\ket{\alpha,\zeta} = D(\alpha)S(r\exp{(i\phi)})\ket{0}`.
@@ -657,7 +1141,7 @@ def displacedSqueezed(alpha, r, phi, trunc):
     return state
 
 
-@functools.lru_cache()
+@gate_cache
 def thermalState(nbar, trunc):
     r"""
     The thermal state :math:`\rho(\overline{nbar})`.
@@ -679,7 +1163,7 @@ def thermalState(nbar, trunc):
 # ============================================
 
 
-@functools.lru_cache()
+@gate_cache
 def lossChannel(T, trunc):
     r"""
     The Kraus operators for the loss channel :math:`\mathcal{N}(T)`.
@@ -701,6 +1185,19 @@ def lossChannel(T, trunc):
     return [E(n) for n in range(trunc)]
 
 
+@gate_cache
+def lossSuperoperator(T, trunc):
+    r"""
+    The superoperator of the loss channel :math:`\mathcal{N}(T)`, with shape
+    (out, out', in, in').
+
+    This is the sum of :math:`E_n\otimes E_n^*` over the Kraus operators
+    :math:`E_n` returned by :func:`lossChannel`.
+    """
+    kraus = np.array(lossChannel(T, trunc))
+    return np.einsum('kai,kbj->abij', kraus, kraus.conj())
+
+
 # ============================================
 #
 # Misc
@@ -708,19 +1205,62 @@ def lossChannel(T, trunc):
 # ============================================
 
 
-@functools.lru_cache()
-def hermiteVals(q_mag, num_bins, m_omega_over_hbar, trunc):
+def hermite_functions(q, m_omega_over_hbar, trunc):
+    r"""
+    Computes the position wavefunctions :math:`\psi_n(q)=\braket{q|n}` of the first
+    ``trunc`` Fock states on the grid ``q``.
+
+    The normalized Hermite functions are obtained with the recurrence relation
+    :math:`\psi_{n+1}(q) = \sqrt{2/(n+1)}\, x\, \psi_n(q) - \sqrt{n/(n+1)}\, \psi_{n-1}(q)`,
+    where :math:`x = \sqrt{m\omega/\hbar}\, q`, which avoids the overflow of the
+    Hermite polynomials and factorials for large Fock states.
+
+    Returns:
+        array: wavefunctions, of shape ``(trunc, len(q))``
+    """
+    x = np.sqrt(m_omega_over_hbar) * q
+    psi = np.empty((trunc, len(q)))
+    psi[0] = (m_omega_over_hbar / pi)**0.25 * np.exp(-x**2 / 2)
+    if trunc > 1:
+        psi[1] = np.sqrt(2) * x * psi[0]
+    for n in range(2, trunc):
+        psi[n] = np.sqrt(2 / n) * x * psi[n-1] - np.sqrt((n-1) / n) * psi[n-2]
+
+    return psi
+
+
+def homodyne_pdf(rho, q, m_omega_over_hbar):
+    r"""
+    Computes the probability density :math:`\bra{q}\rho\ket{q} = \sum_{nm} \psi_n(q)\rho_{nm}\psi_m(q)`
+    of the :math:`\x` quadrature of a single mode density matrix on the grid ``q``.
+
+    The memory used is proportional to the cutoff dimension times the number of grid points.
     """
-    Helper function for homodyne measurements. Computes a range of (physicist's)
-    Hermite polynomials at a particular vector.
+    psi = hermite_functions(q, m_omega_over_hbar, rho.shape[0])
+    return np.einsum('nb,nb->b', psi, rho @ psi).real
+
+
+def homodyne_samples(rho, m_omega_over_hbar, q_mag, num_bins, shots=1, coarse_bins=1000, tol=1e-12):
+    r"""
+    Samples the :math:`\x` quadrature of a single mode density matrix.
+
+    The probability density is first evaluated on a coarse grid over ``[-q_mag, q_mag]``
+    to find the interval where it is larger than ``tol`` times its maximum. This interval
+    is then refined into a grid of ``num_bins`` points, and all the shots are drawn at once
+    by inverting the cumulative distribution function, linearly interpolated between
+    the grid points.
+
+    Returns:
+        array: samples, of shape ``(shots,)``
     """
-    q_tensor = np.linspace(-q_mag, q_mag, num_bins)
-    x = np.sqrt(m_omega_over_hbar) * q_tensor
+    q = np.linspace(-q_mag, q_mag, coarse_bins)
+    pdf = homodyne_pdf(rho, q, m_omega_over_hbar)
+    support = np.flatnonzero(pdf > tol * pdf.max())
+    lo = q[max(support[0] - 1, 0)]
+    hi = q[min(support[-1] + 1, coarse_bins - 1)]
 
-    Hvals = [None] * trunc
-    Hvals[0] = 1
-    Hvals[1] = 2*x
-    for i in range(2, trunc):
-        Hvals[i] = 2*x*Hvals[i-1] - 2*(i-1)*Hvals[i-2]
+    q = np.linspace(lo, hi, num_bins)
+    pdf = np.clip(homodyne_pdf(rho, q, m_omega_over_hbar), 0, None)
+    cdf = np.concatenate([[0], np.cumsum((pdf[1:] + pdf[:-1]) / 2)])
 
-    return q_tensor, Hvals
+    return np.interp(np.random.uniform(0, cdf[-1], size=shots), cdf, q)
@@ -87,6 +87,7 @@ returned by a Gaussian backend. It extends :class:`~.BaseGaussianState`.
 For other methods available, see the :ref:`state_class`.
 
 .. autosummary::
+   all_fock_probs
    reduced_dm
 
 
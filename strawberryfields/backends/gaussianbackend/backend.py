@@ -13,13 +13,13 @@
 # limitations under the License.
 # pylint: disable=too-many-public-methods
 """Gaussian backend"""
-from numpy import empty, concatenate, array, identity, arctan2, angle, sqrt, dot, vstack
-from numpy.linalg import inv
+from numpy import concatenate, array, identity, arctan2, angle, sqrt, dot, vstack, ix_
 
 from strawberryfields.backends import BaseGaussian
+from strawberryfields.backends.base import NotApplicableError
 from strawberryfields.backends.shared_ops import changebasis
 
-from .ops import xmat
+from .ops import fock_samples, threshold_samples, xmat
 from .gaussiancircuit import GaussianModes
 from .states import GaussianState
 
@@ -213,43 +213,142 @@ class GaussianBackend(BaseGaussian):
                                 Homodyne amounts to projection onto a quadrature eigenstate. This eigenstate is approximated
                                 by a squeezed state whose variance has been squeezed to the amount eps, V_(meas) = eps**2.
                                 Perfect homodyning is obtained when eps \to 0.
+                                The number of samples ``shots`` (default 1) can also be passed. For ``shots > 1``, all the
+                                samples are drawn at once from the marginal distribution of the mode, which is then
+                                reset to the vacuum state, without conditioning the remaining modes on the outcomes.
+                                Hence the measurement must then be ``terminal`` (see :meth:`measure_fock`), and
+                                cannot be post-selected.
         Returns:
-            float or Tensor: measurement outcomes
+            float or array: measurement outcome, or for ``shots > 1``, an array containing the outcome of each shot
         """
         if "eps" in kwargs:
             eps = kwargs["eps"]
         else:
             eps = 0.0002
 
+        shots = kwargs.get("shots", 1)
+        if shots > 1:
+            if select is not None:
+                raise NotApplicableError("Post-selection is not supported for homodyne measurements with several shots.")
+            if not kwargs.get("terminal", True):
+                raise NotApplicableError("Homodyne measurements with several shots must be terminal.")
+
         self.circuit.phase_shift(-phi, mode)
 
         if select is None:
-            qs = self.circuit.homodyne(mode, eps)[0]
+            qs = self.circuit.homodyne(mode, eps, shots=shots)[..., 0]
         else:
             val = select * 2/sqrt(2*self.circuit.hbar)
             qs = self.circuit.post_select_homodyne(mode, val, eps)
 
         return qs * sqrt(2*self.circuit.hbar)/2
 
-    def measure_heterodyne(self, mode, select=None):
+    def measure_heterodyne(self, mode, select=None, **kwargs):
         """
         Perform a heterodyne measurement on the specified modes.
 
         Args:
             mode (int): index of mode where operation is carried out
+            **kwargs: Can be used to pass the number of samples ``shots`` (default 1). For ``shots > 1``,
+                all the samples are drawn at once from the marginal distribution of the mode, which is then
+                reset to the vacuum state, without conditioning the remaining modes on the outcomes.
+                Hence the measurement must then be ``terminal`` (see :meth:`measure_fock`), and
+                cannot be post-selected.
         Returns:
-            complex : measurement outcome
+            complex or array: measurement outcome, or for ``shots > 1``, an array containing the outcome of each shot
         """
+        shots = kwargs.get("shots", 1)
+        if shots > 1:
+            if select is not None:
+                raise NotApplicableError("Post-selection is not supported for heterodyne measurements with several shots.")
+            if not kwargs.get("terminal", True):
+                raise NotApplicableError("Heterodyne measurements with several shots must be terminal.")
+
         if select is None:
             m = identity(2)
-            res = 0.5*self.circuit.measure_dyne(m, [mode])
-            return res[0]+1j*res[1]
+            res = 0.5*self.circuit.measure_dyne(m, [mode], shots=shots)
+            return res[..., 0]+1j*res[..., 1]
 
         res = select
         self.circuit.post_select_heterodyne(mode, select)
 
         return res
 
+    def measure_fock(self, modes, select=None, **kwargs):
+        """
+        Perform a photon number measurement on the specified modes.
+
+        The photon numbers are sampled mode by mode from the conditional
+        Fock probabilities of the state, see :func:`~.gaussianbackend.ops.fock_samples`.
+        Since the conditional state after the measurement is not Gaussian, the measured
+        modes are reset to the vacuum state, and the remaining modes are left in their
+        reduced state, averaged over the measurement outcomes.
+
+        Args:
+            modes (list[int]): indices of modes where the operation is carried out
+            select (list[int]): (Optional) desired values of measurement results.
+                Post-selection is not supported by the Gaussian backend.
+            **kwargs: Can be used to pass the number of samples ``shots`` (default 1),
+                all drawn from the current state, and the Fock basis truncation ``cutoff``
+                of the photon numbers (default 10). The flag ``terminal`` (default True)
+                must not be False, i.e. no later operation may act on the measured modes,
+                or depend on the measurement results.
+
+        Returns:
+            list[int] or array[int]: measurement outcomes, or for ``shots > 1``,
+            an array of shape ``(shots, len(modes))`` containing the outcomes of each shot
+        """
+        if select is not None:
+            raise NotApplicableError("Post-selection of Fock measurements is not supported by the Gaussian backend.")
+        if not kwargs.get("terminal", True):
+            raise NotApplicableError("The Gaussian backend only supports terminal Fock measurements.")
+
+        shots = kwargs.get("shots", 1)
+        cutoff = kwargs.get("cutoff", 10)
+        samples = fock_samples(self.circuit, modes, shots, cutoff)
+
+        for mode in modes:
+            self.circuit.loss(0.0, mode)
+
+        if shots == 1:
+            return [int(n) for n in samples[0]]
+        return samples
+
+    def measure_threshold(self, modes, select=None, **kwargs):
+        """
+        Perform a threshold measurement on the specified modes.
+
+        The clicks are sampled mode by mode from the conditional click
+        probabilities of the state, see :func:`~.gaussianbackend.ops.threshold_samples`.
+        As for :meth:`measure_fock`, the measured modes are reset to the vacuum state.
+
+        Args:
+            modes (list[int]): indices of modes where the operation is carried out
+            select (list[int]): (Optional) desired values of measurement results.
+                Post-selection is not supported by the Gaussian backend.
+            **kwargs: Can be used to pass the number of samples ``shots`` (default 1),
+                all drawn from the current state. As for :meth:`measure_fock`, the
+                measurement must be ``terminal``.
+
+        Returns:
+            list[int] or array[int]: measurement outcomes, 1 for a click and 0 otherwise, or for
+            ``shots > 1``, an array of shape ``(shots, len(modes))`` containing the outcomes of each shot
+        """
+        if select is not None:
+            raise NotApplicableError("Post-selection of threshold measurements is not supported by the Gaussian backend.")
+        if not kwargs.get("terminal", True):
+            raise NotApplicableError("The Gaussian backend only supports terminal threshold measurements.")
+
+        shots = kwargs.get("shots", 1)
+        samples = threshold_samples(self.circuit, modes, shots)
+
+        for mode in modes:
+            self.circuit.loss(0.0, mode)
+
+        if shots == 1:
+            return [int(c) for c in samples[0]]
+        return samples
+
     def prepare_gaussian_state(self, r, V, modes):
         r"""Prepare the given Gaussian state (via the provided vector of
         means and the covariance matrix) in the specified modes.
@@ -329,35 +428,31 @@ class GaussianBackend(BaseGaussian):
             modes = list(range(len(self.get_modes())))
 
         listmodes = list(concatenate((2*array(modes), 2*array(modes)+1)))
-        covmat = empty((2*len(modes), 2*len(modes)))
+        covmat = m[ix_(listmodes, listmodes)]
         means = r[listmodes]
 
-        for i, ii in enumerate(listmodes):
-            for j, jj in enumerate(listmodes):
-                covmat[i, j] = m[ii, jj]
-
         means *= sqrt(2*self.circuit.hbar)/2
         covmat *= self.circuit.hbar/2
 
         mode_names = ["q[{}]".format(i) for i in array(self.get_modes())[modes]]
 
         # qmat and amat
-        qmat = self.circuit.qmat()
-        N = qmat.shape[0]//2
+        N = self.circuit.nlen
 
         # work out if qmat and Amat need to be reduced
         if 1 <= len(modes) < N:
             # reduce qmat
-            ind = concatenate([array(modes), N+array(modes)])
-            rows = ind.reshape((-1, 1))
-            cols = ind.reshape((1, -1))
-            qmat = qmat[rows, cols]
+            qmat = self.circuit.qmat(modes)
+
+            qmatinv = self.circuit.qmatinv(modes)
 
             # calculate reduced Amat
             N = qmat.shape[0]//2
-            Amat = dot(xmat(N), identity(2*N)-inv(qmat))
+            Amat = dot(xmat(N), identity(2*N)-qmatinv)
         else:
+            qmat = self.circuit.qmat()
+            qmatinv = self.circuit.qmatinv()
             Amat = self.circuit.Amat()
 
         return GaussianState((means, covmat), len(modes), qmat, Amat,
-                             hbar=self.circuit.hbar, mode_names=mode_names)
+                             hbar=self.circuit.hbar, mode_names=mode_names, qmatinv=qmatinv)
@@ -24,7 +24,12 @@ class GaussianModes:
     continuous variable modes in the symplectic basis as encoded in a
     covariance matrix and a mean vector.
     The modes are initialized in the (multimode) vacuum state,
-    The state of the modes is manipulated by calling the various methods."""
+    The state of the modes is manipulated by calling the various methods.
+
+    Derived quantities of the state, such as the covariance matrices and the
+    Q matrix and its inverse, are cached until the state is next modified.
+    Every method that modifies the state calls :meth:`_modified`, which increments
+    :attr:`version` and empties the cache. The cached arrays are read-only."""
     # pylint: disable=too-many-public-methods
 
     def __init__(self, num_subsystems, hbar):
@@ -51,22 +56,23 @@ class GaussianModes:
             raise ValueError("Number of modes must be an integer")
 
         self.hbar = hbar
+        #: int: number of modifications of the state, used to invalidate the cached derived quantities
+        self.version = 0
         self.reset(num_subsystems)
 
     def add_mode(self, n=1):
         """add mode to the circuit"""
+        self._modified()
         newnlen = self.nlen+n
         newnmat = np.zeros((newnlen, newnlen), dtype=complex)
         newmmat = np.zeros((newnlen, newnlen), dtype=complex)
         newmean = np.zeros(newnlen, dtype=complex)
         newactive = list(np.arange(newnlen, dtype=int))
 
-        for i in range(self.nlen):
-            newmean[i] = self.mean[i]
-            newactive[i] = self.active[i]
-            for j in range(self.nlen):
-                newnmat[i, j] = self.nmat[i, j]
-                newmmat[i, j] = self.mmat[i, j]
+        newmean[:self.nlen] = self.mean
+        newactive[:self.nlen] = self.active
+        newnmat[:self.nlen, :self.nlen] = self.nmat
+        newmmat[:self.nlen, :self.nlen] = self.mmat
 
         self.mean = newmean
         self.nmat = newnmat
@@ -103,6 +109,23 @@ class GaussianModes:
         self.mean = np.zeros(self.nlen, dtype=complex)
         self.active = list(np.arange(self.nlen, dtype=int))
 
+        self._modified()
+
+    def _modified(self):
+        """Marks the state as modified, invalidating the cached derived quantities.
+        Must be called by every method that modifies ``nmat``, ``mmat``, ``mean`` or ``nlen``."""
+        self.version += 1
+        self._cache = {}
+
+    def _cached(self, key, fn):
+        """Returns the derived quantity ``fn()`` of the current state, computing it
+        only if it is not already in the cache under ``key``."""
+        if key not in self._cache:
+            value = fn()
+            value.setflags(write=False)
+            self._cache[key] = value
+        return self._cache[key]
+
     def get_modes(self):
         """return the modes currently active"""
         return [x for x in self.active if x is not None]
@@ -113,6 +136,8 @@ class GaussianModes:
         if self.active[i] is None:
             raise ValueError("Cannot displace mode, mode does not exist")
 
+        self._modified()
+
         self.mean[i] += beta
 
     def squeeze(self, r, phi, k):
@@ -120,6 +145,8 @@ class GaussianModes:
         if self.active[k] is None:
             raise ValueError("Cannot squeeze mode, mode does not exist")
 
+        self._modified()
+
         phase = np.exp(1j*phi)
         phase2 = phase*phase
         sh = np.sinh(r)
@@ -134,15 +161,13 @@ class GaussianModes:
         # Update displacement of mode k
         self.mean[k] = alphak*ch-phase*np.conj(alphak)*sh
         # Update covariance matrix elements. Only the k column and row of nmat and mmat need to be updated.
-        # First update the diagonal elements
+        # First update the column k, then overwrite the diagonal elements
+        self.nmat[k] = -(sh*np.conj(phase)*mk) + ch*nk
+        self.mmat[k] = ch*mk - phase*sh*nk
+
         self.nmat[k, k] = sh2 - phase*shch*np.conj(mk[k]) - shch*np.conj(phase)*mk[k] + ch2*nk[k] + sh2*nk[k]
         self.mmat[k, k] = -(phase*shch) + phase2*sh2*np.conj(mk[k]) + ch2*mk[k] - 2*phase*shch*nk[k]
 
-        # Update the column k
-        for l in np.delete(np.arange(self.nlen), k):
-            self.nmat[k, l] = -(sh*np.conj(phase)*mk[l]) + ch*nk[l]
-            self.mmat[k, l] = ch*mk[l] - phase*sh*nk[l]
-
         # Update row k
         self.nmat[:, k] = np.conj(self.nmat[k])
         self.mmat[:, k] = self.mmat[k]
@@ -152,19 +177,22 @@ class GaussianModes:
         if self.active[k] is None:
             raise ValueError("Cannot phase shift mode, mode does not exist")
 
+        self._modified()
+
         phase = np.exp(1j*phi)
         phase2 = phase*phase
         # Update displacement of mode k
         self.mean[k] = self.mean[k]*phase
 
         # Update covariance matrix elements. Only the k column and row of nmat and mmat need to be updated.
-        # First update the diagonal elements
-        self.mmat[k][k] = phase2*self.mmat[k][k]
+        # First update the column k, then the diagonal elements
+        nkk = self.nmat[k, k]
+        mkk = self.mmat[k, k]
+        self.nmat[k] *= np.conj(phase)
+        self.mmat[k] *= phase
 
-        # Update the column k
-        for l in np.delete(np.arange(self.nlen), k):
-            self.nmat[k][l] = np.conj(phase)*self.nmat[k][l]
-            self.mmat[k][l] = phase*self.mmat[k][l]
+        self.nmat[k, k] = nkk
+        self.mmat[k, k] = phase2*mkk
 
         # Update row k
         self.nmat[:, k] = np.conj(self.nmat[k])
@@ -178,6 +206,8 @@ class GaussianModes:
         if k == l:
             raise ValueError("Cannot use the same mode for beamsplitter inputs")
 
+        self._modified()
+
         phase = np.exp(1j*phi)
         phase2 = phase*phase
         sh = np.sin(theta)
@@ -197,7 +227,13 @@ class GaussianModes:
         self.mean[k] = ch*alphak+phase*sh*alphal
         self.mean[l] = ch*alphal-np.conj(phase)*sh*alphak
         # Update covariance matrix elements. Only the k and l columns and rows of nmat and mmat need to be updated.
-        # First update the (k,k), (k,l), (l,l), and (l,l) elements
+        # First update the columns k and l
+        self.nmat[k] = ch*nk + sh*np.conj(phase)*nl
+        self.mmat[k] = ch*mk + phase*sh*ml
+        self.nmat[l] = -(phase*sh*nk) + ch*nl
+        self.mmat[l] = -(sh*np.conj(phase)*mk) + ch*ml
+
+        # Then overwrite the (k,k), (k,l), (l,l), and (l,l) elements
         self.nmat[k][k] = ch2*nk[k] + phase*shch*nk[l] + shch*np.conj(phase)*nl[k] + sh2*nl[l]
         self.nmat[k][l] = -(shch*np.conj(phase)*nk[k]) + ch2*nk[l] - sh2*np.conj(phase2)*nl[k] + shch*np.conj(phase)*nl[l]
         self.nmat[l][k] = np.conj(self.nmat[k][l])
@@ -208,13 +244,6 @@ class GaussianModes:
         self.mmat[l][k] = self.mmat[k][l]
         self.mmat[l][l] = sh2*np.conj(phase2)*mk[k] - 2*shch*np.conj(phase)*ml[k] + ch2*ml[l]
 
-        # Update columns k and l
-        for i in np.delete(np.arange(self.nlen), (k, l)):
-            self.nmat[k][i] = ch*nk[i] + sh*np.conj(phase)*nl[i]
-            self.mmat[k][i] = ch*mk[i] + phase*sh*ml[i]
-            self.nmat[l][i] = -(phase*sh*nk[i]) + ch*nl[i]
-            self.mmat[l][i] = -(sh*np.conj(phase)*mk[i]) + ch*ml[i]
-
         # Update rows k and l
         self.nmat[:, k] = np.conj(self.nmat[k])
         self.mmat[:, k] = self.mmat[k]
@@ -229,6 +258,10 @@ class GaussianModes:
         Said permutation matrix is implemented in the function changebasis(n) where n is
         the number of modes.
         """
+        return self._cached("scovmatxp", self._scovmatxp)
+
+    def _scovmatxp(self):
+        """Computes the symmetric ordered covariance matrix in the xp ordering"""
         mm11 = self.nmat+np.transpose(self.nmat)+self.mmat+np.conj(self.mmat)+np.identity(self.nlen)
         mm12 = 1j*(-np.transpose(self.mmat)+np.transpose(np.conj(self.mmat))+np.transpose(self.nmat)-self.nmat)
         mm22 = self.nmat+np.transpose(self.nmat)-self.mmat-np.conj(self.mmat)+np.identity(self.nlen)
@@ -239,14 +272,17 @@ class GaussianModes:
         """Constructs and returns the symmetric ordered covariance matrix as defined in [1]
         """
         rotmat = changebasis(self.nlen)
-        return np.dot(np.dot(rotmat, self.scovmatxp()), np.transpose(rotmat))
+        return self._cached("scovmat", lambda: np.dot(np.dot(rotmat, self.scovmatxp()), np.transpose(rotmat)))
 
     def smean(self):
         r"""the symmetric mean $[q_1,p_1,q_2,p_2,...,q_n,p_n]$"""
+        return self._cached("smean", self._smean)
+
+    def _smean(self):
+        """Computes the symmetric mean"""
         r = np.empty(2*self.nlen)
-        for i in range(self.nlen):
-            r[2*i] = 2*self.mean[i].real
-            r[2*i+1] = 2*self.mean[i].imag
+        r[0::2] = 2*self.mean.real
+        r[1::2] = 2*self.mean.imag
         return r
 
     def fromsmean(self, r, modes=None):
@@ -256,6 +292,7 @@ class GaussianModes:
             r (array): vector of means in :math:`(x_1,p_1,x_2,p_2,\dots)` ordering
             modes (Sequence): sequence of modes corresponding to the vector of means
         """
+        self._modified()
         mode_list = modes
         if modes is None:
             mode_list = range(self.nlen)
@@ -282,6 +319,8 @@ class GaussianModes:
             if n > self.nlen:
                 raise ValueError("Covariance matrix is larger than the number of subsystems.")
 
+        self._modified()
+
         # convert to xp ordering
         rotmat = changebasis(n)
         VV = np.dot(np.dot(np.transpose(rotmat), V), rotmat)
@@ -306,6 +345,17 @@ class GaussianModes:
         if modes is None:
             modes = list(range(self.nlen))
 
+        return self._cached(("qmat", tuple(modes)), lambda: self._qmat(modes))
+
+    def qmatinv(self, modes=None):
+        """ Inverse of the covariance matrix for the Q function"""
+        if modes is None:
+            modes = list(range(self.nlen))
+
+        return self._cached(("qmatinv", tuple(modes)), lambda: np.linalg.inv(self.qmat(modes)))
+
+    def _qmat(self, modes):
+        """Computes the covariance matrix for the Q function of the given modes"""
         rows = np.reshape(modes, [-1, 1])
         cols = np.reshape(modes, [1, -1])
 
@@ -319,8 +369,7 @@ class GaussianModes:
         if modes is None:
             modes = list(range(self.nlen))
 
-        Q = self.qmat(modes)
-        Qi = np.linalg.inv(Q)
+        Qi = self.qmatinv(modes)
         delta = self.mean[modes]-alpha
 
         delta = np.concatenate((delta, np.conjugate(delta)))
@@ -336,9 +385,8 @@ class GaussianModes:
 
     def Amat(self):
         """ Constructs the A matrix from Hamilton's paper"""
-        ######### this needs to be conjugated
-        sigmaq = np.concatenate((np.concatenate((np.transpose(self.nmat), self.mmat), axis=1), np.concatenate((np.transpose(np.conjugate(self.mmat)), self.nmat), axis=1)), axis=0)+np.identity(2*self.nlen)
-        return np.dot(ops.xmat(self.nlen), np.identity(2*self.nlen)-np.linalg.inv(sigmaq))
+        # the matrix to invert is the complex conjugate of qmat, whose inverse is cached
+        return self._cached("Amat", lambda: np.dot(ops.xmat(self.nlen), np.identity(2*self.nlen)-np.conj(self.qmatinv())))
 
     def loss(self, T, k):
         r"""Implements a loss channel in mode k by amplitude loss amount \sqrt{T}
@@ -346,6 +394,7 @@ class GaussianModes:
         if self.active[k] is None:
             raise ValueError("Cannot apply loss channel, mode does not exist")
 
+        self._modified()
         sqrtT = np.sqrt(T)
         self.nmat[k] = sqrtT*self.nmat[k]
         self.mmat[k] = sqrtT*self.mmat[k]
@@ -365,11 +414,13 @@ class GaussianModes:
             raise ValueError("Cannot apply loss channel, mode does not exist")
 
         self.loss(T, k)
+        self._modified()
         self.nmat += (1-T)*nbar
 
     def init_thermal(self, population, mode):
         """ Initializes a state of mode in a thermal state with the given population"""
         self.loss(0.0, mode)
+        self._modified()
         self.nmat[mode][mode] = population
 
     def is_vacuum(self, tol=0.0):
@@ -377,12 +428,16 @@ class GaussianModes:
         fid = self.fidelity_vacuum()
         return np.abs(fid-1) <= tol
 
-    def measure_dyne(self, covmat, indices):
+    def measure_dyne(self, covmat, indices, shots=1):
         """ Performs the general-dyne measurement specified in covmat, the indices should correspond
         with the ordering of the covmat of the measurement
         covmat specifies a gaussian effect via its covariance matrix. For more information see
         Quantum Continuous Variables: A Primer of Theoretical Methods
         by Alessio Serafini page 129
+
+        If shots > 1, the outcomes of all shots are drawn at once from the marginal
+        distribution of the measured modes, which are then reset to the vacuum state.
+        The remaining modes are not conditioned on the outcomes.
         """
         if covmat.shape != (2*len(indices), 2*len(indices)):
             raise ValueError("Covariance matrix size does not match indices provided")
@@ -392,6 +447,14 @@ class GaussianModes:
                 raise ValueError("Cannot apply homodyne measurement, mode does not exist")
 
         expind = np.concatenate((2*np.array(indices), 2*np.array(indices)+1))
+
+        if shots > 1:
+            C = self.scovmat()[np.ix_(expind, expind)]
+            vm = np.random.multivariate_normal(self.smean()[expind], C, size=shots)
+            for i in indices:
+                self.loss(0.0, i)
+            return vm
+
         mp = self.scovmat()
         (A, B, C) = ops.chop_in_blocks(mp, expind)
         V = A-np.dot(np.dot(B, np.linalg.inv(C+covmat)), np.transpose(B))
@@ -407,11 +470,11 @@ class GaussianModes:
         self.fromsmean(va)
         return vm
 
-    def homodyne(self, n, eps=0.0002):
+    def homodyne(self, n, eps=0.0002, shots=1):
         """ Performs a homodyne measurement by calling measure dyne an giving it the
         covariance matrix of a squeezed state whose x quadrature has variance eps**2"""
         covmat = np.diag(np.array([eps**2, 1./eps**2]))
-        res = self.measure_dyne(covmat, [n])
+        res = self.measure_dyne(covmat, [n], shots=shots)
 
         return res
 
@@ -461,6 +524,7 @@ class GaussianModes:
 
     def apply_u(self, U):
         """ Transforms the state according to the linear optical unitary that maps a[i] \to U[i, j]^*a[j]"""
+        self._modified()
         self.mean = np.dot(np.conj(U), self.mean)
         self.nmat = np.dot(np.dot(U, self.nmat), np.conj(np.transpose(U)))
         self.mmat = np.dot(np.dot(np.conj(U), self.mmat), np.conj(np.transpose(U)))
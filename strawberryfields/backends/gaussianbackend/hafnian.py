@@ -0,0 +1,270 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""
+Hafnians and loop hafnians
+==========================
+
+.. currentmodule:: strawberryfields.backends.gaussianbackend.hafnian
+
+The hafnian of a symmetric :math:`2m\times 2m` matrix :math:`A` is the sum over the
+perfect matchings :math:`\mu` of the complete graph with :math:`2m` vertices,
+
+.. math:: \text{haf}(A) = \sum_{\mu\in\text{PMP}(2m)}\prod_{(i,j)\in\mu} A_{ij},
+
+and the loop hafnian additionally sums over matchings in which vertices
+may be matched to themselves, with weight :math:`A_{ii}`. Photon number
+probabilities of Gaussian states are loop hafnians of a matrix built from the
+state's :math:`A` matrix, where modes with more than one photon correspond
+to repeated rows and columns.
+
+Two algorithms are provided:
+
+* :func:`hafnian` uses the eigenvalue-trace formula, which sums over the
+  :math:`2^m` subsets of pairs of rows and requires :math:`O(m^3 2^m)` operations.
+
+* :func:`hafnian_repeated` uses the finite difference (Kan) formula for matrices with
+  repeated rows and columns, which requires :math:`O(n^2\prod_i(r_i+1))` operations,
+  where :math:`r_i` is the number of repetitions of row :math:`i`. If expanding the
+  repeated rows is cheaper, it falls back to :func:`hafnian`.
+
+Both are vectorized over the terms of the sum, which are processed in chunks
+of bounded size.
+
+When the loop hafnians for *all* repetitions up to a cutoff are needed, as for
+the full photon number distribution of a state, :func:`hafnian_tensor` computes
+them together by a recursion over the repetitions, at a cost of :math:`O(n)`
+operations per entry.
+
+.. autosummary::
+    hafnian
+    hafnian_repeated
+    hafnian_tensor
+"""
+from itertools import combinations, islice, product
+
+import numpy as np
+from scipy.special import binom, factorial
+
+CHUNK_SIZE = 2**12
+"""int: number of terms of the hafnian sums that are evaluated in a single vectorized batch"""
+
+
+def _chunks(iterable, width):
+    """Yields the tuples produced by ``iterable`` as integer arrays with
+    ``width`` columns and at most ``CHUNK_SIZE`` rows"""
+    while True:
+        chunk = np.fromiter((i for t in islice(iterable, CHUNK_SIZE) for i in t), dtype=int)
+        if chunk.size == 0:
+            return
+        yield chunk.reshape(-1, width)
+
+
+def _exp_series(coeffs):
+    r"""Coefficient of :math:`\eta^m` in :math:`\exp(\sum_{k=1}^m c_k\eta^k)`.
+
+    Args:
+        coeffs (array): array of shape ``(batch, m)`` containing :math:`c_1,\dots,c_m`
+
+    Returns:
+        array: the coefficients, of shape ``(batch,)``
+    """
+    batch, m = coeffs.shape
+    g = np.zeros((m+1, batch), dtype=np.complex128)
+    g[0] = 1
+    k = np.arange(1, m+1)
+    for j in range(1, m+1):
+        # g_j = 1/j sum_k k c_k g_{j-k}
+        g[j] = np.einsum("bk,kb->b", k[:j]*coeffs[:, :j], g[j-1::-1]) / j
+    return g[m]
+
+
+def hafnian(A, loop=False):
+    r"""Returns the hafnian, or loop hafnian, of a symmetric matrix.
+
+    Uses the eigenvalue-trace formula
+
+    .. math::
+        \text{haf}(A) = \sum_{S\subseteq[m]}(-1)^{m-|S|}[\eta^m]
+        \exp\left(\sum_{k=1}^m \left(\frac{\text{tr}(A_SX_S)^k}{2k}
+        + \frac{v_S^TX_S(A_SX_S)^{k-1}v_S}{2}\right)\eta^k\right),
+
+    where :math:`A_S` is the submatrix of the rows and columns :math:`S\cup(S+m)`,
+    :math:`X=\begin{bmatrix}0&I\\I&0\end{bmatrix}`, and :math:`v` is the diagonal
+    of :math:`A` for the loop hafnian, and zero otherwise.
+
+    Args:
+        A (array): a symmetric matrix
+        loop (bool): whether to return the loop hafnian
+
+    Returns:
+        complex: the (loop) hafnian of ``A``
+    """
+    A = np.asarray(A, dtype=np.complex128)
+    n = len(A)
+
+    if n % 2 == 1:
+        if not loop:
+            return 0j
+        # an extra vertex which can only be matched to itself, with weight 1
+        A = np.pad(A, [(0, 1), (0, 1)])
+        A[-1, -1] = 1
+        n += 1
+
+    m = n // 2
+    if m == 0:
+        return 1+0j
+
+    # swap the halves of the columns, i.e. AX = A @ X
+    AX = np.roll(A, m, axis=1)
+    v = np.diag(A) if loop else None
+
+    total = 0j
+    for size in range(1, m+1):
+        for subsets in _chunks(combinations(range(m), size), size):
+            idx = np.concatenate([subsets, subsets+m], axis=1)
+            AXS = AX[idx[:, :, None], idx[:, None, :]]
+
+            # traces of the powers of AX_S from its eigenvalues
+            powers = np.linalg.eigvals(AXS)[:, :, None] ** np.arange(1, m+1)
+            coeffs = np.sum(powers, axis=1) / (2*np.arange(1, m+1))
+
+            if loop:
+                vS = v[idx]
+                w = np.roll(vS, size, axis=1)
+                for k in range(m):
+                    coeffs[:, k] += np.sum(w*vS, axis=1) / 2
+                    w = np.einsum("bi,bij->bj", w, AXS)
+
+            total += (-1)**(m-size) * np.sum(_exp_series(coeffs))
+
+    return total
+
+
+def hafnian_repeated(A, rpt, mu=None, loop=False):
+    r"""Returns the hafnian, or loop hafnian, of a matrix with repeated rows and columns.
+
+    The matrix whose hafnian is computed is obtained from the :math:`n\times n` matrix
+    :math:`A` by repeating row and column :math:`i` a number :math:`r_i` of times.
+    Uses the finite difference formula
+
+    .. math::
+        \text{lhaf}(A_r) = \sum_{\nu_1=0}^{r_1}\cdots\sum_{\nu_n=0}^{r_n}
+        (-1)^{\sum_i(r_i-\nu_i)}\prod_i\binom{r_i}{\nu_i}
+        \sum_{j=0}^{\lfloor N/2\rfloor}\frac{(h^TAh/2)^j(\mu^Th)^{N-2j}}{j!(N-2j)!},
+
+    where :math:`h=\nu-r/2`, :math:`N=\sum_i r_i`, and :math:`\mu` are the loop weights
+    (for the hafnian, only the term :math:`j=N/2` is kept). This requires
+    :math:`\prod_i(r_i+1)` terms; if the :math:`2^{N/2}` subsets of :func:`hafnian`
+    applied to the expanded matrix are fewer, the latter is used instead.
+
+    Args:
+        A (array): a symmetric matrix
+        rpt (Sequence[int]): the number of repetitions of each row and column
+        mu (array): the loop weights of each row, used by the loop hafnian.
+            If ``None``, the diagonal of ``A`` is used.
+        loop (bool): whether to return the loop hafnian
+
+    Returns:
+        complex: the (loop) hafnian of the matrix with repeated rows and columns
+    """
+    A = np.asarray(A, dtype=np.complex128)
+    rpt = np.asarray(rpt, dtype=int)
+
+    if mu is None:
+        mu = np.diag(A)
+    mu = np.asarray(mu, dtype=np.complex128)
+
+    # rows that are not repeated at all do not contribute
+    keep = rpt > 0
+    A = A[np.ix_(keep, keep)]
+    mu = mu[keep]
+    rpt = rpt[keep]
+
+    N = int(np.sum(rpt))
+    if N % 2 == 1 and not loop:
+        return 0j
+    if N == 0:
+        return 1+0j
+
+    if np.prod(rpt+1.0) * len(rpt)**2 > 2.0**(N/2) * N**3:
+        idx = np.repeat(np.arange(len(rpt)), rpt)
+        expanded = A[np.ix_(idx, idx)]
+        if loop:
+            np.fill_diagonal(expanded, mu[idx])
+        return hafnian(expanded, loop=loop)
+
+    j = np.arange(N//2+1) if loop else np.array([N//2])
+    weights = 1 / (factorial(j) * factorial(N-2*j))
+
+    total = 0j
+    for nu in _chunks(product(*[range(r+1) for r in rpt]), len(rpt)):
+        h = nu - rpt/2
+        pref = (-1.0)**np.sum(rpt-nu, axis=1) * np.prod(binom(rpt, nu), axis=1)
+        quad = np.einsum("bi,ij,bj->b", h, A, h) / 2
+        lin = h @ mu
+        terms = quad[:, None]**j * lin[:, None]**(N-2*j) * weights
+        total += np.sum(pref * np.sum(terms, axis=1))
+
+    return total
+
+
+def hafnian_tensor(A, mu, cutoff):
+    r"""Returns the loop hafnians of a matrix for all repetitions of its rows and columns
+    below a cutoff.
+
+    The loop hafnians :math:`G_r=\text{lhaf}(A_r)` of the matrices with repeated rows
+    and columns, with loop weights :math:`\mu`, are the derivatives
+    :math:`G_r=\partial^r F(0)` of the generating function
+    :math:`F(x)=\exp(x^TAx/2+\mu^Tx)`. They are therefore (up to signs and scaling)
+    multidimensional Hermite polynomials, and satisfy the recursion
+
+    .. math:: G_{r+e_i} = \mu_i G_r + \sum_j A_{ij} r_j G_{r-e_j}.
+
+    The recursion is applied along the first axis, after the slice :math:`r_1=0` has
+    been obtained recursively from the remaining rows, so that every step updates a
+    whole slice of the tensor at once.
+
+    Args:
+        A (array): a symmetric :math:`n\times n` matrix
+        mu (array): the loop weights of each row
+        cutoff (int): the repetitions of each row run from 0 to ``cutoff-1``
+
+    Returns:
+        array: the loop hafnians, of shape ``[cutoff]*n``, where the entry
+        :math:`(r_1,\dots,r_n)` is ``hafnian_repeated(A, r, mu=mu, loop=True)``
+    """
+    A = np.asarray(A, dtype=np.complex128)
+    mu = np.asarray(mu, dtype=np.complex128)
+    n = len(mu)
+
+    if n == 0:
+        return np.ones([], dtype=np.complex128)
+
+    G = np.zeros([cutoff]*n, dtype=np.complex128)
+    G[0] = hafnian_tensor(A[1:, 1:], mu[1:], cutoff)
+
+    r = np.arange(cutoff)
+    for k in range(cutoff-1):
+        # G_{(k+1, s)} = mu_1 G_{(k, s)} + A_11 k G_{(k-1, s)} + sum_j A_1j s_j G_{(k, s-e_j)}
+        G[k+1] = mu[0] * G[k]
+        if k > 0:
+            G[k+1] += A[0, 0] * k * G[k-1]
+        for j in range(1, n):
+            shape = [1]*(n-1)
+            shape[j-1] = cutoff-1
+            upper = (slice(None),)*(j-1) + (slice(1, None),)
+            lower = (slice(None),)*(j-1) + (slice(None, -1),)
+            G[k+1][upper] += A[0, j] * r[1:].reshape(shape) * G[k][lower]
+
+    return G
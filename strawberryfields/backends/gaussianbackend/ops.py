@@ -20,6 +20,8 @@ import numpy as np
 from scipy.linalg import sqrtm
 from scipy.special import binom, factorial
 
+from .hafnian import hafnian_repeated, hafnian_tensor
+
 
 def fock_amplitudes_one_mode(alpha, mat, cutoff, tol=1e-8):
     """ Returns the Fock space density matrix of gaussian state characterized
@@ -312,43 +314,295 @@ def gen_indices(l):
     return x
 
 
-def fock_prob(s2, ocp, tol=1.0e-13):
+def fock_prob(s2, ocp, tol=1.0e-13, method="hafnian"):
     """
     Calculates the probability of measuring the gaussian state s2 in the photon number
-    occupation pattern ocp"""
-    beta = np.concatenate((s2.mean, np.conjugate(s2.mean)))
+    occupation pattern ocp.
+
+    The probability is proportional to the loop hafnian of the A matrix of the state,
+    with rows and columns repeated according to the occupation pattern, and the loops
+    given by the displacement of the state.
+
+    Args:
+        s2 (GaussianModes): the state
+        ocp (Sequence[int]): the photon number of each mode
+        tol (float): displacements with norm below this tolerance are neglected
+        method (str): either ``'hafnian'``, to use :func:`~.hafnian.hafnian_repeated`,
+            or ``'partitions'``, to sum explicitly over all partitions of the photons
+            into singles and pairs
+    """
     nmodes = s2.nlen
-    sqinv = np.linalg.inv(s2.qmat())
-    pref = np.exp(-0.5*np.dot(np.dot(beta, sqinv), np.conjugate(beta)))
-    sqd = np.sqrt(1/np.linalg.det(s2.qmat()).real)
+    pref, gamma, A = _fock_prob_factors(s2.mean, s2.qmat(), s2.qmatinv())
     if not all(p == 0 for p in ocp):
-        gamma = np.dot(np.dot(xmat(nmodes), np.conjugate(sqinv)), beta)
-        ind = gen_indices(ocp)
-        ina = tuple(np.concatenate((ind, ind+nmodes)))
-        A = s2.Amat()
-        doubles = True
         if np.linalg.norm(s2.mean)*np.sqrt(2) < tol:
             # This is equivalent to np.linalg.norm(beta) < tol but twice as fast.
             # Is the sqrt(2) really needed?
             singles = False
         else:
             singles = True
-        part1 = partitions(ina, singles, doubles)
 
-        ssum = 0.0
-        for i in part1:
-            pp = 1.0
-            if isinstance(i[0], np.uint8):
-                i = (i,)
+        if method == "hafnian":
+            rpt = np.concatenate((ocp, ocp))
+            ssum = hafnian_repeated(A, rpt, mu=gamma, loop=singles)
+        elif method == "partitions":
+            ind = gen_indices(ocp)
+            ina = tuple(np.concatenate((ind, ind+nmodes)))
+            ssum = _partition_sum(A, gamma, ina, singles)
+        else:
+            raise ValueError("Unknown method '{}' for computing Fock probabilities".format(method))
 
-            for j in i:
-                if len(j) == 1:
-                    pp *= gamma[j]
-                if len(j) == 2:
-                    pp *= A[j]
+        return (pref*ssum).real/np.prod(factorial(ocp))
+    else:
+        return pref.real/np.prod(factorial(ocp))
 
-            ssum += pp
 
-        return (pref*sqd*ssum).real/np.prod(factorial(ocp))
+def all_fock_probs(s2, cutoff, modes=None):
+    """
+    Calculates the probabilities of measuring the gaussian state s2 in all the photon
+    number occupation patterns with less than cutoff photons in each mode.
+
+    The loop hafnians of all the patterns are obtained together with
+    :func:`~.hafnian.hafnian_tensor`, which computes the loop hafnians of the A matrix
+    for all repetitions of the rows corresponding to the creation and annihilation
+    operators of each mode. The probabilities are the entries with the same
+    repetitions for both. This requires memory for ``cutoff**(2*nmodes)`` complex
+    numbers.
+
+    Args:
+        s2 (GaussianModes): the state
+        cutoff (int): the Fock space truncation
+        modes (Sequence[int]): if given, the probabilities of the reduced state of these modes
+
+    Returns:
+        array: the probabilities, of shape ``[cutoff]*nmodes``
+    """
+    if modes is None:
+        modes = list(range(s2.nlen))
+        qmat, qmatinv = s2.qmat(), s2.qmatinv()
     else:
-        return (pref*sqd).real/np.prod(factorial(ocp))
+        modes = list(modes)
+        qmat, qmatinv = s2.qmat(modes), s2.qmatinv(modes)
+
+    nmodes = len(modes)
+    pref, gamma, A = _fock_prob_factors(s2.mean[modes], qmat, qmatinv)
+    lhafs = hafnian_tensor(A, gamma, cutoff)
+
+    # diagonal entries, where the creation and annihilation repetitions agree
+    lhafs = np.einsum(lhafs, list(range(nmodes))*2, list(range(nmodes)))
+
+    n = np.arange(cutoff)
+    fac = np.ones([cutoff]*nmodes)
+    for k in range(nmodes):
+        shape = [1]*nmodes
+        shape[k] = cutoff
+        fac = fac * factorial(n).reshape(shape)
+
+    return (pref*lhafs).real/fac
+
+
+def fock_samples(s2, modes, shots, cutoff, max_size=2**22):
+    r"""
+    Samples the photon numbers of the given modes of the gaussian state s2.
+
+    The photon numbers are drawn mode by mode from the chain rule
+    :math:`p(n_1,\dots,n_k)=\prod_j p(n_j|n_1,\dots,n_{j-1})`, where each
+    conditional probability is obtained from the marginal Fock probabilities of the
+    reduced state of the first modes. If the marginal probability tensor of the
+    first modes needs less than ``max_size`` loop hafnians, it is computed in one
+    pass with :func:`all_fock_probs`. Otherwise, the conditional distribution
+    of each distinct sequence of previous outcomes is computed once with
+    :func:`~.hafnian.hafnian_repeated`, for all the shots that share it.
+    All shots are then drawn at once by inverting the conditional distribution functions.
+
+    Photon numbers are truncated at ``cutoff-1``, and the conditional probabilities
+    are renormalized over the truncated range.
+
+    Args:
+        s2 (GaussianModes): the state
+        modes (Sequence[int]): the modes to sample, in order
+        shots (int): the number of samples
+        cutoff (int): the Fock space truncation
+        max_size (int): the largest number of loop hafnians computed in one pass
+
+    Returns:
+        array[int]: the samples, of shape ``(shots, len(modes))``
+    """
+    modes = list(modes)
+    samples = np.zeros((shots, len(modes)), dtype=int)
+    n = np.arange(cutoff)
+
+    for k in range(len(modes)):
+        if cutoff**(2*(k+1)) <= max_size:
+            probs = all_fock_probs(s2, cutoff, modes[:k+1])
+            cond = probs[tuple(samples[:, :k].T)].reshape(-1, cutoff)
+        else:
+            pref, gamma, A = _fock_prob_factors(s2.mean[modes[:k+1]], s2.qmat(modes[:k+1]), s2.qmatinv(modes[:k+1]))
+
+            # conditional distributions of the distinct outcomes on the previous modes
+            prefixes, inverse = np.unique(samples[:, :k], axis=0, return_inverse=True)
+            cond = np.empty((len(prefixes), cutoff))
+            for i, prefix in enumerate(prefixes):
+                for m in n:
+                    rpt = np.append(prefix, m)
+                    lhaf = hafnian_repeated(A, np.concatenate((rpt, rpt)), mu=gamma, loop=True)
+                    cond[i, m] = (pref*lhaf).real/np.prod(factorial(rpt))
+            cond = cond[inverse.ravel()]
+
+        cdf = np.cumsum(np.maximum(cond, 0), axis=1)
+        cdf /= cdf[:, -1:]
+        u = np.random.random((shots, 1))
+        samples[:, k] = np.minimum(np.sum(u > cdf, axis=1), cutoff-1)
+
+    return samples
+
+
+def threshold_prob(s2, clicks):
+    r"""
+    Calculates the probability of the click pattern clicks of threshold detectors
+    measuring the gaussian state s2.
+
+    The probability is the Torontonian of the state, obtained by inclusion-exclusion
+    from the vacuum probabilities of its reduced states,
+
+    .. math:: p(S) = \sum_{Z\subseteq S}(-1)^{|Z|}\,p_0(\bar{S}\cup Z),
+
+    where :math:`S` are the modes that click and :math:`p_0(W)` is the probability
+    of detecting no photons in the modes :math:`W`. This requires :math:`2^{|S|}`
+    determinants.
+
+    Args:
+        s2 (GaussianModes): the state
+        clicks (Sequence[int]): 1 for each mode that clicks, 0 otherwise
+
+    Returns:
+        float: the probability
+    """
+    clicks = np.asarray(clicks, dtype=bool)
+    masks, signs = _inclusion_exclusion(~clicks, np.flatnonzero(clicks))
+    return np.sum(signs*_vacuum_probs(s2.mean, s2.qmat(), masks))
+
+
+def threshold_samples(s2, modes, shots):
+    r"""
+    Samples the click patterns of threshold detectors measuring the given modes of
+    the gaussian state s2.
+
+    The clicks are drawn mode by mode from the chain rule
+    :math:`p(c_1,\dots,c_k)=\prod_j p(c_j|c_1,\dots,c_{j-1})`, where the probability
+    of no click after the previous outcomes is obtained from :func:`threshold_prob`
+    applied to the reduced state of the first modes. These are computed once for
+    each distinct sequence of previous outcomes, with the vacuum probabilities of all
+    of them evaluated together, and all shots are drawn at once.
+
+    Args:
+        s2 (GaussianModes): the state
+        modes (Sequence[int]): the modes to sample, in order
+        shots (int): the number of samples
+
+    Returns:
+        array[int]: the samples, of shape ``(shots, len(modes))``, with 1 for a click and 0 otherwise
+    """
+    modes = list(modes)
+    mean = s2.mean[modes]
+    qmat = s2.qmat(modes)
+    nmodes = len(modes)
+
+    samples = np.zeros((shots, nmodes), dtype=int)
+    # probability of the outcomes of each shot so far
+    probs = np.ones(shots)
+
+    for k in range(nmodes):
+        prefixes, first, inverse = np.unique(samples[:, :k], axis=0, return_index=True, return_inverse=True)
+        inverse = inverse.ravel()
+
+        # probability of each distinct prefix followed by no click on mode k
+        masks, signs, owners = [], [], []
+        for i, prefix in enumerate(prefixes):
+            dark = np.zeros(nmodes, dtype=bool)
+            dark[:k+1] = True
+            dark[:k] = prefix == 0
+            m, sg = _inclusion_exclusion(dark, np.flatnonzero(prefix))
+            masks.append(m)
+            signs.append(sg)
+            owners.append(np.full(len(sg), i))
+
+        # many terms are shared between prefixes
+        masks, terms = np.unique(np.concatenate(masks), axis=0, return_inverse=True)
+        vac = _vacuum_probs(mean, qmat, masks)[terms.ravel()]
+        no_click = np.zeros(len(prefixes))
+        np.add.at(no_click, np.concatenate(owners), np.concatenate(signs)*vac)
+
+        prefix_probs = probs[first]
+        cond = np.clip(no_click/prefix_probs, 0, 1)
+
+        click = np.random.random(shots) >= cond[inverse]
+        samples[:, k] = click
+        probs = np.where(click, (prefix_probs - no_click)[inverse], no_click[inverse])
+
+    return samples
+
+
+def _inclusion_exclusion(dark, clicks):
+    """Returns the masks of the modes without photons, and the signs, of the terms of
+    the inclusion-exclusion sum over the subsets of clicks"""
+    bits = (np.arange(2**len(clicks))[:, None] >> np.arange(len(clicks))) & 1
+    masks = np.tile(dark, (len(bits), 1))
+    masks[:, clicks] = bits
+    return masks, (-1.0)**np.sum(bits, axis=1)
+
+
+def _vacuum_probs(mean, qmat, masks):
+    """Returns the probabilities of detecting no photons in each set of modes given by
+    the rows of masks, for the gaussian state with the given mean and Q matrix"""
+    nmodes = len(mean)
+    beta = np.concatenate((mean, np.conjugate(mean)))
+    probs = np.ones(len(masks))
+
+    sizes = np.sum(masks, axis=1)
+    for size in np.unique(sizes[sizes > 0]):
+        rows = np.flatnonzero(sizes == size)
+        idx = np.nonzero(masks[rows])[1].reshape(-1, size)
+        idx = np.concatenate((idx, idx+nmodes), axis=1)
+
+        # batched determinants and quadratic forms of the reduced Q matrices
+        Q = qmat[idx[:, :, None], idx[:, None, :]]
+        b = beta[idx]
+        quad = np.einsum("bi,bi->b", b, np.linalg.solve(Q, np.conjugate(b)[:, :, None])[:, :, 0])
+        probs[rows] = (np.exp(-0.5*quad)/np.sqrt(np.linalg.det(Q))).real
+
+    return probs
+
+
+def _fock_prob_factors(mean, qmat, sqinv):
+    """Returns the normalization prefactor, the loop weights and the A matrix
+    entering the Fock probabilities of the gaussian state with the given mean,
+    Q matrix and inverse Q matrix"""
+    nmodes = len(mean)
+    beta = np.concatenate((mean, np.conjugate(mean)))
+    pref = np.exp(-0.5*np.dot(np.dot(beta, sqinv), np.conjugate(beta)))
+    sqd = np.sqrt(1/np.linalg.det(qmat).real)
+    X = xmat(nmodes)
+    gamma = np.dot(np.dot(X, np.conjugate(sqinv)), beta)
+    A = np.dot(X, np.identity(2*nmodes) - np.conjugate(sqinv))
+    return pref*sqd, gamma, A
+
+
+def _partition_sum(A, gamma, ina, singles):
+    """Sums the products of A (for pairs) and gamma (for singles) over all partitions of ina"""
+    part1 = partitions(ina, singles, True)
+
+    ssum = 0.0
+    for i in part1:
+        pp = 1.0
+        if isinstance(i[0], np.uint8):
+            i = (i,)
+
+        for j in i:
+            if len(j) == 1:
+                pp *= gamma[j]
+            if len(j) == 2:
+                pp *= A[j]
+
+        ssum += pp
+
+    return ssum
@@ -14,10 +14,12 @@
 
 """Module containing Gaussian backend specific extensions to BaseGaussianState"""
 
+from functools import lru_cache
+
 import numpy as np
 
 from ..states import BaseGaussianState
-from .ops import fock_amplitudes_one_mode, fock_prob, sm_fidelity
+from .ops import all_fock_probs, fock_amplitudes_one_mode, fock_prob, sm_fidelity
 
 
 class GaussianState(BaseGaussianState):
@@ -33,10 +35,19 @@ class GaussianState(BaseGaussianState):
             :math:`[\x,\p]=i\hbar`
         mode_names (Sequence): (optional) this argument contains a list providing mode names
             for each mode in the state
+        qmatinv (array): (optional) the inverse of ``qmat``, if already known.
+            Otherwise, it is computed when first needed.
     """
-    def __init__(self, state_data, num_modes, qmat, Amat, hbar=2., mode_names=None):
+    def __init__(self, state_data, num_modes, qmat, Amat, hbar=2., mode_names=None, qmatinv=None):
         # pylint: disable=too-many-arguments
         super().__init__(state_data, num_modes, hbar, mode_names)
+        self._init_args = (state_data, num_modes, qmat, Amat, hbar, mode_names)
+
+        # the inverse of qmat is computed at most once, when first needed
+        if qmatinv is None:
+            qmatinv = lru_cache(maxsize=None)(lambda: np.linalg.inv(qmat))
+        else:
+            qmatinv = (lambda inverse=qmatinv: inverse)
 
         # some of the Gaussian backend operations expect as input a 'GaussianMode' class.
         # The following mini class matches the attributes expected for fock_probs and fidelity.
@@ -44,9 +55,15 @@ class GaussianState(BaseGaussianState):
             "nlen" : self._modes,
             "mean" : self._alpha,
             "qmat": (lambda: qmat),
+            "qmatinv": qmatinv,
             "Amat": (lambda: Amat)
         })
 
+    def __reduce__(self):
+        # the _gmode class is created dynamically and cannot be pickled,
+        # so the state is pickled through its constructor arguments
+        return (self.__class__, self._init_args)
+
     def reduced_dm(self, modes, **kwargs):
         r"""Returns the reduced density matrix in the Fock basis for a particular mode.
 
@@ -84,6 +101,32 @@ class GaussianState(BaseGaussianState):
 
         return fock_prob(self._gmode, ocp)
 
+    def all_fock_probs(self, **kwargs):
+        r"""Probabilities of all possible Fock basis states for the current circuit state.
+
+        For example, in the case of 3 modes, this method allows the Fock state probability
+        :math:`|\braketD{0,2,3}{\psi}|^2` to be returned via
+
+        .. code-block:: python
+
+            probs = state.all_fock_probs(cutoff=5)
+            probs[0,2,3]
+
+        The probabilities of all the patterns are computed together, by a recursion
+        over the photon numbers of each mode, rather than one pattern at a time as
+        with :meth:`fock_prob`. This requires memory for :math:`D^{2N}` complex numbers,
+        where :math:`N` is the number of modes.
+
+        Keyword Args:
+            cutoff (int): the Fock basis truncation :math:`D`, default 10
+
+        Returns:
+            array: array of dimension :math:`\underbrace{D\times D\times D\cdots\times D}_{\text{num modes}}`
+            containing the Fock state probabilities
+        """
+        cutoff = kwargs.get('cutoff', 10)
+        return all_fock_probs(self._gmode, cutoff)
+
     def mean_photon(self, mode, **kwargs):
         mu, cov = self.reduced_gaussian([mode])
         mean = (np.trace(cov) + mu.T @ mu)/(2*self._hbar) - 1/2
@@ -108,8 +151,7 @@ class GaussianState(BaseGaussianState):
         if len(alpha_list) != self._modes:
             raise ValueError("alpha_list must be same length as the number of modes")
 
-        Q = self._gmode.qmat()
-        Qi = np.linalg.inv(Q)
+        Qi = self._gmode.qmatinv()
         delta = self._alpha - alpha_list
 
         delta = np.concatenate((delta, delta.conj()))
@@ -16,7 +16,7 @@
 import os
 import functools
 import re
-import itertools
+import tempfile
 from bisect import bisect
 import pkg_resources
 
@@ -29,6 +29,15 @@ from scipy.linalg import qr
 DATA_PATH = pkg_resources.resource_filename('strawberryfields', 'backends/data')
 def_type = np.complex128
 
+FACTOR_CACHE_VERSION = 1
+"""int: version of the on-disk factor cache layout. Bump this whenever the
+contents or layout of the cached prefactor arrays change, so that stale
+files are never memory-mapped."""
+
+FACTOR_CACHE_ENV = "SF_FACTOR_CACHE_DIR"
+"""str: environment variable setting the factor cache directory. If it is not set,
+the factors are only cached in memory."""
+
 
 #================================+
 #   Fock space shared operations |
@@ -83,15 +92,16 @@ def generate_bs_factors(D):
     Args:
         D (int): generate prefactors for :math:`D` dimensions.
     """
-    prefac = np.zeros([D]*5, dtype=def_type)
+    N, n, M, k = np.ogrid[:D, :D, :D, :D]
+    m = N+M-n
 
-    for (N, M, n) in itertools.product(*([range(D)]*3)):
-        m = N+M-n
-        k = np.arange(n+1)
-        if 0 <= m < D:
-            # pylint: disable=bad-whitespace
-            prefac[N,n,M,m,:n+1] = (-1.0)**(N-k) \
-                * np.sqrt(binom(n, k)*binom(m, N-k)*binom(N, k)*binom(M, n-k))
+    # only the photon-number conserving blocks 0 <= m < D, with k <= n, are non-zero
+    mask = (0 <= m) & (m < D) & (k <= n)
+    N, n, M, m, k = [np.broadcast_to(i, mask.shape)[mask] for i in (N, n, M, m, k)]
+
+    prefac = np.zeros([D]*5, dtype=def_type)
+    prefac[N, n, M, m, k] = np.power(-1.0, N-k) \
+        * np.sqrt(binom(n, k)*binom(m, N-k)*binom(N, k)*binom(M, n-k))
 
     return prefac
 
@@ -265,6 +275,145 @@ def load_squeeze_factors(D, directory=None):
     return np.reshape(prefac.toarray(), [load_dim]*3)
 
 
+def factor_cache_dir(directory=None):
+    r"""Return the directory holding the memory-mappable factor cache.
+
+    The on-disk cache is opt-in. The location is the ``directory`` argument,
+    or else the ``SF_FACTOR_CACHE_DIR`` environment variable, which is read
+    at every call. If neither is given, the factors are only cached in memory.
+
+    Args:
+        directory (str): explicit cache directory
+
+    Returns:
+        str or None: path to the (possibly not yet existing) cache directory,
+        or None if the factors should not be cached on disk
+    """
+    if directory is not None:
+        return directory
+    return os.environ.get(FACTOR_CACHE_ENV) or None
+
+
+def _cached_factors(name, D, build, directory=None):
+    r"""Return the factors from the cache, creating the cache entry if needed.
+
+    Args:
+        name (str): name of the factors, used in the file name
+        D (int): the cutoff dimension
+        build (callable): function of ``D`` returning the factor array
+        directory (str): cache directory, see :func:`factor_cache_dir`
+
+    Returns:
+        array: the (read-only) factor array
+    """
+    return _load_factors(name, D, build, factor_cache_dir(directory))
+
+
+@functools.lru_cache()
+def _load_factors(name, D, build, directory):
+    r"""Load factors from the ``.npy`` cache in the given directory.
+
+    The array is returned memory-mapped and read-only, so that the pages are
+    shared between all processes loading the same cutoff. Cache entries are
+    written to a temporary file and atomically renamed into place, so
+    concurrent workers never observe a partially written file.
+
+    If ``directory`` is None, or the cache directory cannot be written to,
+    the freshly built array is returned instead.
+
+    Args:
+        name (str): name of the factors, used in the file name
+        D (int): the cutoff dimension
+        build (callable): function of ``D`` returning the factor array
+        directory (str, None): cache directory
+
+    Returns:
+        array: the (read-only) factor array
+    """
+    if directory is None:
+        prefac = np.ascontiguousarray(build(D))
+        prefac.flags.writeable = False
+        return prefac
+
+    filename = "fock_{}_factors_v{}_{}.npy".format(name, FACTOR_CACHE_VERSION, D)
+    path = os.path.join(directory, filename)
+
+    try:
+        return np.load(path, mmap_mode='r')
+    except (OSError, ValueError):
+        pass
+
+    prefac = np.ascontiguousarray(build(D))
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=filename, suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, prefac)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    except OSError:
+        prefac.flags.writeable = False
+        return prefac
+
+    return np.load(path, mmap_mode='r')
+
+
+def _build_bs_factors(D):
+    """Beamsplitter factors for cutoff ``D``, using the shipped data files if possible."""
+    try:
+        return load_bs_factors(D)[:D, :D, :D, :D, :D]
+    except FileNotFoundError:
+        return generate_bs_factors(D)
+
+
+def _build_squeeze_factors(D):
+    """Squeezing factors for cutoff ``D``, using the shipped data files if possible."""
+    try:
+        return load_squeeze_factors(D)[:D, :D, :D]
+    except FileNotFoundError:
+        return generate_squeeze_factors(D)
+
+
+def cached_bs_factors(D, directory=None):
+    r"""Cached beamsplitter factors in the Fock basis.
+
+    Returns the same array as :func:`generate_bs_factors`. If a factor cache
+    directory is configured, the array is backed by a versioned ``.npy`` file
+    in it that is generated on first use. Since the array is then memory-mapped
+    read-only, concurrently running processes share a single copy of the
+    :math:`D^5` factors. Otherwise, the array is only cached in memory.
+
+    Args:
+        D (int): the cutoff dimension
+        directory (str): cache directory, see :func:`factor_cache_dir`
+
+    Returns:
+        array: read-only array of shape ``[D]*5``
+    """
+    return _cached_factors("beamsplitter", D, _build_bs_factors, directory)
+
+
+def cached_squeeze_factors(D, directory=None):
+    r"""Cached squeezing factors in the Fock basis.
+
+    Returns the same array as :func:`generate_squeeze_factors`, backed by a
+    versioned ``.npy`` file in the factor cache directory if one is configured,
+    see :func:`cached_bs_factors`.
+
+    Args:
+        D (int): the cutoff dimension
+        directory (str): cache directory, see :func:`factor_cache_dir`
+
+    Returns:
+        array: read-only array of shape ``[D]*3``
+    """
+    return _cached_factors("squeeze", D, _build_squeeze_factors, directory)
+
+
 #================================+
 # Phase space shared operations  |
 #================================+
@@ -116,7 +116,6 @@ Code details
 """
 import abc
 import string
-from itertools import chain
 from copy import copy
 
 import numpy as np
@@ -410,6 +409,13 @@ class BaseState(abc.ABC):
 class BaseFockState(BaseState):
     r"""Class for the representation of quantum states in the Fock basis.
 
+    Derived quantities, such as the density matrix of a pure state, the Fock state
+    probabilities and reduced density matrices, are computed on demand from the
+    ket or density matrix of the state, and memoised as read-only arrays.
+    The public accessors return copies of the memoised arrays, which the caller
+    is free to modify. Quantities of pure states are computed from the ket without
+    forming the density matrix of all modes.
+
     Args:
         state_data (array): the state representation in the Fock basis
         num_modes (int): the number of modes in the state
@@ -429,10 +435,20 @@ class BaseFockState(BaseState):
         self._cutoff = cutoff_dim
         self._pure = pure
         self._basis = 'fock'
+        self._cache = {}
 
         self._str = "<FockState: num_modes={}, cutoff={}, pure={}, hbar={}>".format(
             self.num_modes, self._cutoff, self._pure, self._hbar)
 
+    def _cached(self, key, fn):
+        """Returns the derived quantity ``fn()`` of the state, computing it
+        only if it is not already in the cache under ``key``."""
+        if key not in self._cache:
+            value = fn()
+            value.setflags(write=False)
+            self._cache[key] = value
+        return self._cache[key]
+
     def __eq__(self, other):
         """Equality operator for BaseFockState.
 
@@ -487,12 +503,16 @@ class BaseFockState(BaseState):
         """
         # pylint: disable=unused-argument
         if self._pure:
-            left_str = [indices[i] for i in range(0, 2 * self._modes, 2)]
-            right_str = [indices[i] for i in range(1, 2 * self._modes, 2)]
-            out_str = [indices[: 2 * self._modes]]
-            einstr = ''.join(left_str + [','] + right_str + ['->'] + out_str)
-            rho = np.einsum(einstr, self.ket(), self.ket().conj())
-            return rho
+            return self._dm().copy()
+        return self.data
+
+    def _dm(self):
+        """The memoised, read-only density matrix of the state, see :meth:`dm`."""
+        if self._pure:
+            # integer einsum subscripts, so that the number of modes is not limited by the alphabet
+            ket = self.ket()
+            return self._cached("dm", lambda: np.einsum(
+                ket, range(0, 2 * self._modes, 2), ket.conj(), range(1, 2 * self._modes, 2), range(2 * self._modes)))
 
         return self.data
 
@@ -512,9 +532,8 @@ class BaseFockState(BaseState):
             return np.vdot(self.ket(), self.ket()).real  # <s|s>
 
         # need some extra steps to trace over multimode matrices
-        eqn_indices = [[indices[idx]] * 2 for idx in range(self._modes)] #doubled indices [['i','i'],['j','j'], ... ]
-        eqn = "".join(chain.from_iterable(eqn_indices)) # flatten indices into a single string 'iijj...'
-        return np.einsum(eqn, self.dm()).real
+        eqn_indices = [idx // 2 for idx in range(2 * self._modes)] # doubled indices [0, 0, 1, 1, ...]
+        return np.einsum(self._dm(), eqn_indices, []).real
 
     def all_fock_probs(self, **kwargs):
         r"""Probabilities of all possible Fock basis states for the current circuit state.
@@ -532,19 +551,18 @@ class BaseFockState(BaseState):
                 containing the Fock state probabilities, where :math:`D` is the Fock basis cutoff truncation
         """
         # pylint: disable=unused-argument
-        if self._pure:
-            s = np.ravel(self.ket()) # into 1D array
-            return np.reshape((s * s.conj()).real, [self._cutoff]*self._modes)
+        return self._all_fock_probs().copy()
+
+    def _all_fock_probs(self):
+        """The memoised, read-only Fock state probabilities, see :meth:`all_fock_probs`."""
+        def probs():
+            if self._pure:
+                return np.abs(self.ket()) ** 2
 
-        s = self.dm()
-        num_axes = len(s.shape)
-        evens = [k for k in range(0, num_axes, 2)]
-        odds = [k for k in range(1, num_axes, 2)]
-        flat_size = np.prod([s.shape[k] for k in range(0, num_axes, 2)])
-        transpose_list = evens + odds
-        probs = np.diag(np.reshape(np.transpose(s, transpose_list), [flat_size, flat_size])).real
+            # the diagonal of the density matrix, without copying the full matrix
+            return np.einsum(self._dm(), [i // 2 for i in range(2 * self._modes)], range(self._modes)).real
 
-        return np.reshape(probs, [self._cutoff]*self._modes)
+        return self._cached("all_fock_probs", probs)
 
     #=====================================================
     # the following methods are overwritten from BaseState
@@ -554,6 +572,12 @@ class BaseFockState(BaseState):
         if modes == list(range(self._modes)):
             # reduced state is full state
             return self.dm() # pragma: no cover
+        return self._reduced_dm(modes).copy()
+
+    def _reduced_dm(self, modes):
+        """The memoised, read-only reduced density matrix of the given modes, see :meth:`reduced_dm`."""
+        if modes == list(range(self._modes)):
+            return self._dm() # pragma: no cover
 
         if isinstance(modes, int):
             modes = [modes]
@@ -564,20 +588,21 @@ class BaseFockState(BaseState):
             raise ValueError("The number of specified modes cannot "
                              "be larger than the number of subsystems.")
 
-        # reduce rho down to specified subsystems
-        keep_indices = indices[: 2 * len(modes)]
-        trace_indices = indices[2 * len(modes) : len(modes) + self._modes]
-
-        ind = [i * 2 for i in trace_indices]
-        ctr = 0
+        def reduce():
+            traced = [i for i in range(self._modes) if i not in modes]
+            if self._pure:
+                # contract the ket with its conjugate over the traced modes only
+                ket = self.ket()
+                rho = np.tensordot(ket, ket.conj(), axes=(traced, traced))
+                k = len(modes)
+                return np.transpose(rho, [i // 2 + (i % 2) * k for i in range(2 * k)])
 
-        for m in range(self._modes):
-            if m in modes:
-                ind.insert(m, keep_indices[2 * ctr : 2 * (ctr + 1)])
-                ctr += 1
+            # reduce rho down to specified subsystems
+            ind = [i if i // 2 in modes else 2 * (i // 2) for i in range(2 * self._modes)]
+            keep_indices = [i for i in range(2 * self._modes) if i // 2 in modes]
+            return np.einsum(self._dm(), ind, keep_indices)
 
-        indStr = ''.join(ind) + '->' + keep_indices
-        return np.einsum(indStr, self.dm())
+        return self._cached(("reduced_dm", tuple(modes)), reduce)
 
     def fock_prob(self, n, **kwargs):
         # pylint: disable=unused-argument
@@ -590,30 +615,19 @@ class BaseFockState(BaseState):
         if self._pure:
             return np.abs(self.ket()[tuple(n)])**2
 
-        return self.dm()[tuple([n[i//2] for i in range(len(n)*2)])].real
+        return self._dm()[tuple([n[i//2] for i in range(len(n)*2)])].real
 
     def mean_photon(self, mode, **kwargs):
         # pylint: disable=unused-argument
         n = np.arange(self._cutoff)
-        probs = np.diagonal(self.reduced_dm(mode))
+        probs = np.diagonal(self._reduced_dm(mode))
         mean = np.sum(n*probs).real
         var = np.sum(n**2*probs).real - mean**2
         return mean, var
 
     def fidelity(self, other_state, mode, **kwargs):
         # pylint: disable=unused-argument
-        max_indices = len(indices) // 2
-
-        if self.num_modes > max_indices:
-            raise Exception("fidelity method can only support up to {} modes".format(max_indices))
-
-        left_indices = indices[:mode]
-        eqn_left = "".join([i*2 for i in left_indices])
-        reduced_dm_indices = indices[mode:mode + 2]
-        right_indices = indices[mode + 2:self._modes + 1]
-        eqn_right = "".join([i*2 for i in right_indices])
-        eqn = "".join([eqn_left, reduced_dm_indices, eqn_right]) + "->" + reduced_dm_indices
-        rho_reduced = np.einsum(eqn, self.dm())
+        rho_reduced = self._reduced_dm(mode)
 
         return np.dot(np.conj(other_state), np.dot(rho_reduced, other_state)).real
 
@@ -624,12 +638,7 @@ class BaseFockState(BaseState):
 
     def fidelity_coherent(self, alpha_list, **kwargs):
         # pylint: disable=too-many-locals,unused-argument
-        if self.is_pure:
-            mode_size = 1
-            s = self.ket()
-        else:
-            mode_size = 2
-            s = self.dm()
+        s = self.ket() if self.is_pure else self._dm()
 
         if not hasattr(alpha_list, "__len__"):
             alpha_list = [alpha_list] # pragma: no cover
@@ -641,25 +650,21 @@ class BaseFockState(BaseState):
             [np.exp(-0.5 * np.abs(a) ** 2) * (a) ** n / np.sqrt(factorial(n)) for n in range(dim)]
         )
 
-        if self._modes == 1:
-            multi_cohs_vec = coh(alpha_list[0], self._cutoff)
-        else:
-            multi_cohs_list = [coh(alpha_list[idx], dim) for idx, dim in enumerate(s.shape[::mode_size])]
-            eqn = ",".join(indices[:self._modes]) + "->" + indices[:self._modes]
-            multi_cohs_vec = np.einsum(eqn, *multi_cohs_list) # tensor product of specified coherent states
-
-        if self.is_pure:
-            ovlap = np.vdot(multi_cohs_vec, s)
-            return np.abs(ovlap) ** 2
-
-        bra_indices = indices[:2 * self._modes:2]
-        ket_indices = indices[1:2 * self._modes:2]
-        new_eqn_lhs = ",".join([bra_indices, ket_indices])
-        new_eqn_rhs = "".join(bra_indices[idx] + ket_indices[idx] for idx in range(self._modes))
-        outer_prod_eqn = new_eqn_lhs + "->" + new_eqn_rhs
-        multi_coh_matrix = np.einsum(outer_prod_eqn, multi_cohs_vec, np.conj(multi_cohs_vec))
-
-        return np.vdot(s, multi_coh_matrix).real
+        if not self.is_pure:
+            # contract the density matrix with the coherent states one mode at a time,
+            # without forming the projector onto the multimode coherent state
+            r = s
+            for alpha, dim in zip(alpha_list, s.shape[::2]):
+                c = coh(alpha, dim)
+                r = np.tensordot(c.conj(), np.tensordot(r, c, axes=(1, 0)), axes=(0, 0))
+            return r.real[()]
+
+        # contract the ket with the coherent states one mode at a time,
+        # without forming the multimode coherent state
+        ovlap = s
+        for alpha, dim in zip(alpha_list, s.shape):
+            ovlap = np.tensordot(coh(alpha, dim).conj(), ovlap, axes=(0, 0))
+        return np.abs(ovlap[()]) ** 2
 
     def wigner(self, mode, xvec, pvec):
         r"""Calculates the discretized Wigner function of the specified mode.
@@ -683,7 +688,7 @@ class BaseFockState(BaseState):
             array: 2D array of size [len(xvec), len(pvec)], containing reduced Wigner function
             values for specified x and p values.
         """
-        rho = self.reduced_dm(mode)
+        rho = self._reduced_dm(mode)
         Q, P = np.meshgrid(xvec, pvec)
         A = (Q + P * 1.0j) / (2*np.sqrt(self._hbar/2))
 
@@ -731,7 +736,7 @@ class BaseFockState(BaseState):
         xphi = xphi[:self._cutoff, :self._cutoff]
         xphisq = xphisq[:self._cutoff, :self._cutoff]
 
-        rho = self.reduced_dm(mode)
+        rho = self._reduced_dm(mode)
 
         mean = np.trace(np.dot(xphi, rho)).real
         var = np.trace(np.dot(xphisq, rho)).real - mean**2
@@ -798,7 +803,7 @@ class BaseFockState(BaseState):
         # There are non-zero elements of A and/or d
         # therefore there are quadratic and/or linear terms.
         # find the reduced density matrix
-        rho = self.reduced_dm(modes=ex_modes)
+        rho = self._reduced_dm(ex_modes)
 
         # generate vector of quadrature operators
         # this array will have shape [2*num_modes] + [dim]*(2*num_modes)
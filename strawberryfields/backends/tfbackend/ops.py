@@ -35,7 +35,7 @@ import tensorflow as tf
 import numpy as np
 from scipy.special import binom, factorial
 
-from strawberryfields.backends.shared_ops import generate_bs_factors, load_bs_factors, save_bs_factors, squeeze_parity
+from strawberryfields.backends.shared_ops import generate_bs_factors, load_bs_factors, save_bs_factors, squeeze_parity, cached_bs_factors
 
 def_type = tf.complex64
 max_num_indices = len(indices)
@@ -58,18 +58,16 @@ def mixed(pure_state, batched=False):
         pure_state = tf.expand_dims(pure_state, 0) # add in fake batch dimension
     batch_offset = 1
     num_modes = len(pure_state.shape) - batch_offset
-    max_num = (max_num_indices - batch_offset) // 2
-    if num_modes > max_num:
-        raise ValueError("Converting state from pure to mixed currently only supported for {} modes.".format(max_num))
-    else:
-        # eqn: 'abc...xyz,ABC...XYZ->aAbBcC...xXyYzZ' (lowercase belonging to 'bra' side, uppercase belonging to 'ket' side)
-        batch_index = indices[:batch_offset]
-        bra_indices = indices[batch_offset: batch_offset + num_modes]
-        ket_indices = indices[batch_offset + num_modes : batch_offset + 2 * num_modes]
-        eqn_lhs = batch_index + bra_indices + "," + batch_index + ket_indices
-        eqn_rhs = "".join(bdx + kdx for bdx, kdx in zip(bra_indices, ket_indices))
-        eqn = eqn_lhs + "->" + batch_index + eqn_rhs
-        mixed_state = tf.einsum(eqn, pure_state, tf.conj(pure_state))
+
+    # outer product of the flattened ket with its conjugate, followed by
+    # a transpose interleaving the ket and bra indices of each mode
+    shape = tf.shape(pure_state)
+    flat = tf.reshape(pure_state, [shape[0], -1])
+    mixed_state = tf.expand_dims(flat, 2) * tf.expand_dims(tf.conj(flat), 1)
+    mixed_state = tf.reshape(mixed_state, tf.concat([shape, shape[batch_offset:]], 0))
+    perm = [0] + [batch_offset + i + j * num_modes for i in range(num_modes) for j in range(2)]
+    mixed_state = tf.transpose(mixed_state, perm)
+
     if not batched:
         mixed_state = tf.squeeze(mixed_state, 0) # drop fake batch dimension
     return mixed_state
@@ -94,12 +92,15 @@ def get_prefac_tensor(D, directory, save):
     """Equivalent to the functionality of shared_ops the bs_factors functions from shared_ops,
     but caches the return value as a tensor. This allows us to re-use the same prefactors and save
     space on the computational graph."""
-    try:
-        prefac = load_bs_factors(D, directory)
-    except FileNotFoundError:
-        prefac = generate_bs_factors(D)
-        if save:
-            save_bs_factors(prefac, directory)
+    if directory is None:
+        prefac = cached_bs_factors(D)
+    else:
+        try:
+            prefac = load_bs_factors(D, directory)
+        except FileNotFoundError:
+            prefac = generate_bs_factors(D)
+            if save:
+                save_bs_factors(prefac, directory)
     prefac = tf.expand_dims(tf.cast(prefac[:D, :D, :D, :D, :D], def_type), 0)
     return prefac
 
@@ -329,6 +330,47 @@ def beamsplitter_matrix(t, r, D, batched=False, save=False, directory=None):
         BS_matrix = tf.squeeze(BS_matrix, [0])
     return BS_matrix
 
+def beamsplitter_matrix_recursive(t, r, D, batched=False):
+    """creates the two mode beamsplitter matrix by recursion on the input photon numbers,
+    filling only the photon-number conserving blocks in O(D^4) operations instead of
+    contracting the D^5 prefactor tensor (see fockbackend.ops.beamsplitter_recursive)"""
+    if not batched:
+        # put in a fake batch dimension for broadcasting convenience
+        t = tf.expand_dims(t, -1)
+        r = tf.expand_dims(r, -1)
+    t = tf.cast(tf.reshape(t, [-1, 1, 1]), def_type)
+    r = tf.cast(tf.reshape(r, [-1, 1, 1]), def_type)
+    sqrt = np.sqrt(np.arange(D))
+
+    def create(X, c1, c2):
+        """applies c1 a^dagger + c2 b^dagger to the output indices (axes 1 and 2) of X"""
+        extra = [1] * (len(X.shape) - 3)
+        sqrt1 = tf.cast(np.reshape(sqrt, [1, D, 1] + extra), def_type)
+        sqrt2 = tf.cast(np.reshape(sqrt, [1, 1, D] + extra), def_type)
+        pad1 = [[0, 0], [1, 0], [0, 0]] + [[0, 0]] * len(extra)
+        pad2 = [[0, 0], [0, 0], [1, 0]] + [[0, 0]] * len(extra)
+        return c1 * sqrt1 * tf.pad(X[:, :-1], pad1) + c2 * sqrt2 * tf.pad(X[:, :, :-1], pad2)
+
+    # columns |k, 0>, with indices [batch, out1, out2]
+    vac = tf.ones_like(t) * tf.cast(np.pad([[1]], [[0, D-1], [0, D-1]]), def_type)
+    columns = [vac]
+    for k in range(1, D):
+        columns.append(create(columns[-1], t, r) / sqrt[k])
+
+    # columns |k, l>, with indices [batch, out1, out2, in1]
+    columns = [tf.stack(columns, axis=-1)]
+    t, r = tf.expand_dims(t, -1), tf.expand_dims(r, -1)
+    for l in range(1, D):
+        columns.append(create(columns[-1], -tf.conj(r), t) / sqrt[l])
+
+    # [batch, out1, out2, in1, in2] -> [batch, out1, in1, out2, in2]
+    BS_matrix = tf.transpose(tf.stack(columns, axis=-1), [0, 1, 3, 2, 4])
+
+    if not batched:
+        # drop artificial batch index
+        BS_matrix = tf.squeeze(BS_matrix, [0])
+    return BS_matrix
+
 ###################################################################
 
 # Input states:
@@ -403,6 +445,32 @@ def thermal_state(nbar, D):
 
 ###################################################################
 
+def _apply_to_axes(matrix, axes, state):
+    """Applies a batched matrix to some of the axes of a batched state.
+
+    The axes of the state in ``axes`` are transposed to the end and flattened,
+    so that the matrix is applied with a single batched matrix multiplication.
+    Since no einsum equation is involved, the number of modes is not limited
+    by the number of available index letters.
+
+    Args:
+        matrix (Tensor): matrix of shape ``[batch_size, out_dim, in_dim]``, where ``in_dim``
+            is the product of the dimensions of the axes in ``axes``
+        axes (Sequence[int]): axes of the state the matrix acts on, the batch axis being axis 0
+        state (Tensor): the batched state
+
+    Returns:
+        Tensor: the state, with the output indices of the matrix taking the place of ``axes``
+    """
+    num_indices = len(state.shape)
+    perm = [0] + [i for i in range(1, num_indices) if i not in axes] + list(axes)
+    view = tf.transpose(state, perm)
+    shape = tf.shape(view)
+    view = tf.reshape(view, tf.stack([shape[0], -1, tf.reduce_prod(shape[num_indices - len(axes):])]))
+    output = tf.matmul(view, matrix, transpose_b=True)
+    output = tf.reshape(output, shape)
+    return tf.transpose(output, np.argsort(perm))
+
 # Generic Gate implementations:
 # These apply the given matrix to the specified mode(s) of in_modes
 
@@ -411,42 +479,28 @@ def single_mode_gate(matrix, mode, in_modes, pure=True, batched=False):
     'ab,cde...b...xyz->cde...a...xyz' (pure state)
     'ab,ef...bc...xyz,cd->ef...ad...xyz' (mixed state)
     """
-    if batched:
-        batch_offset = 1
-    else:
-        batch_offset = 0
-    batch_index = indices[:batch_offset]
-    left_gate_str = indices[batch_offset : batch_offset + 2] # |a><b|
+    if not batched:
+        matrix = tf.expand_dims(matrix, 0)
+        in_modes = tf.expand_dims(in_modes, 0)
+    batch_offset = 1
     num_indices = len(in_modes.shape)
     if pure:
         num_modes = num_indices - batch_offset
-        mode_size = 1
     else:
-        right_gate_str = indices[batch_offset + 2 : batch_offset + 4] # |c><d|
         num_modes = (num_indices - batch_offset) // 2
-        mode_size = 2
-    max_len = len(indices) - 2 * mode_size - batch_offset
     if num_modes == 0:
         raise ValueError("'in_modes' must have at least one mode")
-    if num_modes > max_len:
-        raise NotImplementedError("The max number of supported modes for this operation is currently {}".format(max_len))
     if mode < 0 or mode >= num_modes:
         raise ValueError("'mode' argument is not compatible with number of in_modes")
+
+    if pure:
+        output = _apply_to_axes(matrix, [batch_offset + mode], in_modes)
     else:
-        other_modes_indices = indices[batch_offset + 2 * mode_size : batch_offset + (1 + num_modes) * mode_size]
-        if pure:
-            eqn_lhs = "{},{}{}{}{}".format(batch_index + left_gate_str, batch_index, other_modes_indices[:mode * mode_size], left_gate_str[1], other_modes_indices[mode * mode_size:])
-            eqn_rhs = "".join([batch_index, other_modes_indices[:mode * mode_size], left_gate_str[0], other_modes_indices[mode * mode_size:]])
-        else:
-            eqn_lhs = "{},{}{}{}{}{},{}".format(batch_index + left_gate_str, batch_index, other_modes_indices[:mode * mode_size], left_gate_str[1], right_gate_str[0], other_modes_indices[mode * mode_size:], batch_index + right_gate_str)
-            eqn_rhs = "".join([batch_index, other_modes_indices[:mode * mode_size], left_gate_str[0], right_gate_str[1], other_modes_indices[mode * mode_size:]])
+        output = _apply_to_axes(matrix, [batch_offset + 2 * mode], in_modes)
+        output = _apply_to_axes(tf.conj(matrix), [batch_offset + 2 * mode + 1], output)
 
-    eqn = eqn_lhs + "->" + eqn_rhs
-    einsum_inputs = [matrix, in_modes]
-    if not pure:
-        transposed_axis = [0, 2, 1] if batched else [1, 0]
-        einsum_inputs.append(tf.transpose(tf.conj(matrix), transposed_axis))
-    output = tf.einsum(eqn, *einsum_inputs)
+    if not batched:
+        output = tf.squeeze(output, 0)
     return output
 
 def two_mode_gate(matrix, mode1, mode2, in_modes, pure=True, batched=False):
@@ -454,82 +508,37 @@ def two_mode_gate(matrix, mode1, mode2, in_modes, pure=True, batched=False):
     'abcd,efg...b...d...xyz->efg...a...c...xyz' (pure state)
     'abcd,ij...be...dg...xyz,efgh->ij...af...ch...xyz' (mixed state)
     """
-    # pylint: disable=too-many-branches,too-many-statements
-    if batched:
-        batch_offset = 1
-    else:
-        batch_offset = 0
-    batch_index = indices[:batch_offset]
-    left_gate_str = indices[batch_offset : batch_offset + 4] # |a><b| |c><d|
+    if not batched:
+        matrix = tf.expand_dims(matrix, 0)
+        in_modes = tf.expand_dims(in_modes, 0)
+    batch_offset = 1
     num_indices = len(in_modes.shape)
     if pure:
         num_modes = num_indices - batch_offset
-        mode_size = 1
     else:
-        right_gate_str = indices[batch_offset + 4 : batch_offset + 8] # |e><f| |g><h|
         num_modes = (num_indices - batch_offset) // 2
-        mode_size = 2
-    max_len = (len(indices) - 4) // mode_size - batch_offset
-
     if num_modes == 0:
         raise ValueError("'in_modes' must have at least one mode")
-    if num_modes > max_len:
-        raise NotImplementedError("The max number of supported modes for this operation is currently {}".format(max_len))
+
+    min_mode = min(mode1, mode2)
+    max_mode = max(mode1, mode2)
+    if min_mode < 0 or max_mode >= num_modes or mode1 == mode2:
+        raise ValueError("One or more mode numbers are incompatible")
+
+    # |a><b| |c><d| -> |a>|c> <b|<d|
+    shape = tf.shape(matrix)
+    matrix = tf.transpose(matrix, [0, 1, 3, 2, 4])
+    matrix = tf.reshape(matrix, tf.stack([shape[0], shape[1] * shape[3], shape[2] * shape[4]]))
+
+    if pure:
+        output = _apply_to_axes(matrix, [batch_offset + mode1, batch_offset + mode2], in_modes)
     else:
-        min_mode = min(mode1, mode2)
-        max_mode = max(mode1, mode2)
-        if min_mode < 0 or max_mode >= num_modes or mode1 == mode2:
-            raise ValueError("One or more mode numbers are incompatible")
-        else:
-            other_modes_indices = indices[batch_offset + 4 * mode_size : batch_offset + 4 * mode_size + mode_size * (num_modes - 2)]
-            # build equation
-            if mode1 == min_mode:
-                lhs_min_mode_indices = left_gate_str[1]
-                lhs_max_mode_indices = left_gate_str[3]
-                rhs_min_mode_indices = left_gate_str[0]
-                rhs_max_mode_indices = left_gate_str[2]
-            else:
-                lhs_min_mode_indices = left_gate_str[3]
-                lhs_max_mode_indices = left_gate_str[1]
-                rhs_min_mode_indices = left_gate_str[2]
-                rhs_max_mode_indices = left_gate_str[0]
-            if not pure:
-                if mode1 == min_mode:
-                    lhs_min_mode_indices += right_gate_str[0]
-                    lhs_max_mode_indices += right_gate_str[2]
-                    rhs_min_mode_indices += right_gate_str[1]
-                    rhs_max_mode_indices += right_gate_str[3]
-                else:
-                    lhs_min_mode_indices += right_gate_str[2]
-                    lhs_max_mode_indices += right_gate_str[0]
-                    rhs_min_mode_indices += right_gate_str[3]
-                    rhs_max_mode_indices += right_gate_str[1]
-            eqn_lhs = "{},{}{}{}{}{}{}".format(batch_index + left_gate_str,
-                                               batch_index,
-                                               other_modes_indices[:min_mode * mode_size],
-                                               lhs_min_mode_indices,
-                                               other_modes_indices[min_mode * mode_size : (max_mode - 1) * mode_size],
-                                               lhs_max_mode_indices,
-                                               other_modes_indices[(max_mode - 1) * mode_size:])
-            if not pure:
-                eqn_lhs += "," + batch_index + right_gate_str
-            eqn_rhs = "".join([batch_index,
-                               other_modes_indices[:min_mode * mode_size],
-                               rhs_min_mode_indices,
-                               other_modes_indices[min_mode * mode_size: (max_mode - 1) * mode_size],
-                               rhs_max_mode_indices,
-                               other_modes_indices[(max_mode - 1) * mode_size:]
-                              ])
-            eqn = eqn_lhs + "->" + eqn_rhs
-            einsum_inputs = [matrix, in_modes]
-            if not pure:
-                if batched:
-                    transpose_list = [0, 2, 1, 4, 3]
-                else:
-                    transpose_list = [1, 0, 3, 2]
-                einsum_inputs.append(tf.conj(tf.transpose(matrix, transpose_list)))
-            output = tf.einsum(eqn, *einsum_inputs)
-            return output
+        output = _apply_to_axes(matrix, [batch_offset + 2 * mode1, batch_offset + 2 * mode2], in_modes)
+        output = _apply_to_axes(tf.conj(matrix), [batch_offset + 2 * mode1 + 1, batch_offset + 2 * mode2 + 1], output)
+
+    if not batched:
+        output = tf.squeeze(output, 0)
+    return output
 
 def single_mode_superop(superop, mode, in_modes, pure=True, batched=False):
     """rho_out = S[rho_in]
@@ -537,34 +546,23 @@ def single_mode_superop(superop, mode, in_modes, pure=True, batched=False):
     basic form:
     abcd,ef...klbcmn...yz->ef...kladmn...yz
     """
+    if pure:
+        in_modes = mixed(in_modes, batched)
 
-    if batched:
-        batch_offset = 1
-    else:
-        batch_offset = 0
+    if not batched:
+        superop = tf.expand_dims(superop, 0)
+        in_modes = tf.expand_dims(in_modes, 0)
+    batch_offset = 1
 
-    max_len = (len(indices) - 2) // 2 - batch_offset
-    if pure:
-        num_modes = len(in_modes.shape) - batch_offset
-    else:
-        num_modes = (len(in_modes.shape) - batch_offset) // 2
-    if num_modes > max_len:
-        raise NotImplementedError("The max number of supported modes for this operation is currently {}".format(max_len))
-    else:
-        if pure:
-            in_modes = mixed(in_modes, batched)
+    # S_{abcd} acts as the matrix S_{(ad),(bc)} on the ket and bra indices of the mode
+    shape = tf.shape(superop)
+    superop = tf.transpose(superop, [0, 1, 4, 2, 3])
+    superop = tf.reshape(superop, tf.stack([shape[0], shape[1] * shape[4], shape[2] * shape[3]]))
+    new_state = _apply_to_axes(superop, [batch_offset + 2 * mode, batch_offset + 2 * mode + 1], in_modes)
 
-        # create equation
-        batch_index = indices[:batch_offset]
-        superop_indices = indices[batch_offset : batch_offset + 4]
-        state_indices = indices[batch_offset + 4 : batch_offset + 4 + 2 * num_modes]
-        left_unchanged_indices = state_indices[:2 * mode]
-        right_unchanged_indices = state_indices[2 * mode : 2 * (num_modes - 1)]
-        eqn_lhs = ",".join([batch_index + superop_indices, batch_index + left_unchanged_indices + superop_indices[1:3] + right_unchanged_indices])
-        eqn_rhs = "".join([batch_index, left_unchanged_indices + superop_indices[0] + superop_indices[3] + right_unchanged_indices])
-        eqn = "->".join([eqn_lhs, eqn_rhs])
-        new_state = tf.einsum(eqn, superop, in_modes)
-        return new_state
+    if not batched:
+        new_state = tf.squeeze(new_state, 0)
+    return new_state
 
 ###################################################################
 
@@ -609,7 +607,7 @@ def cubic_phase(gamma, mode, in_modes, D, hbar=2, pure=True, batched=False, meth
 
 def beamsplitter(t, r, mode1, mode2, in_modes, D, pure=True, batched=False):
     """returns beamsplitter unitary matrix on specified input modes"""
-    matrix = beamsplitter_matrix(t, r, D, batched)
+    matrix = beamsplitter_matrix_recursive(t, r, D, batched)
     output = two_mode_gate(matrix, mode1, mode2, in_modes, pure, batched)
     return output
 
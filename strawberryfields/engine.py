@@ -48,6 +48,7 @@ Engine methods
 
 .. autosummary::
    run
+   run_sweep
    reset
    print_applied
    return_state
@@ -56,7 +57,9 @@ Engine methods
     The following are internal Engine methods. In most cases the user should not
     call these directly.
     .. autosummary::
-       _run_program
+       _run_program_locally
+       _apply_command
+       _lower
 
 
 .. currentmodule:: strawberryfields.engine
@@ -74,10 +77,20 @@ Code details
 """
 # pylint: disable=too-many-instance-attributes,attribute-defined-outside-init
 
+from collections import deque
 from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import numbers
+import os
+import weakref
+
+import numpy as np
 
 from .backends import load_backend
 from .backends.base import (NotApplicableError, BaseBackend)
+from .ops import (Preparation, Transformation, Decomposition, Measurement)
+from .program import (Program, CircuitError)
 
 
 class Engine:
@@ -103,6 +116,8 @@ class Engine:
         self.kwargs = kwargs
         #: float: numerical value of hbar in the (implicit) units of position * momentum
         self.hbar = kwargs.get('hbar', 2)
+        #: WeakKeyDictionary[Program, tuple]: cached execution plans of the Programs run, see :meth:`_lower`
+        self._plans = weakref.WeakKeyDictionary()
 
         if isinstance(backend, str):
             #: str: short name of the backend
@@ -130,11 +145,15 @@ class Engine:
         * List of previously run Progams is cleared.
 
         Note that the reset does nothing to any Program objects in existence, beyond erasing the measured values.
+        The execution plans of the Programs are kept, unless the keyword args change the backend options.
 
         Keyword Args:
             kwargs: The keyword args are passed on to :meth:`strawberryfields.backends.base.BaseBackend.reset`.
         """
         self.backend.reset(**kwargs)
+        if kwargs:
+            # e.g. the cutoff dimension may have changed
+            self._plans.clear()
 
         for p in self.run_progs:
             p._clear_regrefs()
@@ -167,6 +186,16 @@ class Engine:
     def _run_program_locally(self, prog, **kwargs):
         """Execute a program on a local backend.
 
+        The program is first lowered into an execution plan using :meth:`_lower`.
+        The plan is cached, and reused whenever the same program is run again
+        on this engine, also after a :meth:`reset`.
+
+        Measurements that are followed by commands acting on the measured subsystems,
+        or depending on the measurement results, are applied with the ``terminal=False``
+        keyword argument. Backends that cannot compute the conditional state after
+        a measurement, such as the Gaussian backend for Fock measurements, only
+        support terminal measurements.
+
         This method should not be called directly.
 
         Args:
@@ -174,43 +203,129 @@ class Engine:
         Returns:
             list[Command]: commands that were applied to the backend
         """
+        # Commands are compared by identity
+        key = tuple(prog.circuit)
+        cached = self._plans.get(prog)
+        if cached is None or cached[0] != key:
+            cached = (key, self._lower(prog.circuit), _nonterminal_measurements(prog.circuit))
+            self._plans[prog] = cached
+
         applied = []
-        for cmd in prog.circuit:
+        for cmd, calls in cached[1]:
+            if calls is None:
+                if cmd in cached[2]:
+                    applied.extend(self._apply_command(cmd, terminal=False, **kwargs))
+                else:
+                    applied.extend(self._apply_command(cmd, **kwargs))
+                continue
+            for method, args, kw in calls:
+                method(*args, **kw)
+            applied.append(cmd)
+        return applied
+
+    def _apply_command(self, cmd, **kwargs):
+        """Apply a single command to the backend, decomposing it if necessary.
+
+        This method should not be called directly.
+
+        Args:
+            cmd (Command): command to apply
+        Returns:
+            list[Command]: commands that were applied to the backend
+        """
+        try:
+            # try to apply it to the backend
+            cmd.op.apply(cmd.reg, self.backend, hbar=self.hbar, **kwargs)
+            return [cmd]
+        except NotApplicableError:
+            # command is not applicable to the current backend type
+            raise NotApplicableError('The operation {} cannot be used with {}.'.format(cmd.op, self.backend)) from None
+        except NotImplementedError:
+            # command not directly supported by backend API, try a decomposition instead
             try:
-                # try to apply it to the backend
-                cmd.op.apply(cmd.reg, self.backend, hbar=self.hbar, **kwargs)
-                applied.append(cmd)
+                temp = cmd.op.decompose(cmd.reg)
+            except NotImplementedError as err:
+                # simplify the error message by suppressing the previous exception
+                raise err from None
+        # run the decomposition
+        applied = []
+        for c in temp:
+            applied.extend(self._apply_command(c, **kwargs))
+        return applied
+
+    def _lower(self, seq):
+        """Lower a Command sequence into a flat execution plan.
+
+        Each Command is applied once to a stand-in for the backend that records the backend API calls
+        made by the Operation, which are then the plan for that Command. Executing the plan simply
+        repeats the calls, skipping the parameter evaluation, the dispatch through
+        :meth:`.Operation.apply` and the run time decompositions.
+
+        This is only possible for preparations, transformations and decompositions whose parameters
+        all have immediate numeric values, since the backend calls of other Operations depend on
+        measurement results, free parameter values or TensorFlow objects. The plan for such a Command
+        is None, and the Command is applied normally.
+
+        This method should not be called directly.
+
+        Args:
+            seq (Sequence[Command]): commands to lower
+        Returns:
+            list[tuple[Command, list[tuple[callable, tuple, dict]], None]]: commands in the order they
+            are applied, each with its backend method calls as (bound method, args, kwargs) tuples, or None
+        """
+        plan = []
+        for cmd in seq:
+            op = cmd.op
+            immediate = all(isinstance(p.x, (numbers.Number, np.ndarray)) for p in op.p)
+            if not isinstance(op, (Preparation, Transformation, Decomposition)) or op.extra_deps or not immediate:
+                plan.append((cmd, None))
+                continue
+
+            recorder = _RecordingBackend(self.backend)
+            try:
+                op.apply(cmd.reg, recorder, hbar=self.hbar)
             except NotApplicableError:
-                # command is not applicable to the current backend type
-                raise NotApplicableError('The operation {} cannot be used with {}.'.format(cmd.op, self.backend)) from None
+                raise NotApplicableError('The operation {} cannot be used with {}.'.format(op, self.backend)) from None
             except NotImplementedError:
-                # command not directly supported by backend API, try a decomposition instead
                 try:
-                    temp = cmd.op.decompose(cmd.reg)
-                    # run the decomposition
-                    applied_cmds = self._run_program_locally(temp, **kwargs)
-                    applied.extend(applied_cmds)
+                    temp = op.decompose(cmd.reg)
                 except NotImplementedError as err:
-                    # simplify the error message by suppressing the previous exception
                     raise err from None
-        return applied
+                plan.extend(self._lower(temp))
+                continue
+            plan.append((cmd, recorder.calls))
+        return plan
 
-    def run(self, program, return_state=True, modes=None, compile=True, **kwargs):
+    def run(self, program, return_state=True, modes=None, compile=True, args=None, **kwargs):
         """Execute the given program by sending it to the backend.
 
         * The backend state is updated.
         * The executed Program(s) are appended to self.run_progs.
 
+        The compiled versions of the Programs are cached, see :meth:`.Program.compile`.
+        A program containing free parameters is hence compiled only once, even if it is
+        run many times with different values given in ``args``.
+
         Args:
             program (Program, Sequence[Program]): quantum circuit(s) to run
             return_state (bool): If True, returns the state of the circuit after the
                 circuit has been run like :meth:`return_state` was called.
             modes (Sequence[int]): Modes to be returned in the state object. If None, returns all modes.
             compile (bool): If True, compile the Program instances before sending them to the backend.
+            args (dict[str, Any]): values to bind to the free parameters of the programs, by name,
+                see :meth:`.Program.params`
         """
         if not isinstance(program, Sequence):
             program = [program]
 
+        if args:
+            unknown = set(args).difference(*(p.free_params for p in program))
+            if unknown:
+                raise CircuitError('Unknown free parameters: {}.'.format(', '.join(sorted(unknown))))
+            for p in program:
+                p.bind_params({k: v for k, v in args.items() if k in p.free_params})
+
         # TODO unsuccessful run due to exceptions should ideally have no effect on the backend state (state checkpoints?)
         try:
             prev = None  # previous program segment
@@ -243,3 +358,181 @@ class Engine:
             return self.return_state(modes=modes, **kwargs)
 
         return None
+
+    def run_sweep(self, program, param_grid, processes=None, chunksize=1, observable=None, seed=None, modes=None, **kwargs):
+        """Execute a program at many points of a parameter space, in parallel worker processes.
+
+        Each worker process creates a single engine with the same backend and options as this one,
+        and reuses it for all the points it runs, resetting it in between. This engine is not
+        modified. The points are sent to the workers in chunks, and only a bounded number of
+        chunks is in flight at any time, so that ``param_grid`` can be a lazy iterable of any length.
+
+        For example, the mean photon number of a squeezed mode after a beamsplitter, for a range of
+        squeezing values, is obtained with
+        ::
+
+          def circuit(r):
+              prog = sf.Program(2)
+              with prog.context as q:
+                  Sgate(r) | q[0]
+                  BSgate() | q
+              return prog
+
+          def photons(state):
+              return state.mean_photon(1)[0]
+
+          eng = sf.Engine('gaussian')
+          means = list(eng.run_sweep(circuit, [{'r': r} for r in np.linspace(0, 1, 100)], observable=photons))
+
+        Alternatively, ``program`` can be a :class:`.Program` with free parameters, in which case
+        the values at each point are bound to them, and each worker process compiles the program
+        only once per chunk::
+
+          prog = sf.Program(2)
+          r = prog.params('r')
+          with prog.context as q:
+              Sgate(r) | q[0]
+              BSgate() | q
+
+          means = list(eng.run_sweep(prog, [{'r': r} for r in np.linspace(0, 1, 100)], observable=photons))
+
+        Since the program factory and the observable are sent to the worker processes, they must
+        be picklable, e.g., functions defined at the top level of a module.
+
+        Args:
+            program (Program, callable): program with free parameters named as the keys of the points of ``param_grid``,
+                or a function that is called with the keyword arguments given
+                by a point of ``param_grid``, and returns the :class:`.Program` to run at that point
+            param_grid (Iterable[dict]): points of the parameter space
+            processes (int): number of worker processes; by default, the number of CPUs.
+                If 1, the points are run in the current process.
+            chunksize (int): number of points sent to a worker at once
+            observable (callable): function applied to the state of the circuit after each run,
+                in the worker process. If None, the state itself is returned.
+            seed (int): The random number generator is seeded before each run with this seed
+                and the index of the point, so that the results do not depend on the number of
+                processes or the chunk size. If None, fresh entropy is drawn for the sweep, so that
+                worker processes do not share the random state of the parent.
+            modes (Sequence[int]): Modes to be returned in the state object. If None, returns all modes.
+
+        Keyword Args:
+            kwargs: passed on to :meth:`run` for each point, e.g. ``shots``
+
+        Yields:
+            BaseState or any: the state, or the value of ``observable``, at each point, in the order of ``param_grid``
+        """
+        # pylint: disable=too-many-arguments
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+        config = (self.backend_name, self.kwargs, program, observable, seed, modes, kwargs)
+        points = enumerate(param_grid)
+        chunks = iter(lambda: list(islice(points, chunksize)), [])
+
+        if processes == 1:
+            for chunk in chunks:
+                yield from _sweep_chunk(config, chunk)
+            return
+
+        processes = processes or os.cpu_count()
+        with ProcessPoolExecutor(processes) as executor:
+            pending = deque()
+            try:
+                for chunk in chunks:
+                    pending.append(executor.submit(_sweep_chunk, config, chunk))
+                    if len(pending) >= 2 * processes:
+                        yield from pending.popleft().result()
+                while pending:
+                    yield from pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+
+def _nonterminal_measurements(seq):
+    """Measurements in a Command sequence that are not terminal.
+
+    A measurement is terminal if none of the later Commands acts on the measured subsystems,
+    or depends on the measurement results.
+
+    Args:
+        seq (Sequence[Command]): commands to check
+    Returns:
+        set[Command]: measurement commands that are not terminal
+    """
+    nonterminal = set()
+    later = set()  # subsystems the later commands depend on
+    for cmd in reversed(seq):
+        if isinstance(cmd.op, Measurement) and later.intersection(cmd.reg):
+            nonterminal.add(cmd)
+        later |= cmd.get_dependencies()
+    return nonterminal
+
+
+class _RecordingBackend:
+    """Stand-in for a backend, recording the backend API calls made to it.
+
+    Used by :meth:`Engine._lower`. Queries, i.e. ``get_*`` methods, are forwarded to the backend.
+    So are the API methods the backend does not implement, so that they raise the same exceptions
+    they would raise at run time.
+
+    Args:
+        backend (BaseBackend): backend whose calls are recorded
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, backend):
+        self._backend = backend
+        #: list[tuple[callable, tuple, dict]]: recorded calls as (bound method, args, kwargs)
+        self.calls = []
+
+    def __getattr__(self, name):
+        attr = getattr(self._backend, name)
+        if name.startswith('get_') or not callable(attr):
+            return attr
+        if getattr(getattr(type(self._backend), name, None), '__module__', None) == BaseBackend.__module__:
+            # abstract method, not implemented by the backend
+            return attr
+
+        def record(*args, **kwargs):
+            """Record the call."""
+            self.calls.append((attr, args, kwargs))
+        return record
+
+
+#: Engine: engine reused by the parameter sweep tasks run in this process
+_sweep_engine = None
+
+
+def _sweep_chunk(config, chunk):
+    """Runs a chunk of the points of a parameter sweep.
+
+    This function is called by :meth:`Engine.run_sweep`, in the worker processes.
+
+    Args:
+        config (tuple): backend name, engine options, program or program factory, observable, seed, modes
+            and run options of the sweep
+        chunk (list[tuple[int, dict]]): indices and values of the points to run
+
+    Returns:
+        list: the state, or the value of the observable, at each point
+    """
+    # pylint: disable=global-statement
+    global _sweep_engine
+    backend, options, program, observable, seed, modes, kwargs = config
+
+    if _sweep_engine is None or _sweep_engine.backend_name != backend or _sweep_engine.kwargs != options:
+        _sweep_engine = Engine(backend, **options)
+    eng = _sweep_engine
+
+    results = []
+    for index, point in chunk:
+        if eng.run_progs:
+            eng.reset()
+        np.random.seed(np.random.SeedSequence([seed, index]).generate_state(4))
+
+        if isinstance(program, Program):
+            state = eng.run(program, modes=modes, args=point, **kwargs)
+        else:
+            state = eng.run(program(**point), modes=modes, **kwargs)
+        results.append(state if observable is None else observable(state))
+    return results
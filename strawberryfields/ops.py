@@ -197,6 +197,7 @@ Measurements
 
 .. autosummary::
    MeasureFock
+   MeasureThreshold
    MeasureHomodyne
    MeasureHeterodyne
 
@@ -312,6 +313,17 @@ from .decompositions import clements, bloch_messiah, williamson, graph_embed
 _decomposition_merge_tol = 1e-13
 
 
+def _passive_symplectic(U):
+    """Symplectic matrix of the interferometer U, in the xxpp ordering.
+
+    Args:
+        U (array): unitary matrix
+    Returns:
+        array: orthogonal symplectic matrix
+    """
+    return np.vstack([np.hstack([U.real, -U.imag]), np.hstack([U.imag, U.real])])
+
+
 def warning_on_one_line(message, category, filename, lineno, file=None, line=None):
     """User warning formatter"""
     # pylint: disable=unused-argument
@@ -576,6 +588,9 @@ class Measurement(Operation):
         # measurement can act on multiple modes
         if self.ns == 1:
             values = [values]
+        elif kwargs.get('shots', 1) > 1:
+            # the samples of each subsystem are in the columns
+            values = np.transpose(values)
         # store the results in the register reference objects
         for v, r in zip(values, reg):
             r.val = v
@@ -776,7 +791,7 @@ class Gate(Transformation):
         if isinstance(other, self.__class__):
             # without knowing anything more specific about the gates, we
             # can only merge them if they are each others' inverses
-            if self.dagger != other.dagger:
+            if self.dagger != other.dagger and self.p == other.p:
                 return None
 
             raise MergeFailure("Don't know how to merge these gates.")
@@ -1056,6 +1071,24 @@ class MeasureFock(Measurement):
         return 'MeasureFock(select={})'.format(self.select)
 
 
+class MeasureThreshold(Measurement):
+    """:ref:`threshold_detection`: measures a set of modes with threshold detectors.
+
+    Threshold detectors only distinguish the vacuum from the presence of one or more
+    photons: the result is 1 (a click) if photons were detected, and 0 otherwise.
+    The measured modes are reset to the vacuum state.
+    """
+    ns = None
+
+    def __init__(self, select=None):
+        if select is not None and not isinstance(select, Sequence):
+            select = [select]
+        super().__init__([], select)
+
+    def _apply(self, reg, backend, **kwargs):
+        return backend.measure_threshold(reg, select=self.select, **kwargs)
+
+
 class MeasureHomodyne(Measurement):
     r"""Performs a :ref:`homodyne measurement <homodyne>`, measures one quadrature of a mode.
 
@@ -1642,6 +1675,12 @@ class Interferometer(Decomposition):
 
         return cmds
 
+    def merge(self, other):
+        # an interferometer followed by a Gaussian transformation is a Gaussian transformation
+        if isinstance(other, GaussianTransform):
+            return other._merge_symplectic(_passive_symplectic(self.p[0].x), first=False)
+        return super().merge(other)
+
 
 class GraphEmbed(Decomposition):
     r"""Embed a graph into an interferometer setup.
@@ -1685,6 +1724,10 @@ class GraphEmbed(Decomposition):
 
         return cmds
 
+    def merge(self, other):
+        # adjacency matrices do not compose
+        raise MergeFailure('Graph embeddings cannot be merged.')
+
 
 class GaussianTransform(Decomposition):
     r"""Apply a Gaussian symplectic transformation to the specified qumodes.
@@ -1774,6 +1817,33 @@ class GaussianTransform(Decomposition):
 
         return cmds
 
+    def _merge_symplectic(self, S, first):
+        """Merge the transformation with another symplectic transformation.
+
+        Args:
+            S (array): symplectic matrix of the other transformation
+            first (bool): True if this transformation is applied first
+        Returns:
+            GaussianTransform, None: merged transformation, or None if it is the identity
+        """
+        if first:
+            S = S @ self.p[0].x
+            vacuum = self.vacuum
+        else:
+            S = self.p[0].x @ S
+            vacuum = False
+        if np.all(np.abs(S - np.identity(len(S))) < _decomposition_merge_tol):
+            return None
+        return GaussianTransform(S, vacuum=vacuum)
+
+    def merge(self, other):
+        # the matrices are multiplied, keeping the vacuum flag of the first transformation
+        if isinstance(other, GaussianTransform):
+            return self._merge_symplectic(other.p[0].x, first=True)
+        if isinstance(other, Interferometer):
+            return self._merge_symplectic(_passive_symplectic(other.p[0].x), first=True)
+        raise MergeFailure('Not the same decomposition type.')
+
 
 class Gaussian(Preparation, Decomposition):
     r"""Prepare the specified modes in a Gaussian state.
@@ -1926,7 +1996,7 @@ channels = (LossChannel, ThermalLossChannel)
 simple_state_preparations = (Vacuum, Coherent, Squeezed, DisplacedSqueezed, Fock, Catstate, Thermal)  # have __init__ methods with default arguments
 state_preparations = simple_state_preparations + (Ket, DensityMatrix)
 
-measurements = (MeasureFock, MeasureHomodyne, MeasureHeterodyne)
+measurements = (MeasureFock, MeasureThreshold, MeasureHomodyne, MeasureHeterodyne)
 
 decompositions = (Interferometer, GraphEmbed, GaussianTransform, Gaussian)
 
@@ -10,6 +10,7 @@ The :class:`Parameter` class is an abstraction of a parameter passed to the
 quantum circuit operations represented by :class:`~strawberryfields.ops.ParOperation`.
 The parameter objects can represent a number, a NumPy array, a value measured from the quantum register
 (:class:`~strawberryfields.engine.RegRefTransform`),
+a named free parameter of the program (:class:`FreeParameter`), whose value is bound only when the program is run,
 or a TensorFlow object.
 
 .. currentmodule:: strawberryfields
@@ -37,13 +38,14 @@ The normal lifecycle of a ParOperation object and its associated Parameter insta
   but could in principle be handled.
 
 For now, we simply don't do the merge if RegRefTransforms or TensorFlow objects are involved.
+Free parameters are merged symbolically, since the sum of two free parameter expressions is again one.
 
 * The optimized command queue is run by Engine, which calls the :func:`~ops.Operation.apply` method
   of each Operation in turn (and tries :func:`~ops.Operation.decompose`
   if a :py:exc:`NotImplementedError` exception is raised).
 
 * :func:`~ops.ParOperation.apply` evaluates the numeric value of any
-  RegRefTransform-based Parameters using :func:`Parameter.evaluate` (other types of Parameters are simply passed through).
+  RegRefTransform-based and free Parameters using :func:`Parameter.evaluate` (other types of Parameters are simply passed through).
   The parameter values and the subsystem indices are passed to :func:`~ops.Operation._apply`.
 
 * :func:`~ops.Operation._apply` "unwraps" the Parameter instances. There are three different cases:
@@ -62,6 +64,34 @@ What we cannot do at the moment:
   Technically we could allow any Parameters or valid Parameter initializers that evaluate into an integer.
 * Do arithmetic with RegRefTransforms.
 
+
+Free parameters
+---------------
+
+A :class:`FreeParameter` is a named placeholder for a numeric value, created using :meth:`.Program.params`.
+It stays symbolic through :meth:`.Program.compile`, so a program can be compiled once and then run
+many times with different values, which are bound to the free parameters by :meth:`.Engine.run`::
+
+  prog = sf.Program(1)
+  theta = prog.params('theta')
+  with prog.context as q:
+      Sgate(theta) | q[0]
+      Rgate(2 * theta) | q[0]
+
+  eng = sf.Engine('gaussian')
+  for t in np.linspace(0, 1, 10):
+      state = eng.run(prog, args={'theta': t})
+      eng.reset()
+
+Arithmetic and the math functions of this module can be applied to free parameters, resulting in
+symbolic expressions that are evaluated once the values have been bound.
+Operations that need the numeric value of their parameters already when they are constructed,
+like :class:`~.ops.Interferometer`, do not accept free parameters.
+
+.. autosummary::
+   FreeParameter
+
+
 Parameter methods
 -----------------
 
@@ -76,16 +106,29 @@ Code details
 
 """
 
+import functools
 import numbers
+import operator
+import sys
 
 import numpy as np
-import tensorflow as tf
 
-from .program import (RegRef, RegRefTransform)
+from .program import (RegRef, RegRefTransform, CircuitError)
+
 
+def _tf_classes():
+    """Supported TF classes.
 
-# supported TF classes
-_tf_classes = (tf.Tensor, tf.Variable)
+    TensorFlow is not imported by this module. If it has not been imported
+    elsewhere, no object can be a TensorFlow object, and an empty tuple is returned.
+
+    Returns:
+      tuple[type]: TF classes supported as parameters
+    """
+    tf = sys.modules.get('tensorflow')
+    if tf is None:
+        return ()
+    return (tf.Tensor, tf.Variable)
 
 
 def _unwrap(params):
@@ -100,23 +143,142 @@ def _unwrap(params):
     return tuple(p.x for p in params)
 
 
+class _Symbolic:
+    """Base class for symbolic parameter values, i.e., free parameters and expressions containing them.
+
+    Arithmetic on symbolic values results in :class:`_SymbolicTransform` instances that
+    record the operation, to be carried out when the expression is evaluated.
+    """
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """NumPy ufuncs applied to symbolic values are deferred, e.g. ``np.sin(theta)``."""
+        if method != '__call__' or kwargs:
+            return NotImplemented
+        inputs = tuple(x.x if isinstance(x, Parameter) else x for x in inputs)
+        return _SymbolicTransform(ufunc, inputs, ufunc.__name__ + '(' + ', '.join(['{}']*len(inputs)) + ')')
+
+    def evaluate(self):
+        """Evaluate the numeric value of the expression.
+
+        Returns:
+          Number, array, Tensor: value
+        """
+        raise NotImplementedError
+
+    def __format__(self, format_spec):
+        return self.__str__()  # pragma: no cover
+
+    def __eq__(self, other):
+        "Equal only to itself, since the value is not known yet."
+        return self is other
+
+    __hash__ = object.__hash__
+
+    def _binary(self, func, other, fmt, swap=False):
+        """Deferred binary arithmetic operation."""
+        if isinstance(other, Parameter):
+            other = other.x
+        args = (other, self) if swap else (self, other)
+        return _SymbolicTransform(func, args, fmt)
+
+    def __add__(self, other):
+        return self._binary(operator.add, other, '({}+{})')
+
+    def __radd__(self, other):
+        return self._binary(operator.add, other, '({}+{})', swap=True)
+
+    def __sub__(self, other):
+        return self._binary(operator.sub, other, '({}-{})')
+
+    def __rsub__(self, other):
+        return self._binary(operator.sub, other, '({}-{})', swap=True)
+
+    def __mul__(self, other):
+        return self._binary(operator.mul, other, '({}*{})')
+
+    def __rmul__(self, other):
+        return self._binary(operator.mul, other, '({}*{})', swap=True)
+
+    def __truediv__(self, other):
+        return self._binary(operator.truediv, other, '({}/{})')
+
+    def __rtruediv__(self, other):
+        return self._binary(operator.truediv, other, '({}/{})', swap=True)
+
+    def __pow__(self, other):
+        return self._binary(operator.pow, other, '({}**{})')
+
+    def __rpow__(self, other):
+        return self._binary(operator.pow, other, '({}**{})', swap=True)
+
+    def __neg__(self):
+        return _SymbolicTransform(operator.neg, (self,), '-{}')
+
+
+class FreeParameter(_Symbolic):
+    """Named free parameter of a :class:`.Program`.
+
+    Represents a numeric value that is not known when the program is defined and compiled,
+    but is bound to the parameter when the program is run, see :meth:`.Engine.run`.
+    Instances should be created using :meth:`.Program.params`.
+
+    Args:
+      name (str): name of the parameter
+    """
+    def __init__(self, name):
+        #: str: name of the parameter
+        self.name = name
+        #: Number, array, Tensor, None: bound value, or None if no value has been bound yet
+        self.val = None
+
+    def __str__(self):
+        """Print the free parameter using Blackbird template syntax."""
+        return '{' + self.name + '}'
+
+    def evaluate(self):
+        if self.val is None:
+            raise CircuitError("No value has been bound to the free parameter '{}'.".format(self.name))
+        return self.val
+
+
+class _SymbolicTransform(_Symbolic):
+    """Function of one or more symbolic values, evaluated when the values are bound.
+
+    Args:
+      func (function): function to apply to the evaluated arguments
+      args (Sequence): arguments of the function, symbolic or not
+      func_str (str): format string for the string representation, with a placeholder for each argument
+    """
+    def __init__(self, func, args, func_str):
+        self.func = func
+        self.args = tuple(args)
+        self.func_str = func_str
+
+    def __str__(self):
+        return self.func_str.format(*(str(Parameter(a)) if isinstance(a, numbers.Number) else str(a) for a in self.args))
+
+    def evaluate(self):
+        temp = (a.evaluate() if isinstance(a, _Symbolic) else a for a in self.args)
+        return self.func(*temp)
+
+
 class Parameter():
     """Represents a parameter passed to a :class:`strawberryfields.ops.Operation` subclass constructor.
 
     The supported parameter types are Python and NumPy numeric types, NumPy arrays, :class:`RegRef` instances,
-    :class:`RegRefTransform` instances, and certain TensorFlow objects. RegRef instances are internally represented as
-    trivial RegRefTransforms.
+    :class:`RegRefTransform` instances, free parameters and expressions containing them, and certain TensorFlow objects.
+    RegRef instances are internally represented as trivial RegRefTransforms.
 
-    All but the RR and TensorFlow parameters represent an immediate numeric value that
+    All but the RR, free and TensorFlow parameters represent an immediate numeric value that
     will not change. RR parameters can only be evaluated after the corresponding register
-    subsystems have been measured. TF parameters can be evaluated whenever, but they depend on TF objects that
+    subsystems have been measured. Free parameters can only be evaluated after a value has been bound to them.
+    TF parameters can be evaluated whenever, but they depend on TF objects that
     are evaluated using :meth:`tf.Session.run`.
 
     The class supports various arithmetic operations which may change the internal representation of the result.
     If a TensorFlow object is involved, the result will always be a TensorFlow object.
 
     Args:
-      x (Number, array, Tensor, Variable, RegRef, RegRefTransform): parameter value
+      x (Number, array, Tensor, Variable, RegRef, RegRefTransform, FreeParameter): parameter value
     """
     # turn off the NumPy ufunc dispatching mechanism which is incompatible with our approach (see https://docs.scipy.org/doc/numpy-1.14.0/neps/ufunc-overrides.html)
     # NOTE: Another possible approach would be to use https://docs.scipy.org/doc/numpy-1.14.0/reference/generated/numpy.lib.mixins.NDArrayOperatorsMixin.html
@@ -133,7 +295,7 @@ class Parameter():
         # wrap RegRefs in the identity RegRefTransform
         if isinstance(x, RegRef):
             x = RegRefTransform(x)
-        elif isinstance(x, (numbers.Number, np.ndarray, _tf_classes, RegRefTransform)):
+        elif isinstance(x, (numbers.Number, np.ndarray, RegRefTransform, _Symbolic) + _tf_classes()):
             pass
         else:
             raise TypeError('Unsupported base object type: ' +
@@ -153,12 +315,12 @@ class Parameter():
         return self.x.__format__(format_spec)
 
     def evaluate(self):
-        """Evaluate the numerical value of a RegRefTransform-based parameter.
+        """Evaluate the numerical value of a RegRefTransform-based or free parameter.
 
         Returns:
-          Parameter: self, unless self.x is a RegRefTransform in which case it is evaluated and a new Parameter instance is constructed on the result and returned
+          Parameter: self, unless self.x is a RegRefTransform or a free parameter expression in which case it is evaluated and a new Parameter instance is constructed on the result and returned
         """
-        if isinstance(self.x, RegRefTransform):
+        if isinstance(self.x, (RegRefTransform, _Symbolic)):
             return Parameter(self.x.evaluate())
         return self
 
@@ -177,28 +339,31 @@ class Parameter():
         if isinstance(other, Parameter):
             other = other.x
         swap = False
-        if not isinstance(t, _tf_classes):
-            if isinstance(other, _tf_classes):
+        if not isinstance(t, _tf_classes()):
+            if isinstance(other, _tf_classes()):
                 t, other = other, t  # make sure other is the non-tf type for simplicity
                 swap = True
             else:
                 # only TensorFlow types are cast
                 return t, other
 
+        # t is a TF object, so TensorFlow has already been imported
+        tf = sys.modules['tensorflow']
+
         if t.dtype.is_complex:
-            if isinstance(other, _tf_classes) and not other.dtype.is_complex:
+            if isinstance(other, _tf_classes()) and not other.dtype.is_complex:
                 other = tf.cast(other, tf.complex128)
         else:
             if (np.iscomplexobj(other) or
-                    (isinstance(other, _tf_classes) and other.dtype.is_complex)):
+                    (isinstance(other, _tf_classes()) and other.dtype.is_complex)):
                 t = tf.cast(t, tf.complex128)
             elif t.dtype.is_integer:
                 if (isinstance(other, float) or
                         (isinstance(other, np.ndarray) and np.issubdtype(other.dtype, np.floating)) or
-                        (isinstance(other, _tf_classes) and other.dtype.is_floating)):
+                        (isinstance(other, _tf_classes()) and other.dtype.is_floating)):
                     t = tf.cast(t, tf.float32)
             elif t.dtype.is_floating:
-                if isinstance(other, _tf_classes) and other.dtype.is_integer:
+                if isinstance(other, _tf_classes()) and other.dtype.is_integer:
                     other = tf.cast(other, tf.float32)
 
         if swap:
@@ -287,38 +452,55 @@ class Parameter():
         return self.x == other
 
 
-# corresponding numpy and tensorflow functions
-np_math_fns = {"abs": (np.abs, tf.abs),
-               "sign": (np.sign, tf.sign),
-               "sin": (np.sin, tf.sin),
-               "cos": (np.cos, tf.cos),
-               "cosh": (np.cosh, tf.cosh),
-               "tanh": (np.tanh, tf.tanh),
-               "exp": (np.exp, tf.exp),
-               "log": (np.log, tf.log),
-               "sqrt": (np.sqrt, tf.sqrt),
-               "arctan": (np.arctan, tf.atan),
-               "arctan2": (np.arctan2, tf.atan2),
-               "arcsinh": (np.arcsinh, tf.asinh),
-               "arccosh": (np.arccosh, tf.acosh),
-               "matmul": (np.matmul, tf.matmul),
-               "expand_dims": (np.expand_dims, tf.expand_dims),
-               "squeeze": (np.squeeze, tf.squeeze),
-               "transpose": (np.transpose, tf.transpose),
-               "reshape": (np.reshape, tf.reshape)
+# corresponding numpy and tensorflow functions, the latter given by name so that TensorFlow is not imported
+np_math_fns = {"abs": (np.abs, "abs"),
+               "sign": (np.sign, "sign"),
+               "sin": (np.sin, "sin"),
+               "cos": (np.cos, "cos"),
+               "cosh": (np.cosh, "cosh"),
+               "tanh": (np.tanh, "tanh"),
+               "exp": (np.exp, "exp"),
+               "log": (np.log, "log"),
+               "sqrt": (np.sqrt, "sqrt"),
+               "arctan": (np.arctan, "atan"),
+               "arctan2": (np.arctan2, "atan2"),
+               "arcsinh": (np.arcsinh, "asinh"),
+               "arccosh": (np.arccosh, "acosh"),
+               "matmul": (np.matmul, "matmul"),
+               "expand_dims": (np.expand_dims, "expand_dims"),
+               "squeeze": (np.squeeze, "squeeze"),
+               "transpose": (np.transpose, "transpose"),
+               "reshape": (np.reshape, "reshape")
                }
 
 
-def math_fn_wrap(np_fn, tf_fn):
+def _math_fn(name, *args, **kwargs):
+    """Call the wrapped math function of this module with the given name.
+
+    Used in symbolic expressions instead of the wrapper itself, which cannot be pickled.
+    """
+    return globals()[name](*args, **kwargs)
+
+
+def math_fn_wrap(np_fn, tf_fn, name=None):
     """Wrapper function for the standard math functions.
 
     It checks the type of the incoming object and calls the appropriate NumPy or TensorFlow function.
+    The TensorFlow function is given by its name, and looked up only when it is called on a TF object.
+    The name of the wrapper in this module is used to refer to it in free parameter expressions.
     """
+    if name is None:
+        name = np_fn.__name__
+
     def wrapper(*args, **kwargs):
         """wrapper function"""
-        if any([isinstance(a, _tf_classes) for a in args]):
+        if any([isinstance(a, _tf_classes()) for a in args]):
             # if anything is a tf object, use the tensorflow version of the function
-            return tf_fn(*args, **kwargs)
+            tf = sys.modules['tensorflow']
+            return getattr(tf, tf_fn)(*args, **kwargs)
+        elif any([isinstance(a, _Symbolic) for a in args]):
+            # free parameters are evaluated later
+            return _SymbolicTransform(functools.partial(_math_fn, name, **kwargs), args, name + '(' + ', '.join(['{}']*len(args)) + ')')
         elif any([isinstance(a, Parameter) for a in args]):
             # for Parameters, call the function on the data and construct a new instance
             temp = (a.x if isinstance(a, Parameter) else a for a in args)
@@ -333,4 +515,4 @@ def math_fn_wrap(np_fn, tf_fn):
 
 # HACK, edit the global namespace to have sort-of single dispatch overloading for the standard math functions
 for name, fn in np_math_fns.items():
-    globals()[name] = math_fn_wrap(*fn)
+    globals()[name] = math_fn_wrap(*fn, name=name)
@@ -55,6 +55,8 @@ Program methods
    __len__
    can_follow
    append
+   params
+   bind_params
    compile
    optimize
    print
@@ -75,6 +77,7 @@ call these directly.
        _list_to_grid
        _grid_to_DAG
        _DAG_to_list
+       _optimize_sequence
 
 
 Helper classes
@@ -139,10 +142,16 @@ simpler circuit while preserving the probability distributions of the measuremen
 The optimization utilizes the abstract algebraic properties of the gates,
 and in no point should require a matrix representation.
 
-Currently the optimization is very simple. It
+Currently the optimization is fairly simple. It
 
 * merges neighboring gates belonging to the same gate family and sharing the same set of subsystems
 * cancels neighboring pairs of a gate and its inverse
+* fuses neighboring :class:`~.ops.Interferometer` and :class:`~.ops.GaussianTransform` operations
+  into one by multiplying their matrices, before they are decomposed by :meth:`Program.compile`
+
+Here, two Commands are neighbors if they act on the same subsystems, and nothing else acts on any
+of those subsystems between them, i.e., they are connected by an edge of the circuit DAG.
+This holds for multimode gates as well.
 
 .. currentmodule:: strawberryfields.program
 
@@ -268,6 +277,8 @@ backend_database = {
         'GaussianTransform': False,
         'MeasureHomodyne': True,
         'MeasureHeterodyne': True,
+        'MeasureFock': True,
+        'MeasureThreshold': True,
     },
 }
 backend_database['tf'] = backend_database['fock']  # tf can do the same things as fock
@@ -515,6 +526,11 @@ class Program:
         self.backend = None
         #: Program: for compiled programs, this is the original
         self.source = None
+        #: dict[str, FreeParameter]: free parameters of the program, by name
+        self.free_params = {}
+        #: dict[tuple, tuple[tuple[Command], Program]]: latest compiled version of this program
+        #: for each (backend, optimize) pair, together with the circuit it was compiled from
+        self._compile_cache = {}
 
         # create subsystem references
         if isinstance(num_subsystems, numbers.Integral):
@@ -756,6 +772,51 @@ class Program:
         self.circuit.append(Command(op, reg))
         return reg
 
+    def params(self, *args):
+        """Return named free parameters of the program.
+
+        The free parameters are symbolic placeholders which can be used as
+        :class:`~strawberryfields.ops.Operation` parameters, and in arithmetic.
+        They stay symbolic when the program is compiled, and are given numeric
+        values when the program is run, see :meth:`bind_params`.
+        Calling this method again with the same name returns the same parameter.
+
+        Args:
+            *args (str): names of the parameters
+        Returns:
+            FreeParameter, tuple[FreeParameter]: the parameter, or a tuple of parameters if several names are given
+        """
+        # the parameters module imports this one
+        from .parameters import FreeParameter  # pylint: disable=import-outside-toplevel
+
+        ret = []
+        for name in args:
+            p = self.free_params.get(name)
+            if p is None:
+                if self.locked:
+                    raise CircuitError('The Program is locked, no more free parameters can be added to it.')
+                p = FreeParameter(name)
+                self.free_params[name] = p
+            ret.append(p)
+        if len(ret) == 1:
+            return ret[0]
+        return tuple(ret)
+
+    def bind_params(self, args):
+        """Bind numeric values to the free parameters of the program.
+
+        The values remain bound until new values are bound to the same parameters.
+        Compiled versions of the program share its free parameters.
+
+        Args:
+            args (dict[str, Any]): mapping from free parameter names to their values
+        """
+        for name, val in args.items():
+            p = self.free_params.get(name)
+            if p is None:
+                raise CircuitError("The Program has no free parameter named '{}'.".format(name))
+            p.val = val
+
     def compile(self, backend='fock', optimize=True):
         """Compile the program for the given backend.
 
@@ -766,6 +827,12 @@ class Program:
         results, but also necessitates the locking of both the compiled program and the original to make sure the
         RegRef state remains consistent.
 
+        The latest compiled program for each set of arguments is cached, and returned again by subsequent
+        calls as long as the Command sequence of the program does not change. Repeated calls hence
+        return the *same* Program object rather than a fresh copy; modify a copy if required.
+        Free parameters stay symbolic in the compiled program, so the cached program remains valid
+        for any values bound to them.
+
         Args:
             backend (str): target backend
             optimize (bool): try to optimize the program by merging and canceling gates
@@ -773,6 +840,17 @@ class Program:
             Program: compiled program
         """
         db = backend_database[backend]
+        # Commands are compared by identity
+        key = (backend, optimize)
+        circuit = tuple(self.circuit)
+        cached = self._compile_cache.get(key)
+        if cached is not None and cached[0] == circuit:
+            return cached[1]
+
+        def validate(cmd):
+            """Makes sure the backend can handle the op, at least via a decomposition."""
+            if cmd.op.__class__.__name__ not in db:
+                raise CircuitError('The operation {} cannot be used with the {} backend.'.format(cmd.op.__class__.__name__, backend))
 
         def compile_sequence(seq):
             """Compiles the given Command sequence."""
@@ -781,33 +859,39 @@ class Program:
                 # None represents an identity gate
                 if cmd.op is None:
                     continue
-                elif cmd.op.__class__.__name__ in db:
+                validate(cmd)
+                if db[cmd.op.__class__.__name__]:
                     # backend can handle the op
-                    if db[cmd.op.__class__.__name__]:
-                        compiled.append(cmd)
-                    else:
-                        # op not directly supported by the backend, try a decomposition instead
-                        try:
-                            temp = cmd.op.decompose(cmd.reg)
-                            if temp is None:
-                                # decomposition refused
-                                compiled.append(cmd)
-                            else:
-                                # now compile the decomposition
-                                temp = compile_sequence(temp)
-                                compiled.extend(temp)
-                        except NotImplementedError as err:
-                            # simplify the error message by suppressing the previous exception
-                            raise err from None
+                    compiled.append(cmd)
                 else:
-                    raise CircuitError('The operation {} cannot be used with the {} backend.'.format(cmd.op.__class__.__name__, backend))
+                    # op not directly supported by the backend, try a decomposition instead
+                    try:
+                        temp = cmd.op.decompose(cmd.reg)
+                        if temp is None:
+                            # decomposition refused
+                            compiled.append(cmd)
+                        else:
+                            # now compile the decomposition
+                            temp = compile_sequence(temp)
+                            compiled.extend(temp)
+                    except NotImplementedError as err:
+                        # simplify the error message by suppressing the previous exception
+                        raise err from None
             return compiled
 
         self.lock()
-        seq = compile_sequence(self.circuit)
+        seq = self.circuit
+        if optimize:
+            # merge decompositions, e.g. consecutive interferometers, before they are decomposed
+            seq = [cmd for cmd in seq if cmd.op is not None]
+            for cmd in seq:
+                validate(cmd)
+            seq = self._optimize_sequence(seq)
+        seq = compile_sequence(seq)
         compiled = copy.copy(self)  # shares RegRefs with the source
         compiled.backend = backend
         compiled.circuit = seq
+        compiled._compile_cache = {}
         # link to the original source Program
         if self.source is None:
             compiled.source = self
@@ -815,6 +899,8 @@ class Program:
             compiled.source = self.source
         if optimize:
             compiled.optimize()
+        # only the latest version is kept, so that earlier circuits can be freed
+        self._compile_cache[key] = (circuit, compiled)
         return compiled
 
     @staticmethod
@@ -886,52 +972,76 @@ class Program:
 
         The optimization must not change the state of the RegRefs in any way.
         """
-        # print('\n\nOptimizing...\nUnused inds: ', self.unused_indices)
-
-        grid = self._list_to_grid(self.circuit)
-        # for k in grid:
-        #    print('mode {}, len {}'.format(k, len(grid[k])))
-
-        # try merging neighboring operations on each wire
-        # TODO the merging could also be done using the circuit DAG, which
-        # might be smarter (ns>1 would be easy)
-        for k in grid:
-            q = grid[k]
-            #print('\nqumode {}:\n'.format(k))
-            i = 0  # index along the wire
-            _print_list(i, q)
-            while i+1 < len(q):
-                # at least two operations left to merge on this wire
-                try:
+        self.circuit = self._optimize_sequence(self.circuit)
+
+    @classmethod
+    def _optimize_sequence(cls, seq):
+        """Merge and cancel neighboring Commands in a Command sequence.
+
+        Two Commands are neighbors if they act on the same subsystems in the same order,
+        and the second one immediately follows the first one on each of them, i.e.,
+        there is an edge between them in the circuit DAG, and no other path.
+        Commands on other subsystems may be between them in the sequence.
+        The sequence itself is not modified.
+
+        Args:
+            seq (list[Command]): circuit to optimize
+        Returns:
+            list[Command]: optimized circuit
+        """
+        grid = cls._list_to_grid(seq)
+
+        def follower(a):
+            """The Command immediately following a on all its wires, if there is one."""
+            wires = [r.ind for r in a.get_dependencies()]
+            temp = set()
+            for w in wires:
+                q = grid[w]
+                i = q.index(a) + 1
+                if i == len(q):
+                    return None
+                temp.add(q[i])
+            if len(temp) != 1:
+                return None
+            b = temp.pop()
+            if b.reg != a.reg or len(b.get_dependencies()) != len(wires):
+                return None
+            return b
+
+        # try merging neighboring operations until nothing changes
+        changed = True
+        while changed:
+            changed = False
+            for k in grid:
+                q = grid[k]
+                i = 0  # index along the wire
+                _print_list(i, q)
+                while i < len(q):
                     a = q[i]
-                    b = q[i+1]
-                    # the ops must have equal size and act on the same wires
-                    if a.op.ns == b.op.ns and a.reg == b.reg:
-                        if a.op.ns != 1:
-                            # ns > 1 is tougher. on no wire must there be anything
-                            # between them, also deleting is more complicated
-                            # todo treat it as a failed merge for now
-                            i += 1
-                            continue
+                    b = follower(a)
+                    if b is None:
+                        i += 1
+                        continue
+                    try:
                         op = a.op.merge(b.op)
-                        # merge was successful, delete the old ops
-                        del q[i:i+2]
-                        # insert the merged op (unless it's identity)
-                        if op is not None:
-                            q.insert(i, Command(op, a.reg))
-                        # move one spot backwards to try another merge
-                        if i > 0:
-                            i -= 1
-                        _print_list(i, q)
+                    except MergeFailure:
+                        i += 1  # failed at merging the ops, move forward
                         continue
-                except MergeFailure:
-                    pass
-                i += 1  # failed at merging the ops, move forward
+                    # merge was successful, replace the old ops on all their wires
+                    merged = None if op is None else Command(op, a.reg)
+                    for r in a.get_dependencies():
+                        temp = grid[r.ind]
+                        j = temp.index(a)
+                        temp[j:j+2] = [] if merged is None else [merged]
+                    changed = True
+                    # move one spot backwards to try another merge
+                    if i > 0:
+                        i -= 1
+                    _print_list(i, q)
 
         # convert the circuit back into a list (via a DAG)
-        DAG = self._grid_to_DAG(grid)
-        self.circuit = self._DAG_to_list(DAG)
-
+        DAG = cls._grid_to_DAG(grid)
+        return cls._DAG_to_list(DAG)
 
     def draw_circuit(self, tex_dir='./circuit_tex', write_to_file=True):
         r"""Draw the circuit using the Qcircuit :math:`\LaTeX` package.
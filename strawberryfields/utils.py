@@ -127,9 +127,9 @@ Code details
 """
 import collections
 import copy
+import sys
 from inspect import signature
 
-import tensorflow as tf
 import numpy as np
 from numpy.random import randn
 from numpy.polynomial.hermite import hermval
@@ -921,14 +921,15 @@ def extract_unitary(prog, cutoff_dim: int, vectorize_modes: bool = False, backen
         if backend == 'fock':
             reshape = np.reshape
         else:
-            reshape = tf.reshape
+            # the 'tf' backend has already imported TensorFlow
+            reshape = sys.modules['tensorflow'].reshape
         return reshape(result, [cutoff_dim**N, cutoff_dim**N])
 
     # here we rearrange the indices to go back to the order [in1, out1, in2, out2, etc...]
     if backend == 'fock':
         tp = np.transpose
     else:
-        tp = tf.transpose
+        tp = sys.modules['tensorflow'].transpose
     return tp(result, [int(n) for n in np.arange(2*N).reshape((2, N)).T.reshape([-1])])
 
 
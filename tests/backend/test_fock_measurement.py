@@ -20,6 +20,8 @@ pytestmark = pytest.mark.backends("fock", "tf")
 
 import numpy as np
 
+from strawberryfields.backends.base import NotApplicableError
+
 
 NUM_REPEATS = 50
 
@@ -95,3 +97,90 @@ class TestFockRepresentation:
                 ref_result = tuple(np.array([i] * batch_size) for i in ref_result)
 
             assert np.allclose(meas_result, ref_result, atol=tol, rtol=0)
+
+
+@pytest.mark.backends("fock")
+class TestShots:
+    """Tests for Fock measurements drawing several shots at once."""
+
+    def test_fock_states(self, setup_backend, pure, tol):
+        """Tests that the shots of a multimode Fock state are returned in the
+        order of the measured modes, and that the modes are reset to vacuum."""
+        shots = 20
+        n = [1, 2, 0]
+        backend = setup_backend(3)
+        backend.reset(pure=pure)
+        for mode, k in enumerate(n):
+            backend.prepare_fock_state(k, mode)
+
+        meas_result = backend.measure_fock([2, 0, 1], shots=shots)
+
+        assert meas_result.shape == (shots, 3)
+        assert np.all(meas_result == [n[2], n[0], n[1]])
+        assert np.all(backend.is_vacuum(tol))
+
+    def test_correlated_outcomes(self, setup_backend, pure):
+        """Tests that the shots are drawn from the joint distribution of the
+        measured modes, using a single photon split by a beamsplitter."""
+        shots = 400
+        backend = setup_backend(3)
+        backend.reset(pure=pure)
+        backend.prepare_fock_state(1, 0)
+        backend.beamsplitter(1 / np.sqrt(2), 1 / np.sqrt(2), 0, 1)
+
+        meas_result = backend.measure_fock([1, 0], shots=shots)
+
+        assert np.all(meas_result.sum(axis=1) == 1)
+        assert np.allclose(meas_result[:, 0].mean(), 0.5, atol=10 / np.sqrt(shots), rtol=0)
+
+    def test_marginal_distribution(self, setup_backend, pure):
+        """Tests that the shots reproduce the photon number distribution of a
+        coherent state."""
+        shots = 2000
+        alpha = 0.8
+        backend = setup_backend(2)
+        backend.reset(pure=pure)
+        backend.prepare_coherent_state(alpha, 1)
+        expected = backend.state().reduced_dm(1).diagonal().real
+
+        meas_result = backend.measure_fock([1], shots=shots)[:, 0]
+        freqs = np.bincount(meas_result, minlength=len(expected)) / shots
+
+        assert np.allclose(freqs, expected, atol=5 / np.sqrt(shots), rtol=0)
+
+    def test_post_selection_not_supported(self, setup_backend):
+        """Tests that post-selection with several shots raises an error"""
+        backend = setup_backend(1)
+        with pytest.raises(NotApplicableError, match="Post-selection"):
+            backend.measure_fock([0], select=[0], shots=10)
+
+    def test_nonterminal_not_supported(self, setup_backend):
+        """Tests that non-terminal measurements with several shots raise an error"""
+        backend = setup_backend(1)
+        with pytest.raises(NotApplicableError, match="terminal"):
+            backend.measure_fock([0], shots=10, terminal=False)
+
+    def test_reset_all_modes_pure(self, setup_backend, tol):
+        """Tests that measuring all the modes of a pure state leaves it in the pure vacuum state."""
+        backend = setup_backend(3)
+        for mode in range(3):
+            backend.displacement(0.3, mode)
+        backend.measure_fock([0, 1, 2], shots=5)
+
+        state = backend.state()
+        assert state.is_pure
+        assert np.all(backend.is_vacuum(tol))
+
+    def test_reset_unconditioned(self, setup_backend, pure, tol):
+        """Tests that the unmeasured modes are left in their reduced state."""
+        backend = setup_backend(3)
+        backend.reset(pure=pure)
+        backend.squeeze(0.2, 0)
+        backend.beamsplitter(1 / np.sqrt(2), 1 / np.sqrt(2), 0, 1)
+        backend.displacement(0.3, 2)
+        expected = backend.state().reduced_dm([0, 2])
+
+        backend.measure_fock([1], shots=5)
+        state = backend.state()
+        assert np.allclose(state.reduced_dm([0, 2]), expected, atol=tol, rtol=0)
+        assert np.allclose(state.reduced_dm(1)[0, 0], state.trace(), atol=tol, rtol=0)
@@ -0,0 +1,613 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""Unit tests for the low-level Fock backend operations"""
+import pytest
+
+import numpy as np
+
+from strawberryfields.backends.fockbackend import ops
+from strawberryfields.backends.fockbackend.circuit import Circuit, MAX_DIMS
+from strawberryfields.backends.states import BaseFockState
+
+pytestmark = pytest.mark.fock
+
+NUM_MODES = 3
+MODES = [[0], [2], [0, 1], [2, 0]]
+
+
+def random_state(num_modes, cutoff, pure):
+    """Returns a random (unnormalized) ket or density matrix tensor"""
+    ket = np.random.random([cutoff]*num_modes) + 1j*np.random.random([cutoff]*num_modes)
+    if pure:
+        return ket
+    return ops.mix(ket, num_modes)
+
+
+def random_gate(num_modes, cutoff):
+    """Returns a random gate tensor of shape (out1, in1, ...)"""
+    dim = cutoff**num_modes
+    mat = np.random.random([dim, dim]) + 1j*np.random.random([dim, dim])
+    mat = mat.reshape([cutoff]*(2*num_modes))
+    # (out1, out2, ..., in1, in2, ...) -> (out1, in1, out2, in2, ...)
+    transpose_list = [i//2 + (i % 2)*num_modes for i in range(2*num_modes)]
+    return np.transpose(mat, transpose_list)
+
+
+class TestGateApplication:
+    """Tests for the different gate application engines"""
+
+    @pytest.mark.parametrize("modes", MODES)
+    @pytest.mark.parametrize("pure", [True, False])
+    def test_gemm_matches_blas(self, modes, pure, cutoff, tol):
+        """Test that the GEMM gate application agrees with the BLAS engine"""
+        state = random_state(NUM_MODES, cutoff, pure)
+        mat = random_gate(len(modes), cutoff)
+
+        args = [mat, state, pure, modes, NUM_MODES, cutoff]
+        expected = ops.apply_gate_BLAS(*args)
+        res = ops.apply_gate_GEMM(*args)
+        assert np.allclose(res, expected, atol=tol, rtol=0)
+
+    @pytest.mark.parametrize("pure", [True, False])
+    def test_gemm_single_mode_system(self, pure, cutoff, tol):
+        """Test GEMM gate application on a single mode system"""
+        state = random_state(1, cutoff, pure)
+        mat = random_gate(1, cutoff)
+
+        args = [mat, state, pure, [0], 1, cutoff]
+        expected = ops.apply_gate_BLAS(*args)
+        res = ops.apply_gate_GEMM(*args)
+        assert np.allclose(res, expected, atol=tol, rtol=0)
+
+    @pytest.mark.parametrize("mode", ["einsum", "gemm"])
+    @pytest.mark.parametrize("pure", [True, False])
+    def test_circuit_modes_agree(self, mode, pure, cutoff, tol):
+        """Test that a circuit gives the same state for every gate application mode"""
+        ref = Circuit(NUM_MODES, cutoff, pure=pure, mode="blas")
+        circuit = Circuit(NUM_MODES, cutoff, pure=pure, mode=mode)
+
+        for c in (ref, circuit):
+            c.displacement(0.2, 0)
+            c.squeeze(0.1, 0.3, 2)
+            c.beamsplitter(np.cos(0.4), np.sin(0.4), 0.1, 0, 2)
+            c.loss(0.8, 1)
+
+        assert np.allclose(circuit.get_state()[0], ref.get_state()[0], atol=tol, rtol=0)
+
+    @pytest.mark.parametrize("engine", [ops.apply_gate_BLAS, ops.apply_gate_einsum, ops.apply_gate_GEMM])
+    @pytest.mark.parametrize("modes", MODES)
+    @pytest.mark.parametrize("pure", [True, False])
+    def test_output_buffer(self, engine, modes, pure, cutoff, tol):
+        """Test that the gate application engines write into a provided output array"""
+        state = random_state(NUM_MODES, cutoff, pure)
+        mat = random_gate(len(modes), cutoff)
+        out = np.empty_like(state)
+
+        args = [mat, state, pure, modes, NUM_MODES, cutoff]
+        expected = engine(*args)
+        res = engine(*args, out=out)
+        assert res is out
+        assert np.allclose(res, expected, atol=tol, rtol=0)
+
+
+class TestStateBuffers:
+    """Tests for the reuse of the state arrays by the Fock circuit"""
+
+    @pytest.mark.parametrize("mode", ["blas", "einsum", "gemm"])
+    @pytest.mark.parametrize("pure", [True, False])
+    def test_gates_alternate_between_two_buffers(self, mode, pure, cutoff):
+        """Test that a sequence of gates does not allocate new state arrays"""
+        circuit = Circuit(NUM_MODES, cutoff, pure=pure, mode=mode)
+        circuit.displacement(0.2, 0)
+        first = circuit._state
+        circuit.squeeze(0.1, 0.3, 1)
+        second = circuit._state
+        circuit.beamsplitter(np.cos(0.4), np.sin(0.4), 0.1, 0, 2)
+        assert circuit._state is first
+        circuit.kerr_interaction(0.1, 2)
+        assert circuit._state is second
+
+    def test_returned_state_is_not_overwritten(self, cutoff):
+        """Test that a state returned by get_state is not reused as a buffer"""
+        circuit = Circuit(NUM_MODES, cutoff)
+        circuit.displacement(0.2, 0)
+        state, _ = circuit.get_state()
+        expected = state.copy()
+
+        circuit.squeeze(0.1, 0.3, 1)
+        circuit.beamsplitter(np.cos(0.4), np.sin(0.4), 0.1, 0, 2)
+        circuit.phase_shift(0.3, 2)
+        assert np.all(state == expected)
+
+    def test_measurement_reuses_buffer(self, cutoff, tol):
+        """Test that post-selected Fock measurements write into the spare buffer"""
+        circuit = Circuit(NUM_MODES, cutoff)
+        circuit.displacement(0.5, 0)
+        circuit.beamsplitter(np.cos(0.4), np.sin(0.4), 0., 0, 1)
+        circuit.displacement(0.1, 2)
+        state = circuit._state
+
+        # projection and normalization each swap the two buffers
+        circuit.measure_fock([1], select=[1])
+        assert circuit._state is state
+        assert np.allclose(circuit.norm(), 1, atol=tol, rtol=0)
+
+
+class TestChannels:
+    """Tests for the application of channels"""
+
+    @pytest.mark.parametrize("T", [0, 0.3, 1])
+    @pytest.mark.parametrize("mode", [0, 1, 2])
+    def test_loss_superoperator_matches_kraus(self, T, mode, cutoff, tol):
+        """Test that the fused loss superoperator agrees with the sum over Kraus operators"""
+        state = random_state(NUM_MODES, cutoff, False)
+        args = [state, False, [mode], NUM_MODES, cutoff]
+        expected = sum(ops.apply_gate_einsum(k, *args) for k in ops.lossChannel(T, cutoff))
+
+        superop = ops.lossSuperoperator(T, cutoff)
+        assert superop.shape == (cutoff,)*4
+
+        res = ops.apply_superoperator(superop, state, mode, NUM_MODES, cutoff)
+        assert np.allclose(res, expected, atol=tol, rtol=0)
+
+        out = np.empty_like(state)
+        res = ops.apply_superoperator(superop, state, mode, NUM_MODES, cutoff, out=out)
+        assert res is out
+        assert np.allclose(res, expected, atol=tol, rtol=0)
+
+    @pytest.mark.parametrize("mode", ["blas", "einsum", "gemm"])
+    def test_kraus_accumulation(self, mode, cutoff, tol):
+        """Test that a channel given by Kraus operators is accumulated correctly"""
+        circuit = Circuit(NUM_MODES, cutoff, pure=False, mode=mode)
+        circuit.displacement(0.4, 1)
+        circuit.beamsplitter(np.cos(0.4), np.sin(0.4), 0.1, 0, 1)
+        state = circuit.get_state()[0].copy()
+
+        kraus = ops.lossChannel(0.6, cutoff)
+        args = [state, False, [1], NUM_MODES, cutoff]
+        expected = sum(ops.apply_gate_einsum(k, *args) for k in kraus)
+
+        circuit._apply_channel(kraus, [1])
+        assert np.allclose(circuit.get_state()[0], expected, atol=tol, rtol=0)
+
+
+class TestPartialTrace:
+    """Tests for the partial trace of pure states"""
+
+    @pytest.mark.parametrize("modes", [[], [1], [2, 0], [0, 1, 2]])
+    def test_matches_mixed(self, modes, cutoff, tol):
+        """Test that tracing out modes from the ket agrees with tracing them out of the density matrix"""
+        state = random_state(NUM_MODES, cutoff, True)
+        expected = ops.partial_trace(ops.mix(state, NUM_MODES), NUM_MODES, modes)
+        res = ops.partial_trace_pure(state, NUM_MODES, modes)
+        assert res.shape == (cutoff,) * (2 * (NUM_MODES - len(modes)))
+        assert np.allclose(res, expected, atol=tol, rtol=0)
+
+    def test_many_modes(self, tol):
+        """Test the reduced state of a single mode of a 7 mode product state, whose
+        full density matrix would not fit in memory"""
+        n, cutoff = 7, 8
+        ket = np.random.random(cutoff) + 1j*np.random.random(cutoff)
+        ket /= np.linalg.norm(ket)
+        vac = ops.vacuumState(n - 1, cutoff)
+        state = np.moveaxis(np.tensordot(vac, ket, axes=0), n - 1, 3)
+
+        res = ops.partial_trace_pure(state, n, [i for i in range(n) if i != 3])
+        assert np.allclose(res, np.outer(ket, ket.conj()), atol=tol, rtol=0)
+
+
+class TestDiagonalGates:
+    """Tests for the application of gates that are diagonal in the Fock basis"""
+
+    @pytest.mark.parametrize("modes", [[0], [2]])
+    @pytest.mark.parametrize("pure", [True, False])
+    @pytest.mark.parametrize("gate", ["phase", "kerr"])
+    def test_single_mode(self, gate, modes, pure, cutoff, tol):
+        """Test that single mode diagonal gates agree with their dense matrices"""
+        state = random_state(NUM_MODES, cutoff, pure)
+        mat = getattr(ops, gate)(0.3, cutoff)
+        diag = getattr(ops, gate + "_diagonal")(0.3, cutoff)
+        assert np.allclose(np.diag(diag), mat, atol=tol, rtol=0)
+
+        expected = ops.apply_gate_BLAS(mat, state, pure, modes, NUM_MODES, cutoff)
+        res = ops.apply_gate_diagonal(diag, state, pure, modes, NUM_MODES, cutoff)
+        assert np.allclose(res, expected, atol=tol, rtol=0)
+
+    @pytest.mark.parametrize("modes", [[0, 1], [2, 0]])
+    @pytest.mark.parametrize("pure", [True, False])
+    def test_cross_kerr(self, modes, pure, cutoff, tol):
+        """Test that the diagonal cross-Kerr gate agrees with its dense matrix"""
+        state = random_state(NUM_MODES, cutoff, pure)
+        mat = ops.cross_kerr(0.3, cutoff)
+        diag = ops.cross_kerr_diagonal(0.3, cutoff)
+
+        expected = ops.apply_gate_BLAS(mat, state, pure, modes, NUM_MODES, cutoff)
+        res = ops.apply_gate_diagonal(diag, state, pure, modes, NUM_MODES, cutoff)
+        assert np.allclose(res, expected, atol=tol, rtol=0)
+
+    @pytest.mark.parametrize("modes", [[0, 1], [2, 0]])
+    @pytest.mark.parametrize("pure", [True, False])
+    def test_non_symmetric_diagonal(self, modes, pure, cutoff, tol):
+        """Test that the axes of a two mode diagonal are matched to the modes in order"""
+        state = random_state(NUM_MODES, cutoff, pure)
+        diag = np.exp(1j*np.random.random([cutoff, cutoff]))
+        mat = np.diag(diag.ravel()).reshape([cutoff]*4).swapaxes(1, 2)
+
+        expected = ops.apply_gate_BLAS(mat, state, pure, modes, NUM_MODES, cutoff)
+        res = ops.apply_gate_diagonal(diag, state, pure, modes, NUM_MODES, cutoff)
+        assert np.allclose(res, expected, atol=tol, rtol=0)
+
+    def test_unknown_structure(self, cutoff):
+        """Test that an unknown gate structure raises an exception"""
+        circuit = Circuit(NUM_MODES, cutoff)
+        with pytest.raises(ValueError, match="Unknown gate structure"):
+            circuit._apply_gate(ops.phase(0.1, cutoff), [0], structure="banded")
+
+
+class TestBeamsplitterRecursion:
+    """Tests for the recursive construction of the beamsplitter matrix"""
+
+    @pytest.mark.parametrize("theta", [0, 0.4, np.pi/2, 2.1])
+    @pytest.mark.parametrize("phi", [0, 0.7, -2.0])
+    def test_agrees_with_prefactors(self, theta, phi, cutoff, tol):
+        """Test that the recursion agrees with the prefactor contraction"""
+        t, r = np.cos(theta), np.sin(theta)
+        expected = ops.beamsplitter(t, r, phi, cutoff)
+        res = ops.beamsplitter_recursive(t, r, phi, cutoff)
+        assert np.allclose(res, expected, atol=tol, rtol=0)
+
+    def test_photon_number_conserving(self, cutoff):
+        """Test that only the blocks with equal input and output photon number are non-zero"""
+        res = ops.beamsplitter_recursive(np.cos(0.4), np.sin(0.4), 0.7, cutoff)
+        out1, in1, out2, in2 = np.ogrid[:cutoff, :cutoff, :cutoff, :cutoff]
+        assert np.all(res[out1+out2 != in1+in2] == 0)
+
+    def test_unitary_below_cutoff(self, tol):
+        """Test that the blocks with total photon number below the cutoff are unitary"""
+        cutoff = 12
+        res = ops.beamsplitter_recursive(np.cos(0.4), np.sin(0.4), 0.7, cutoff)
+        for total in range(cutoff):
+            block = np.array([[res[i, k, total-i, total-k] for k in range(total+1)] for i in range(total+1)])
+            assert np.allclose(block @ block.conj().T, np.identity(total+1), atol=tol, rtol=0)
+
+
+class TestBlockGates:
+    """Tests for the application of two mode gates that conserve the total photon number"""
+
+    def random_conserving_gate(self, cutoff):
+        """Random two mode gate that is non-zero only in the photon number conserving blocks"""
+        mat = random_gate(2, cutoff)
+        out1, in1, out2, in2 = np.ogrid[:cutoff, :cutoff, :cutoff, :cutoff]
+        return np.where(out1+out2 == in1+in2, mat, 0)
+
+    @pytest.mark.parametrize("modes", [[0, 1], [2, 0], [1, 2]])
+    @pytest.mark.parametrize("pure", [True, False])
+    def test_agrees_with_dense(self, modes, pure, cutoff, tol):
+        """Test that block application agrees with dense application of the gate"""
+        state = random_state(NUM_MODES, cutoff, pure)
+        mat = self.random_conserving_gate(cutoff)
+        blocks = ops.photon_number_blocks(mat, cutoff)
+
+        expected = ops.apply_gate_BLAS(mat, state, pure, modes, NUM_MODES, cutoff)
+        res = ops.apply_gate_blocks(blocks, state, pure, modes, NUM_MODES, cutoff)
+        assert np.allclose(res, expected, atol=tol, rtol=0)
+
+        out = np.empty_like(state)
+        res = ops.apply_gate_blocks(blocks, state, pure, modes, NUM_MODES, cutoff, out=out)
+        assert res is out
+        assert np.allclose(out, expected, atol=tol, rtol=0)
+
+        # the state is not modified, unless it is also the output buffer
+        assert not np.allclose(state, expected, atol=tol, rtol=0)
+        res = ops.apply_gate_blocks(blocks, state, pure, modes, NUM_MODES, cutoff, out=state)
+        assert res is state
+        assert np.allclose(state, expected, atol=tol, rtol=0)
+
+    def test_blocks(self, cutoff):
+        """Test the sizes of the photon number blocks, and that they contain all non-zero elements"""
+        mat = self.random_conserving_gate(cutoff)
+        blocks = ops.photon_number_blocks(mat, cutoff)
+
+        sizes = [min(s, 2*cutoff-2-s) + 1 for s in range(2*cutoff-1)]
+        assert [b.shape for b in blocks] == [(i, i) for i in sizes]
+        assert np.allclose(sum(np.sum(np.abs(b)**2) for b in blocks), np.sum(np.abs(mat)**2))
+
+    @pytest.mark.parametrize("pure", [True, False])
+    def test_circuit_beamsplitter(self, pure, cutoff, tol):
+        """Test that the circuit beamsplitter agrees with the dense beamsplitter matrix"""
+        state = random_state(NUM_MODES, cutoff, pure)
+        circuit = Circuit(NUM_MODES, cutoff)
+        circuit._state = state.copy()
+        circuit._pure = pure
+        circuit.beamsplitter(np.cos(0.4), np.sin(0.4), 0.7, 2, 0)
+
+        mat = ops.beamsplitter(np.cos(0.4), np.sin(0.4), 0.7, cutoff)
+        expected = ops.apply_gate_BLAS(mat, state, pure, [2, 0], NUM_MODES, cutoff)
+        assert np.allclose(circuit._state, expected, atol=tol, rtol=0)
+
+
+class TestGateCache:
+    """Tests for the memory bounded cache of gate matrices"""
+
+    def test_hits_and_misses(self):
+        """Test that repeated calls are served from the cache"""
+        cache = ops.GateCache()
+        identity = cache(lambda trunc: np.identity(trunc))
+
+        first = identity(4)
+        assert identity(4) is first
+        assert identity(5) is not first
+
+        info = cache.cache_info()
+        assert (info.hits, info.misses, info.evictions, info.entries) == (1, 2, 0, 2)
+        assert info.currbytes == first.nbytes + identity(5).nbytes
+        assert info.maxbytes is None
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entries are evicted once the budget is exceeded"""
+        cache = ops.GateCache(maxbytes=3*8*10)
+        ones = cache(lambda x: np.ones(10))
+
+        for x in range(3):
+            ones(x)
+        ones(0)
+        ones(3)
+
+        assert cache.cache_info().entries == 3
+        assert cache.cache_info().evictions == 1
+        assert [key[1] for key in cache._data] == [(2,), (0,), (3,)]
+
+    def test_too_large(self):
+        """Test that results larger than the budget are returned but not cached"""
+        cache = ops.GateCache(maxbytes=100)
+        ones = cache(lambda n: np.ones(n))
+
+        assert np.all(ones(100) == 1)
+        info = cache.cache_info()
+        assert (info.misses, info.entries, info.currbytes) == (1, 0, 0)
+
+    def test_kinds(self):
+        """Test that statistics and clearing can be restricted to a single gate kind"""
+        cache = ops.GateCache()
+
+        @cache
+        def first(n):
+            return np.ones(n)
+
+        @cache
+        def second(n):
+            return np.zeros(n)
+
+        first(2)
+        first(2)
+        second(3)
+
+        assert first.cache_info() == ops.GateCacheInfo(1, 1, 0, 16, None, 1)
+        assert second.cache_info() == ops.GateCacheInfo(0, 1, 0, 24, None, 1)
+        assert cache.cache_info() == ops.GateCacheInfo(1, 2, 0, 40, None, 2)
+
+        first.cache_clear()
+        assert cache.cache_info() == ops.GateCacheInfo(0, 1, 0, 24, None, 1)
+
+    def test_resize(self):
+        """Test that shrinking the budget evicts entries, and that a negative budget is rejected"""
+        cache = ops.GateCache()
+        ones = cache(lambda n: np.ones(n))
+        ones(10)
+        ones(20)
+
+        cache.resize(8*20)
+        assert cache.cache_info().entries == 1
+        assert cache.cache_info().currbytes == 8*20
+
+        with pytest.raises(ValueError, match="must be non-negative"):
+            cache.resize(-1)
+
+    def test_gate_blocks(self, cutoff):
+        """Test that the beamsplitter blocks are cached without their dense matrix"""
+        ops.beamsplitter_recursive.cache_clear()
+        ops.beamsplitter_blocks.cache_clear()
+
+        ops.beamsplitter_blocks(0.6, 0.8, 0.1, cutoff)
+        ops.beamsplitter_blocks(0.6, 0.8, 0.1, cutoff)
+        assert ops.beamsplitter_blocks.cache_info().hits == 1
+        assert ops.beamsplitter_recursive.cache_info().entries == 0
+
+    def test_states(self, cutoff):
+        """Test that states depending on continuous parameters share the bounded cache"""
+        cache = ops.gate_cache
+        maxbytes = cache.maxbytes
+        try:
+            ops.coherentState.cache_clear()
+            cache.resize(16 * cutoff * 3)
+            for k in range(10):
+                ops.coherentState(0.1 * k, cutoff)
+                ops.squeezedState(0.1 * k, 0.2, cutoff)
+                ops.displacedSqueezed(0.1 * k, 0.3, 0.2, cutoff)
+            assert cache.cache_info().currbytes <= 16 * cutoff * 3
+            assert ops.coherentState.cache_info().misses == 10
+        finally:
+            cache.resize(maxbytes)
+
+    def test_backend_option(self):
+        """Test that the budget can be set when beginning a circuit"""
+        from strawberryfields.backends.fockbackend import FockBackend
+
+        backend = FockBackend()
+        maxbytes = ops.gate_cache.maxbytes
+        try:
+            backend.begin_circuit(2, cutoff_dim=4, gate_cache_bytes=2**20)
+            assert ops.gate_cache.maxbytes == 2**20
+            backend.beamsplitter(0.6, 0.8, 0, 1)
+            assert backend.gate_cache_info().currbytes <= 2**20
+
+            # the budget is kept if the option is not passed
+            backend.begin_circuit(2, cutoff_dim=4)
+            assert ops.gate_cache.maxbytes == 2**20
+        finally:
+            ops.gate_cache.resize(maxbytes)
+
+
+class TestManyModes:
+    """Tests for states with more modes than there are letters in the alphabet.
+
+    A pure state with 30 modes and a cutoff of 2 requires 16 GiB of memory, so
+    the ops are tested on states where all but a few of the modes have
+    dimension 1. Mixed states are limited to 15 modes, as NumPy only supports
+    arrays with fewer than 32 dimensions in einsum.
+    """
+
+    def padded(self, state, modes, n):
+        """Embeds a state into a larger system, in which all other modes have dimension 1"""
+        shape = [1] * n
+        for i in modes:
+            shape[i] = state.shape[0]
+        return state.reshape(shape)
+
+    @pytest.mark.parametrize("gate_modes", [[28], [3, 28], [28, 3]])
+    def test_einsum_gate_pure(self, gate_modes, tol):
+        """Test that einsum gate application works for a pure state with 30 modes"""
+        cutoff = 2
+        n = 30
+        modes = [3, 10, 28]
+        state = random_state(3, cutoff, True)
+        mat = random_gate(len(gate_modes), cutoff)
+
+        expected = ops.apply_gate_BLAS(mat, state, True, [modes.index(i) for i in gate_modes], 3, cutoff)
+        res = ops.apply_gate_einsum(mat, self.padded(state, modes, n), True, gate_modes, n, cutoff)
+        assert res.ndim == n
+        assert np.allclose(res.reshape(expected.shape), expected, atol=tol, rtol=0)
+
+    @pytest.mark.parametrize("gate_modes", [[14], [2, 14], [14, 2]])
+    def test_einsum_gate_mixed(self, gate_modes, tol):
+        """Test that einsum gate application works for a mixed state with 15 modes"""
+        cutoff = 2
+        n = 15
+        modes = [2, 7, 14]
+        state = random_state(3, cutoff, True)
+        mat = random_gate(len(gate_modes), cutoff)
+
+        rho = ops.mix(self.padded(state, modes, n), n)
+        assert rho.ndim == 2*n
+
+        expected = ops.apply_gate_BLAS(mat, ops.mix(state, 3), False, [modes.index(i) for i in gate_modes], 3, cutoff)
+        res = ops.apply_gate_einsum(mat, rho, False, gate_modes, n, cutoff)
+        assert np.allclose(res.reshape(expected.shape), expected, atol=tol, rtol=0)
+
+    def test_reductions(self, tol):
+        """Test the trace, diagonal and partial trace of a mixed state with 15 modes"""
+        cutoff = 2
+        n = 15
+        modes = [2, 7, 14]
+        state = random_state(3, cutoff, True)
+        rho = ops.mix(self.padded(state, modes, n), n)
+        small = ops.mix(state, 3)
+
+        assert np.allclose(ops.trace(rho, n), ops.trace(small, 3), atol=tol, rtol=0)
+        assert np.allclose(ops.diagonal(rho, n).ravel(), ops.diagonal(small, 3).ravel(), atol=tol, rtol=0)
+
+        res = ops.partial_trace(rho, n, [i for i in range(n) if i != 7])
+        expected = ops.partial_trace(small, 3, [0, 2])
+        assert np.allclose(res, expected, atol=tol, rtol=0)
+
+    def test_fidelity_coherent(self, tol):
+        """Test the coherent state fidelity of a pure state with 30 modes"""
+        cutoff = 3
+        n = 30
+        modes = [3, 10, 28]
+        state = random_state(3, cutoff, True)
+        state /= np.linalg.norm(state)
+        alpha = [0.1, 0.2j, -0.3]
+
+        small = BaseFockState(state, 3, True, cutoff)
+        big = BaseFockState(self.padded(state, modes, n), n, True, cutoff)
+        big_alpha = [0] * n
+        for i, a in zip(modes, alpha):
+            big_alpha[i] = a
+
+        assert np.allclose(big.fidelity_coherent(big_alpha), small.fidelity_coherent(alpha), atol=tol, rtol=0)
+
+    def test_too_many_modes(self):
+        """Test that the circuit refuses states with more dimensions than NumPy arrays can have"""
+        with pytest.raises(ValueError, match="maximum of"):
+            Circuit(MAX_DIMS // 2 + 1, 1, pure=False)
+
+        circuit = Circuit(MAX_DIMS // 2 + 1, 1)
+        with pytest.raises(ValueError, match="maximum of"):
+            circuit.loss(0.5, 0)
+
+        with pytest.raises(ValueError, match="maximum of"):
+            Circuit(MAX_DIMS + 1, 1)
+
+    def test_circuit(self, tol):
+        """Test a circuit with a cutoff of 2 and 18 modes, which have more ket and bra
+        indices together than there are letters in the alphabet"""
+        cutoff = 2
+        n = 18
+        circuit = Circuit(n, cutoff, mode="gemm")
+        circuit.displacement(0.3, 0)
+        circuit.beamsplitter(np.cos(0.4), np.sin(0.4), 0.1, 0, n-1)
+        circuit.kerr_interaction(0.1, n-1)
+
+        ref = Circuit(2, cutoff)
+        ref.displacement(0.3, 0)
+        ref.beamsplitter(np.cos(0.4), np.sin(0.4), 0.1, 0, 1)
+        ref.kerr_interaction(0.1, 1)
+
+        state = circuit.get_state()[0]
+        assert np.allclose(state[(slice(None),) + (0,)*(n-2)], ref.get_state()[0], atol=tol, rtol=0)
+        assert np.allclose(circuit.norm(), ref.norm(), atol=tol, rtol=0)
+
+
+class TestHomodyne:
+    """Tests for the homodyne probability density and sampling"""
+
+    def test_hermite_functions_orthonormal(self):
+        """Test that the position wavefunctions of the Fock states are orthonormal,
+        including for Fock states where the Hermite polynomials overflow"""
+        cutoff = 200
+        q = np.linspace(-30, 30, 20000)
+        psi = ops.hermite_functions(q, 0.5, cutoff)
+        overlaps = psi @ psi.T * (q[1] - q[0])
+        assert np.allclose(overlaps, np.identity(cutoff), atol=1e-6, rtol=0)
+
+    def test_pdf_squeezed_coherent(self, hbar):
+        """Test the quadrature density of a squeezed coherent state"""
+        cutoff = 40
+        alpha, r = 0.5 + 0.3j, 0.4
+        ket = ops.displacedSqueezed(alpha, r, 0, cutoff)
+        rho = np.outer(ket, ket.conj())
+
+        q = np.linspace(-6, 6, 101)
+        res = ops.homodyne_pdf(rho, q, 1 / hbar)
+
+        mean = np.sqrt(2 * hbar) * alpha.real
+        var = hbar / 2 * np.exp(-2 * r)
+        expected = np.exp(-(q - mean)**2 / (2 * var)) / np.sqrt(2 * np.pi * var)
+        assert np.allclose(res, expected, atol=1e-6, rtol=0)
+
+    def test_samples(self, hbar):
+        """Test that the samples of a squeezed state have the expected mean and variance,
+        and resolve a distribution much narrower than the search interval"""
+        cutoff = 40
+        shots = 10000
+        alpha, r = 1.0, 1.0
+        ket = ops.displacedSqueezed(alpha, r, 0, cutoff)
+        rho = np.outer(ket, ket.conj())
+
+        x = ops.homodyne_samples(rho, 1 / hbar, 10, 1000, shots=shots)
+        std = np.sqrt(hbar / 2) * np.exp(-r)
+        assert x.shape == (shots,)
+        assert np.allclose(x.mean(), np.sqrt(2 * hbar) * alpha, atol=5 * std / np.sqrt(shots), rtol=0)
+        assert np.allclose(x.std(), std, rtol=0.05, atol=0)
@@ -0,0 +1,176 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""Unit tests for the GaussianModes class of the Gaussian backend"""
+import pytest
+
+import numpy as np
+
+from strawberryfields.backends.gaussianbackend.gaussiancircuit import GaussianModes
+
+pytestmark = pytest.mark.gaussian
+
+NUM_MODES = 5
+
+
+def random_circuit(num_modes):
+    """A GaussianModes instance in a random mixed Gaussian state"""
+    circuit = GaussianModes(num_modes, hbar=2)
+    for k in range(num_modes):
+        circuit.init_thermal(np.random.random(), k)
+        circuit.squeeze(np.random.random(), 2*np.pi*np.random.random(), k)
+        circuit.displace(np.random.random() + 1j*np.random.random(), k)
+    for k in range(num_modes-1):
+        circuit.beamsplitter(np.random.random(), 2*np.pi*np.random.random(), k, k+1)
+    return circuit
+
+
+def symplectic(U, W):
+    r"""The symplectic matrix in xxpp ordering of the transformation
+    :math:`a\to Ua + Wa^\dagger` of the annihilation operators"""
+    return np.block([[(U+W).real, -(U-W).imag], [(U+W).imag, (U-W).real]])
+
+
+def assert_transformed(circuit, S, V, r, tol):
+    """Check that the circuit state is the symplectic transformation of the given covariance and means"""
+    n = circuit.nlen
+    mean = np.concatenate([2*circuit.mean.real, 2*circuit.mean.imag])
+    assert np.allclose(circuit.scovmatxp(), S @ V @ S.T, atol=tol, rtol=0)
+    assert np.allclose(mean, S @ r, atol=tol, rtol=0)
+    assert np.allclose(circuit.nmat, circuit.nmat.conj().T, atol=tol, rtol=0)
+    assert np.allclose(circuit.mmat, circuit.mmat.T, atol=tol, rtol=0)
+    assert circuit.nmat.shape == circuit.mmat.shape == (n, n)
+
+
+class TestGates:
+    """Tests for the covariance matrix and mean updates of the gates"""
+
+    @pytest.mark.parametrize("k", [0, 2, NUM_MODES-1])
+    def test_squeeze(self, k, tol):
+        """Test the squeeze update agrees with the symplectic transformation"""
+        circuit = random_circuit(NUM_MODES)
+        V = circuit.scovmatxp()
+        r = np.concatenate([2*circuit.mean.real, 2*circuit.mean.imag])
+
+        s, phi = 0.6, 0.4
+        U = np.identity(NUM_MODES, dtype=complex)
+        W = np.zeros([NUM_MODES, NUM_MODES], dtype=complex)
+        U[k, k] = np.cosh(s)
+        W[k, k] = -np.exp(1j*phi)*np.sinh(s)
+
+        circuit.squeeze(s, phi, k)
+        assert_transformed(circuit, symplectic(U, W), V, r, tol)
+
+    @pytest.mark.parametrize("k", [0, 2, NUM_MODES-1])
+    def test_phase_shift(self, k, tol):
+        """Test the phase shift update agrees with the symplectic transformation"""
+        circuit = random_circuit(NUM_MODES)
+        V = circuit.scovmatxp()
+        r = np.concatenate([2*circuit.mean.real, 2*circuit.mean.imag])
+
+        phi = 0.7
+        U = np.identity(NUM_MODES, dtype=complex)
+        U[k, k] = np.exp(1j*phi)
+
+        circuit.phase_shift(phi, k)
+        assert_transformed(circuit, symplectic(U, 0*U), V, r, tol)
+
+    @pytest.mark.parametrize("k, l", [(0, 1), (3, 1), (0, NUM_MODES-1)])
+    def test_beamsplitter(self, k, l, tol):
+        """Test the beamsplitter update agrees with the symplectic transformation"""
+        circuit = random_circuit(NUM_MODES)
+        V = circuit.scovmatxp()
+        r = np.concatenate([2*circuit.mean.real, 2*circuit.mean.imag])
+
+        theta, phi = 0.5, 0.3
+        U = np.identity(NUM_MODES, dtype=complex)
+        U[k, k] = U[l, l] = np.cos(theta)
+        U[k, l] = np.exp(1j*phi)*np.sin(theta)
+        U[l, k] = -np.exp(-1j*phi)*np.sin(theta)
+
+        circuit.beamsplitter(theta, phi, k, l)
+        assert_transformed(circuit, symplectic(U, 0*U), V, r, tol)
+
+    def test_add_mode(self, tol):
+        """Test that adding modes keeps the existing state and appends vacuum modes"""
+        circuit = random_circuit(NUM_MODES)
+        nmat, mmat, mean = circuit.nmat.copy(), circuit.mmat.copy(), circuit.mean.copy()
+
+        circuit.add_mode(2)
+        assert circuit.nlen == NUM_MODES+2
+        assert circuit.get_modes() == list(range(NUM_MODES+2))
+        assert np.allclose(circuit.nmat[:NUM_MODES, :NUM_MODES], nmat, atol=tol, rtol=0)
+        assert np.allclose(circuit.mmat[:NUM_MODES, :NUM_MODES], mmat, atol=tol, rtol=0)
+        assert np.allclose(circuit.mean[:NUM_MODES], mean, atol=tol, rtol=0)
+        assert np.all(circuit.nmat[NUM_MODES:] == 0) and np.all(circuit.mmat[:, NUM_MODES:] == 0)
+        assert np.all(circuit.mean[NUM_MODES:] == 0)
+
+
+class TestCache:
+    """Tests for the cache of the derived quantities"""
+
+    def test_cached(self):
+        """Test the derived quantities are computed once between modifications"""
+        circuit = random_circuit(NUM_MODES)
+        for method in ("scovmatxp", "scovmat", "smean", "qmat", "qmatinv", "Amat"):
+            assert getattr(circuit, method)() is getattr(circuit, method)()
+
+        assert circuit.qmat([0, 2]) is circuit.qmat([0, 2])
+        assert circuit.qmat([0, 2]) is not circuit.qmat([2, 0])
+
+    def test_read_only(self):
+        """Test the cached quantities cannot be modified in place"""
+        circuit = random_circuit(NUM_MODES)
+        with pytest.raises(ValueError, match="read-only"):
+            circuit.qmat()[0, 0] = 0
+
+    @pytest.mark.parametrize("modify", [
+        lambda c: c.displace(0.1, 1),
+        lambda c: c.squeeze(0.2, 0.1, 1),
+        lambda c: c.phase_shift(0.3, 1),
+        lambda c: c.beamsplitter(0.4, 0.2, 0, 1),
+        lambda c: c.loss(0.5, 1),
+        lambda c: c.thermal_loss(0.5, 0.2, 1),
+        lambda c: c.init_thermal(0.3, 1),
+        lambda c: c.apply_u(np.roll(np.identity(NUM_MODES), 1, axis=0)),
+        lambda c: c.fromsmean(np.ones(2*NUM_MODES)),
+        lambda c: c.fromscovmat(2*np.identity(2*NUM_MODES)),
+        lambda c: c.homodyne(1),
+        lambda c: c.add_mode(1),
+        lambda c: c.reset(),
+    ])
+    def test_invalidated(self, modify, tol):
+        """Test every modification of the state invalidates the cache"""
+        circuit = random_circuit(NUM_MODES)
+        cached = {m: getattr(circuit, m)() for m in ("scovmat", "smean", "qmat", "qmatinv", "Amat")}
+        version = circuit.version
+
+        modify(circuit)
+        assert circuit.version > version
+
+        fresh = GaussianModes(circuit.nlen, hbar=2)
+        fresh.nmat, fresh.mmat, fresh.mean = circuit.nmat, circuit.mmat, circuit.mean
+        for m, old in cached.items():
+            new = getattr(circuit, m)()
+            assert new is not old
+            assert np.allclose(new, getattr(fresh, m)(), atol=tol, rtol=0)
+
+    def test_inverse(self, tol):
+        """Test the cached inverse and A matrix agree with their definitions"""
+        circuit = random_circuit(NUM_MODES)
+        Q = circuit.qmat()
+        assert np.allclose(circuit.qmatinv() @ Q, np.identity(2*NUM_MODES), atol=tol, rtol=0)
+
+        X = np.roll(np.identity(2*NUM_MODES), NUM_MODES, axis=1)
+        sigmaq = np.block([[circuit.nmat.T, circuit.mmat], [circuit.mmat.conj().T, circuit.nmat]]) + np.identity(2*NUM_MODES)
+        assert np.allclose(circuit.Amat(), X @ (np.identity(2*NUM_MODES) - np.linalg.inv(sigmaq)), atol=tol, rtol=0)
@@ -0,0 +1,245 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""Unit tests for the hafnian functions of the Gaussian backend"""
+import itertools
+
+import pytest
+
+import numpy as np
+
+from strawberryfields.backends.gaussianbackend import hafnian as hf
+from strawberryfields.backends.gaussianbackend import ops
+from strawberryfields.backends.gaussianbackend.gaussiancircuit import GaussianModes
+
+pytestmark = pytest.mark.gaussian
+
+
+def matchings(vertices, loop):
+    """Generates all (loop) perfect matchings of a list of vertices"""
+    if not vertices:
+        yield []
+        return
+
+    first, rest = vertices[0], vertices[1:]
+    if loop:
+        for m in matchings(rest, loop):
+            yield [(first, first)] + m
+    for i, v in enumerate(rest):
+        for m in matchings(rest[:i] + rest[i+1:], loop):
+            yield [(first, v)] + m
+
+
+def brute_force(A, loop=False):
+    """Hafnian by summation over all perfect matchings"""
+    return sum(np.prod([A[i, j] for i, j in m]) for m in matchings(list(range(len(A))), loop))
+
+
+def random_symmetric(n):
+    """Random complex symmetric matrix"""
+    B = np.random.normal(size=(n, n)) + 1j*np.random.normal(size=(n, n))
+    return B + B.T
+
+
+class TestHafnian:
+    """Tests for the eigenvalue-trace hafnian"""
+
+    @pytest.mark.parametrize("n", range(1, 9))
+    @pytest.mark.parametrize("loop", [False, True])
+    def test_brute_force(self, n, loop, tol):
+        """Test the hafnian against the sum over all perfect matchings"""
+        A = random_symmetric(n)
+        assert np.allclose(hf.hafnian(A, loop=loop), brute_force(A, loop), atol=tol, rtol=0)
+
+    def test_empty(self):
+        """Test the hafnian of the empty matrix is one"""
+        assert hf.hafnian(np.zeros([0, 0])) == 1
+
+    def test_identity_blocks(self, tol):
+        """Test the hafnian of the all-ones matrix counts the perfect matchings"""
+        for m in range(1, 6):
+            expected = np.prod(np.arange(1, 2*m, 2))
+            assert np.allclose(hf.hafnian(np.ones([2*m, 2*m])), expected, atol=tol, rtol=0)
+
+
+class TestHafnianRepeated:
+    """Tests for the hafnian of matrices with repeated rows and columns"""
+
+    @pytest.mark.parametrize("rpt", [(1, 0, 2), (2, 2), (3, 1, 1), (4,), (5, 3), (1,)*8, (1,)*6 + (2,)])
+    @pytest.mark.parametrize("loop", [False, True])
+    def test_brute_force(self, rpt, loop, tol):
+        """Test the repeated hafnian against the hafnian of the expanded matrix"""
+        n = len(rpt)
+        A = random_symmetric(n)
+        mu = np.random.normal(size=n) + 1j*np.random.normal(size=n)
+
+        idx = np.repeat(np.arange(n), rpt)
+        expanded = A[np.ix_(idx, idx)]
+        if loop:
+            np.fill_diagonal(expanded, mu[idx])
+
+        res = hf.hafnian_repeated(A, rpt, mu=mu, loop=loop)
+        assert np.allclose(res, brute_force(expanded, loop), atol=tol, rtol=0)
+
+    def test_no_repetitions(self):
+        """Test the hafnian with no repeated rows is one"""
+        assert hf.hafnian_repeated(random_symmetric(3), [0, 0, 0]) == 1
+
+    def test_odd(self):
+        """Test the hafnian of an odd number of rows is zero"""
+        assert hf.hafnian_repeated(random_symmetric(2), [2, 1]) == 0
+
+
+class TestHafnianTensor:
+    """Tests for the loop hafnians of all repetitions below a cutoff"""
+
+    @pytest.mark.parametrize("n, cutoff", [(1, 6), (2, 5), (3, 4)])
+    def test_repeated(self, n, cutoff, tol):
+        """Test every entry agrees with the repeated loop hafnian"""
+        A = random_symmetric(n)
+        mu = np.random.normal(size=n) + 1j*np.random.normal(size=n)
+
+        res = hf.hafnian_tensor(A, mu, cutoff)
+        assert res.shape == (cutoff,)*n
+        for rpt in np.ndindex(*res.shape):
+            expected = hf.hafnian_repeated(A, rpt, mu=mu, loop=True)
+            assert np.allclose(res[rpt], expected, atol=tol, rtol=tol)
+
+    def test_empty(self):
+        """Test the tensor of the empty matrix is the scalar one"""
+        assert hf.hafnian_tensor(np.zeros([0, 0]), np.zeros([0]), 3) == 1
+
+
+class TestFockProb:
+    """Tests for the Fock probabilities of Gaussian states"""
+
+    @pytest.mark.parametrize("displaced", [False, True])
+    @pytest.mark.parametrize("ocp", [(1, 0, 0), (1, 1, 0), (2, 0, 1), (0, 3, 1), (1, 1, 2), (4, 0, 0)])
+    def test_methods_agree(self, displaced, ocp, tol):
+        """Test the hafnian and partition methods give the same probabilities"""
+        circuit = GaussianModes(3, hbar=2)
+        for k in range(3):
+            circuit.squeeze(0.4, 0.3*k, k)
+            if displaced:
+                circuit.displace(0.2 + 0.1j*k, k)
+        circuit.beamsplitter(0.4, 0.1, 0, 1)
+        circuit.beamsplitter(0.7, 0.5, 1, 2)
+        circuit.loss(0.8, 1)
+
+        ocp = np.uint8(ocp)
+        res = ops.fock_prob(circuit, ocp)
+        expected = ops.fock_prob(circuit, ocp, method="partitions")
+        assert np.allclose(res, expected, atol=tol, rtol=0)
+
+    @pytest.mark.parametrize("displaced", [False, True])
+    def test_all_fock_probs(self, displaced, tol):
+        """Test the probabilities of all patterns agree with the individual probabilities"""
+        circuit = GaussianModes(3, hbar=2)
+        for k in range(3):
+            circuit.squeeze(0.4, 0.3*k, k)
+            if displaced:
+                circuit.displace(0.2 + 0.1j*k, k)
+        circuit.beamsplitter(0.4, 0.1, 0, 1)
+        circuit.loss(0.8, 1)
+
+        cutoff = 4
+        res = ops.all_fock_probs(circuit, cutoff)
+        assert res.shape == (cutoff,)*3
+        for ocp in np.ndindex(*res.shape):
+            assert np.allclose(res[ocp], ops.fock_prob(circuit, np.uint8(ocp)), atol=tol, rtol=0)
+
+    def test_unknown_method(self):
+        """Test an unknown method raises an exception"""
+        circuit = GaussianModes(1, hbar=2)
+        with pytest.raises(ValueError, match="Unknown method"):
+            ops.fock_prob(circuit, [1], method="loops")
+
+
+class TestFockSamples:
+    """Tests for the photon number sampling of Gaussian states"""
+
+    @pytest.mark.parametrize("max_size", [2**22, 1])
+    def test_frequencies(self, max_size):
+        """Test the sample frequencies agree with the Fock probabilities, both with
+        the marginal probability tensors and with the hafnians of each outcome"""
+        circuit = GaussianModes(3, hbar=2)
+        for k in range(3):
+            circuit.squeeze(0.4, 0.3*k, k)
+            circuit.displace(0.1 + 0.1j, k)
+        circuit.beamsplitter(0.4, 0.1, 0, 1)
+        circuit.beamsplitter(0.6, 0.3, 1, 2)
+        circuit.loss(0.8, 1)
+
+        cutoff = 6
+        shots = 100000
+        samples = ops.fock_samples(circuit, [2, 0], shots, cutoff, max_size=max_size)
+        assert samples.shape == (shots, 2)
+
+        probs = ops.all_fock_probs(circuit, cutoff).sum(axis=1).T
+        freqs = np.zeros([cutoff, cutoff])
+        np.add.at(freqs, tuple(samples.T), 1 / shots)
+        assert np.allclose(freqs, probs / probs.sum(), atol=0.01, rtol=0)
+
+    def test_vacuum(self):
+        """Test the samples of the vacuum are zero"""
+        samples = ops.fock_samples(GaussianModes(2, hbar=2), [0, 1], 10, 5)
+        assert np.all(samples == 0)
+
+
+def mixed_displaced_circuit():
+    """A three-mode displaced, squeezed and lossy Gaussian state"""
+    circuit = GaussianModes(3, hbar=2)
+    for k in range(3):
+        circuit.squeeze(0.4, 0.3*k, k)
+        circuit.displace(0.2 + 0.1j*k, k)
+    circuit.beamsplitter(0.4, 0.1, 0, 1)
+    circuit.beamsplitter(0.6, 0.3, 1, 2)
+    circuit.loss(0.8, 1)
+    return circuit
+
+
+class TestThreshold:
+    """Tests for the threshold detection of Gaussian states"""
+
+    def test_prob_fock(self, tol):
+        """Test the click probabilities agree with sums of Fock probabilities"""
+        circuit = mixed_displaced_circuit()
+        probs = ops.all_fock_probs(circuit, 14)
+
+        for clicks in itertools.product([0, 1], repeat=3):
+            idx = tuple(slice(1, None) if c else slice(0, 1) for c in clicks)
+            assert np.allclose(ops.threshold_prob(circuit, clicks), np.sum(probs[idx]), atol=1e-6, rtol=0)
+
+    def test_prob_normalized(self, tol):
+        """Test the click probabilities sum to one"""
+        circuit = mixed_displaced_circuit()
+        total = sum(ops.threshold_prob(circuit, c) for c in itertools.product([0, 1], repeat=3))
+        assert np.allclose(total, 1, atol=tol, rtol=0)
+
+    def test_frequencies(self):
+        """Test the sample frequencies agree with the click probabilities"""
+        circuit = mixed_displaced_circuit()
+        shots = 100000
+        samples = ops.threshold_samples(circuit, [2, 0, 1], shots)
+        assert samples.shape == (shots, 3)
+
+        freqs = np.zeros([2, 2, 2])
+        np.add.at(freqs, tuple(samples.T), 1 / shots)
+        for clicks in itertools.product([0, 1], repeat=3):
+            expected = ops.threshold_prob(circuit, [clicks[1], clicks[2], clicks[0]])
+            assert np.allclose(freqs[clicks], expected, atol=0.01, rtol=0)
+
+    def test_vacuum(self):
+        """Test the vacuum never clicks"""
+        samples = ops.threshold_samples(GaussianModes(3, hbar=2), [0, 1, 2], 10)
+        assert np.all(samples == 0)
@@ -16,6 +16,8 @@ import pytest
 
 import numpy as np
 
+from strawberryfields.backends.base import NotApplicableError
+
 mag_alphas = np.linspace(0, 0.8, 4)
 phase_alphas = np.linspace(0, 2 * np.pi, 7, endpoint=False)
 squeeze_val = np.arcsinh(1.0)
@@ -80,3 +82,24 @@ class TestHeterodyne:
         xvar = xi.std() ** 2 + xr.std() ** 2
 
         assert np.allclose(np.sqrt(xvar), np.sqrt(0.5), atol=std_10 + tol, rtol=0)
+
+    def test_shots(self, setup_backend, tol):
+        """Test heterodyne draws all the shots in a single call with the correct
+        coherent mean and standard deviation, and resets the mode to vacuum"""
+        backend = setup_backend(1)
+        backend.prepare_coherent_state(disp_val, 0)
+        x = backend.measure_heterodyne(0, shots=n_meas)
+
+        assert x.shape == (n_meas,)
+        assert np.allclose(x.mean(), disp_val, atol=std_10 + tol, rtol=0)
+        xvar = x.real.std() ** 2 + x.imag.std() ** 2
+        assert np.allclose(np.sqrt(xvar), np.sqrt(0.5), atol=std_10 + tol, rtol=0)
+        assert np.all(backend.is_vacuum(tol))
+
+    def test_shots_not_supported(self, setup_backend):
+        """Test that post-selection and non-terminal measurements with several shots are refused"""
+        backend = setup_backend(1)
+        with pytest.raises(NotApplicableError, match="Post-selection"):
+            backend.measure_heterodyne(0, select=0.1, shots=10)
+        with pytest.raises(NotApplicableError, match="terminal"):
+            backend.measure_heterodyne(0, shots=10, terminal=False)
@@ -13,8 +13,12 @@
 # limitations under the License.
 
 r"""Unit tests for homodyne measurements."""
+import pytest
+
 import numpy as np
 
+from strawberryfields.backends.base import NotApplicableError
+
 
 N_MEAS = 300  # number of homodyne measurements to perform
 NUM_STDS = 10.0
@@ -70,3 +74,78 @@ class TestRepresentationIndependent:
             x = np.append(x, meas_result)
 
         assert np.allclose(x.mean(), 2 * alpha.real, atol=std_10 + tol)
+
+
+@pytest.mark.backends("gaussian", "fock")
+class TestShots:
+    """Tests for homodyne measurements drawing several shots at once."""
+
+    def test_mean_and_std_vacuum(self, setup_backend, tol):
+        """Tests that a single call with many shots samples the vacuum
+        quadrature distribution, and resets the mode to vacuum"""
+        backend = setup_backend(1)
+        x = backend.measure_homodyne(0, 0, shots=N_MEAS)
+
+        assert x.shape == (N_MEAS,)
+        assert np.allclose(x.mean(), 0.0, atol=std_10 + tol, rtol=0)
+        assert np.allclose(x.std(), 1.0, atol=std_10 + tol, rtol=0)
+        assert np.all(backend.is_vacuum(tol))
+
+    @pytest.mark.backends("gaussian")
+    def test_mean_and_std_squeezed(self, setup_backend, tol):
+        """Tests that the shots are drawn from the rotated quadrature of a
+        squeezed coherent state"""
+        r = 0.5
+        alpha = 1.0 + 1.0j
+        backend = setup_backend(1)
+        backend.prepare_coherent_state(alpha, 0)
+        backend.squeeze(r, 0)
+        x = backend.measure_homodyne(np.pi / 2, 0, shots=N_MEAS)
+
+        assert np.allclose(x.std(), np.exp(r), atol=NUM_STDS * np.exp(r) / np.sqrt(N_MEAS) + tol, rtol=0)
+        assert np.allclose(x.mean(), 2 * alpha.imag * np.exp(r), atol=NUM_STDS * np.exp(r) / np.sqrt(N_MEAS) + tol, rtol=0)
+
+    @pytest.mark.backends("gaussian")
+    def test_mode_reset_vacuum(self, setup_backend, tol):
+        """Tests that only the measured mode is reset to the vacuum, without
+        conditioning the other mode"""
+        backend = setup_backend(2)
+        backend.prepare_coherent_state(0.5, 1)
+        backend.squeeze(0.3, 0)
+        backend.beamsplitter(1 / np.sqrt(2), 1 / np.sqrt(2), 0, 1)
+        before = backend.state([1])
+        backend.measure_homodyne(0, 0, shots=5)
+        after = backend.state()
+
+        assert np.allclose(after.reduced_gaussian([0])[1], np.identity(2) * after.hbar / 2, atol=tol)
+        assert np.allclose(after.reduced_gaussian([1])[0], before.means(), atol=tol)
+        assert np.allclose(after.reduced_gaussian([1])[1], before.cov(), atol=tol)
+
+    @pytest.mark.backends("fock")
+    def test_mode_reset_vacuum_fock(self, setup_backend, tol):
+        """Tests that only the measured mode is reset to the vacuum in the Fock backend,
+        and that a measured single-mode pure state remains pure"""
+        backend = setup_backend(2)
+        backend.prepare_coherent_state(0.5, 1)
+        backend.squeeze(0.3, 0)
+        backend.beamsplitter(1 / np.sqrt(2), 1 / np.sqrt(2), 0, 1)
+        before = backend.state().reduced_dm(1)
+        backend.measure_homodyne(0, 0, shots=5)
+        after = backend.state()
+
+        assert np.allclose(after.reduced_dm(1), before, atol=tol, rtol=0)
+        assert np.allclose(after.reduced_dm(0)[0, 0], after.trace(), atol=tol, rtol=0)
+
+        backend = setup_backend(1)
+        backend.displacement(0.3, 0)
+        backend.measure_homodyne(0, 0, shots=5)
+        assert backend.state().is_pure
+        assert np.all(backend.is_vacuum(tol))
+
+    def test_shots_not_supported(self, setup_backend):
+        """Tests that post-selection and non-terminal measurements with several shots are refused"""
+        backend = setup_backend(1)
+        with pytest.raises(NotApplicableError, match="Post-selection"):
+            backend.measure_homodyne(0, 0, select=0.1, shots=10)
+        with pytest.raises(NotApplicableError, match="terminal"):
+            backend.measure_homodyne(0, 0, shots=10, terminal=False)
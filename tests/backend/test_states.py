@@ -19,6 +19,7 @@ from scipy.special import factorial as fac
 
 from strawberryfields import backends
 from strawberryfields import utils
+from strawberryfields.backends.states import BaseFockState
 
 
 a = 0.3 + 0.1j
@@ -51,6 +52,24 @@ class TestBackendStateCreation:
         assert state.mode_names == {0: "q[0]", 1: "q[2]"}
         assert state.mode_indices == {"q[0]": 0, "q[2]": 1}
 
+    @pytest.mark.backends("fock")
+    def test_reduced_state_purity(self, setup_backend, pure, tol):
+        """Test the reduced state of an entangled state is mixed, and that the state
+        of all modes in a different order keeps the representation of the full state"""
+        backend = setup_backend(2)
+        backend.reset(pure=pure)
+        backend.squeeze(r, 0)
+        backend.beamsplitter(1 / np.sqrt(2), 1 / np.sqrt(2), 0, 1)
+        full = backend.state()
+
+        state = backend.state(modes=[1])
+        assert not state.is_pure
+        assert np.allclose(state.dm(), np.einsum("iijk->jk", full.dm()), atol=tol, rtol=0)
+
+        swapped = backend.state(modes=[1, 0])
+        assert swapped.is_pure == pure
+        assert np.allclose(swapped.dm(), np.transpose(full.dm(), [2, 3, 0, 1]), atol=tol, rtol=0)
+
     def test_reduced_state_fidelity(self, setup_backend, tol):
         """Test backend calculates correct fidelity of reduced coherent state"""
         backend = setup_backend(2)
@@ -195,6 +214,75 @@ class TestBaseFockKetDensityMatrix:
         assert np.allclose(ket, expected, atol=tol, rtol=0)
 
 
+@pytest.mark.backends("fock")
+class TestBaseFockLazyQuantities:
+    """Tests for the derived quantities of Fock states, which are computed on
+    demand and memoised."""
+
+    def entangled_state(self, backend):
+        """Returns the state of three entangled modes"""
+        backend.squeeze(r, 0)
+        backend.displacement(a, 1)
+        backend.beamsplitter(1 / np.sqrt(2), 1 / np.sqrt(2), 0, 1)
+        backend.beamsplitter(1 / np.sqrt(2), 1 / np.sqrt(2), 1, 2)
+        return backend.state()
+
+    def test_pure_matches_mixed(self, setup_backend, pure, tol):
+        """Test that the quantities computed from the ket agree with the ones
+        computed from the density matrix, without forming the density matrix"""
+        backend = setup_backend(3)
+        backend.reset(pure=pure)
+        state = self.entangled_state(backend)
+        mixed = BaseFockState(state.dm(), 3, False, state.cutoff_dim, state.hbar)
+        state = BaseFockState(state.data, 3, pure, state.cutoff_dim, state.hbar)
+
+        assert np.allclose(state.all_fock_probs(), mixed.all_fock_probs(), atol=tol, rtol=0)
+        assert np.allclose(state.reduced_dm([0, 2]), mixed.reduced_dm([0, 2]), atol=tol, rtol=0)
+        assert np.allclose(state.reduced_dm(1), mixed.reduced_dm(1), atol=tol, rtol=0)
+        assert np.allclose(state.mean_photon(2), mixed.mean_photon(2), atol=tol, rtol=0)
+        alpha = [0.1, a, 0.2j]
+        assert np.allclose(state.fidelity_coherent(alpha), mixed.fidelity_coherent(alpha), atol=tol, rtol=0)
+        vac = np.identity(state.cutoff_dim)[0]
+        assert np.allclose(state.fidelity(vac, 1), mixed.fidelity(vac, 1), atol=tol, rtol=0)
+
+        if pure:
+            assert "dm" not in state._cache
+
+    def test_memoised(self, setup_backend):
+        """Test that derived quantities are computed once and memoised read-only"""
+        backend = setup_backend(3)
+        state = self.entangled_state(backend)
+
+        probs = state._all_fock_probs()
+        assert state._all_fock_probs() is probs
+        assert state._reduced_dm([1]) is state._reduced_dm(1)
+        assert state._dm() is state._dm()
+
+        with pytest.raises(ValueError, match="read-only"):
+            probs[0, 0, 0] = 1
+
+    def test_public_results_writable(self, setup_backend, tol):
+        """Test that the public accessors return copies that can be modified
+        without affecting the memoised quantities"""
+        backend = setup_backend(3)
+        state = self.entangled_state(backend)
+        rho = state.reduced_dm(1)
+        probs = state.all_fock_probs()
+        results = [state.reduced_dm(1), state.all_fock_probs()]
+        if state.is_pure:
+            # the density matrix of a mixed state is the state data itself
+            dm = state.dm()
+            results.append(state.dm())
+
+        for res in results:
+            res[(0,) * res.ndim] = 7
+
+        assert np.allclose(state.reduced_dm(1), rho, atol=tol, rtol=0)
+        assert np.allclose(state.all_fock_probs(), probs, atol=tol, rtol=0)
+        if state.is_pure:
+            assert np.allclose(state.dm(), dm, atol=tol, rtol=0)
+
+
 @pytest.mark.backends("gaussian")
 class TestBaseGaussianMethods:
     """This tests state methods unique to the BaseGaussian
@@ -123,3 +123,44 @@ class TestAllFockProbs:
             for m in range(cutoff):
                 probs = state.all_fock_probs().flatten()
                 assert np.allclose(probs, ref_probs, atol=tol, rtol=0)
+
+
+@pytest.mark.parametrize("a", MAG_ALPHAS)
+@pytest.mark.parametrize("phi", PHASE_ALPHAS)
+@pytest.mark.backends("gaussian")
+class TestGaussianAllFockProbs:
+    """Tests for the all_fock_probs method of Gaussian states"""
+
+    def test_two_mode_coherent(self, a, phi, setup_backend, cutoff, tol):
+        """Tests that the probabilities in the full Fock basis are
+        correct for a two-mode coherent state."""
+        backend = setup_backend(2)
+
+        alpha = a * np.exp(1j * phi)
+        n = np.arange(cutoff)
+        ref_state1 = np.exp(-0.5 * np.abs(alpha) ** 2) * alpha ** n / np.sqrt(fac(n))
+        ref_state2 = np.exp(-0.5 * np.abs(alpha) ** 2) * (-alpha) ** n / np.sqrt(fac(n))
+        ref_probs = np.abs(np.outer(ref_state1, ref_state2)) ** 2
+
+        backend.prepare_coherent_state(alpha, 0)
+        backend.prepare_coherent_state(-alpha, 1)
+        state = backend.state()
+
+        probs = state.all_fock_probs(cutoff=cutoff)
+        assert np.allclose(probs, ref_probs, atol=tol, rtol=0)
+
+    def test_agrees_with_fock_prob(self, a, phi, setup_backend, tol):
+        """Tests that the probabilities in the full Fock basis agree with
+        the individual probabilities for a squeezed mixed state."""
+        backend = setup_backend(2)
+
+        backend.prepare_thermal_state(0.2, 0)
+        backend.squeeze(0.4 * np.exp(1j * phi), 0)
+        backend.displacement(a, 1)
+        backend.beamsplitter(np.cos(0.3), np.sin(0.3), 0, 1)
+        state = backend.state()
+
+        cutoff = 5
+        probs = state.all_fock_probs(cutoff=cutoff)
+        for n in np.ndindex(*probs.shape):
+            assert np.allclose(probs[n], state.fock_prob(list(n), cutoff=2*cutoff), atol=tol, rtol=0)
@@ -141,6 +141,63 @@ class TestProgram:
         assert res == ["Run 0:"] + expected
 
 
+class TestFreeParameters:
+    """Tests the free parameters of a Program."""
+
+    def test_params(self, prog):
+        """Free parameters are created once per name."""
+        x, y = prog.params('x', 'y')
+        assert prog.params('x') is x
+        assert prog.free_params == {'x': x, 'y': y}
+
+        with prog.context as q:
+            ops.Dgate(x) | q[0]
+        prog.lock()
+        with pytest.raises(program.CircuitError, match="no more free parameters"):
+            prog.params('z')
+
+    def test_bind_params(self, prog):
+        """Values can only be bound to existing free parameters."""
+        x = prog.params('x')
+        prog.bind_params({'x': 0.4})
+        assert x.val == 0.4
+        with pytest.raises(program.CircuitError, match="no free parameter named 'y'"):
+            prog.bind_params({'y': 0.1})
+
+    def test_compile_symbolic(self, prog):
+        """Free parameters stay symbolic through compilation and optimization."""
+        x = prog.params('x')
+        with prog.context as q:
+            ops.Sgate(x) | q[0]
+            ops.Sgate(2 * x) | q[0]
+            ops.Rgate(-x) | q[1]
+            ops.Rgate(x) | q[1]
+
+        res = []
+        prog.compile('gaussian').print(lambda c: res.append(str(c)))
+        assert res == ['Sgate(({x}+(2*{x})), 0) | (q[0])', 'Rgate((-{x}+{x})) | (q[1])']
+
+    def test_compile_cache(self, prog):
+        """Compiled programs are cached for the same arguments and circuit."""
+        with prog.context as q:
+            ops.Dgate(prog.params('x')) | q[0]
+
+        compiled = prog.compile('gaussian')
+        assert prog.compile('gaussian') is compiled
+        assert prog.compile('gaussian', optimize=False) is not compiled
+        assert prog.compile('fock') is not compiled
+
+        prog.locked = False
+        with prog.context as q:
+            ops.Sgate(0.1) | q[1]
+        recompiled = prog.compile('gaussian')
+        assert len(recompiled) == 2
+
+        # only the latest compiled version is kept for each set of arguments
+        assert len(prog._compile_cache) == 3
+        assert prog._compile_cache['gaussian', True][1] is recompiled
+
+
 class TestRegRefs:
     """Testing register references."""
 
@@ -251,6 +308,23 @@ class TestEngine:
         eng.run(p2)
         assert len(eng.run_progs) == 1
 
+    def test_run_args(self, eng, prog):
+        """Binding values to free parameters does not recompile the program."""
+        x = prog.params('x')
+        with prog.context as q:
+            ops.Dgate(x) | q[0]
+
+        eng.run(prog, args={'x': 0.1})
+        compiled = eng.run_progs[-1]
+        assert x.val == 0.1
+        eng.reset()
+        eng.run(prog, args={'x': 0.2})
+        assert eng.run_progs[-1] is compiled
+        assert x.val == 0.2
+
+        with pytest.raises(program.CircuitError, match="Unknown free parameters: y"):
+            eng.run(prog, args={'x': 0.1, 'y': 0.2})
+
     def test_regref_mismatch(self, eng):
         """Running incompatible programs sequentially gives an error."""
         p1 = sf.Program(3)
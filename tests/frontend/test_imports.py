@@ -0,0 +1,63 @@
+# Copyright 2019 Xanadu Quantum Technologies Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+r"""Unit tests for the lazy import of TensorFlow"""
+import subprocess
+import sys
+
+import pytest
+
+pytestmark = pytest.mark.frontend
+
+
+# the test suite itself imports TensorFlow, so the checks run in a fresh interpreter
+GAUSSIAN_RUN = """
+import sys
+import strawberryfields as sf
+from strawberryfields import ops
+from strawberryfields.parameters import sin
+
+assert "tensorflow" not in sys.modules, "imported by strawberryfields"
+
+prog = sf.Program(2)
+with prog.context as q:
+    ops.Sgate(sin(0.3)) | q[0]
+    ops.BSgate(0.4) | q
+    ops.MeasureX | q[0]
+    ops.Dgate(q[0]) | q[1]
+
+eng = sf.Engine("gaussian")
+eng.run(prog).reduced_gaussian([1])
+
+assert "tensorflow" not in sys.modules, "imported by a Gaussian run"
+"""
+
+
+def run_python(code):
+    """Runs code in a new Python interpreter, and returns the completed process."""
+    return subprocess.run([sys.executable, "-c", code], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+
+def test_gaussian_run_without_tensorflow():
+    """Test that importing Strawberry Fields and running a program on the Gaussian
+    backend, including measurement-dependent parameters, does not import TensorFlow"""
+    res = run_python(GAUSSIAN_RUN)
+    assert res.returncode == 0, res.stderr.decode()
+
+
+def test_tf_backend_attribute():
+    """Test that accessing the TensorFlow backend class imports it on demand"""
+    code = "import strawberryfields.backends as b; print(b.TFBackend.__name__)"
+    res = run_python(code)
+    assert res.returncode == 0, res.stderr.decode()
+    assert res.stdout.decode().strip() == "TFBackend"
@@ -21,7 +21,7 @@ import tensorflow as tf
 
 import strawberryfields as sf
 from strawberryfields import ops
-from strawberryfields.parameters import Parameter
+from strawberryfields.parameters import Parameter, FreeParameter
 
 # make test deterministic
 np.random.random(32)
@@ -121,5 +121,37 @@ def test_parameter_unary_negation(p):
     assert isinstance(-p, Parameter)
 
 
+def test_free_parameter_arithmetic():
+    """Test that arithmetic and math functions on free parameters are deferred until
+    a value is bound"""
+    x = FreeParameter("x")
+    p = Parameter(x)
+    expr = [p + 1, 2 - p, p * 3, p / 4, p ** 2, -p, 2 ** p, Parameter(np.sin(x)), sf.parameters.cos(p)]
+
+    for e in expr:
+        assert isinstance(e, Parameter)
+    assert str(p + 1) == "({x}+1)"
+
+    x.val = 0.3
+    values = [e.evaluate().x for e in expr]
+    assert np.allclose(values, [1.3, 1.7, 0.9, 0.075, 0.09, -0.3, 2 ** 0.3, np.sin(0.3), np.cos(0.3)])
+
+
+def test_free_parameter_unbound():
+    """Test that evaluating a free parameter before binding a value to it raises an error"""
+    p = Parameter(FreeParameter("x")) * 2
+    with pytest.raises(sf.program.CircuitError, match="No value has been bound"):
+        p.evaluate()
+
+
+def test_free_parameter_equality():
+    """Test that free parameters are only equal to themselves"""
+    x = FreeParameter("x")
+    assert Parameter(x) == Parameter(x)
+    assert not Parameter(x) == Parameter(FreeParameter("x"))
+    assert not Parameter(x) == 0
+    assert not Parameter(x + 1) == Parameter(x + 1)
+
+
 # TODO: This barely scratches the surface of the parameters.py module,
 # a lot more unit tests are needed.
@@ -21,6 +21,7 @@ import numpy as np
 import strawberryfields as sf
 
 from strawberryfields import ops
+from strawberryfields.utils import random_interferometer, random_symplectic
 
 # make test deterministic
 np.random.random(42)
@@ -127,3 +128,104 @@ def test_merge_incompatible():
 
     prog.optimize()
     assert len(prog) == 2
+
+
+# all two-mode gates with at least one parameter
+two_mode_gates = [x for x in ops.one_args_gates + ops.two_args_gates if x.ns == 2]
+
+
+@pytest.mark.parametrize("G", two_mode_gates)
+def test_merge_dagger_two_modes(G):
+    """Optimizer merging two-mode gates with their daggered versions,
+    with gates on other modes between them."""
+    prog = sf.Program(3)
+    G = G(A)
+
+    with prog.context:
+        G | (0, 1)
+        ops.Dgate(A) | 2
+        G.H | (0, 1)
+
+    prog.optimize()
+    assert len(prog) == 1
+
+
+@pytest.mark.parametrize("G", two_mode_gates)
+def test_merge_two_modes(G):
+    """Optimizer merging consecutive two-mode gates acting on the same modes."""
+    prog = sf.Program(2)
+
+    with prog.context:
+        G(A) | (0, 1)
+        G(A) | (0, 1)
+        G(A) | (0, 1)
+
+    prog.optimize()
+    assert len(prog) == 1
+    assert np.allclose(prog.circuit[0].op.p[0].x, 3 * A)
+
+
+def test_merge_two_modes_blocked():
+    """Two-mode gates are not merged if something acts on one of the modes between them,
+    or if they act on the modes in a different order."""
+    prog = sf.Program(2)
+
+    with prog.context:
+        ops.BSgate(A) | (0, 1)
+        ops.Rgate(A) | 1
+        ops.BSgate(A) | (0, 1)
+        ops.BSgate(A) | (1, 0)
+
+    prog.optimize()
+    assert len(prog) == 4
+
+
+def test_merge_cascade_two_modes():
+    """Cancelling single-mode gates makes the two-mode gates around them neighbors."""
+    prog = sf.Program(2)
+
+    with prog.context:
+        ops.CXgate(A) | (0, 1)
+        ops.Rgate(A) | 1
+        ops.Rgate(-A) | 1
+        ops.CXgate(-A) | (0, 1)
+
+    prog.optimize()
+    assert len(prog) == 0
+
+
+def test_fuse_interferometers():
+    """Consecutive interferometers and Gaussian transformations are fused before they are decomposed."""
+    U1 = random_interferometer(3)
+    U2 = random_interferometer(3)
+    S = random_symplectic(3)
+    prog = sf.Program(3)
+
+    with prog.context as q:
+        ops.Interferometer(U1) | q
+        ops.Interferometer(U2) | q
+        ops.Interferometer(U2.conj().T) | q
+        ops.GaussianTransform(S) | q
+
+    compiled = prog.compile('gaussian', optimize=False)
+    assert len(prog.compile('gaussian')) < len(compiled)
+
+    prog.optimize()
+    assert len(prog) == 1
+    op = prog.circuit[0].op
+    assert isinstance(op, ops.GaussianTransform)
+    O1 = np.block([[U1.real, -U1.imag], [U1.imag, U1.real]])
+    assert np.allclose(op.p[0].x, S @ O1)
+
+
+def test_graph_embed_not_merged():
+    """Graph embeddings are not merged, since adjacency matrices do not compose."""
+    A1 = np.array([[0, 1], [1, 0]])
+    prog = sf.Program(2)
+
+    with prog.context as q:
+        ops.GraphEmbed(A1) | q
+        ops.GraphEmbed(A1) | q
+
+    prog.optimize()
+    assert len(prog) == 2
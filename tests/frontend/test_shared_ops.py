@@ -136,6 +136,83 @@ class TestBeamsplitterFactors:
         assert np.allclose(factors_idx, BS_4_IDX, atol=tol, rtol=0)
 
 
+class TestFactorCache:
+    """Tests for the memory-mapped factor cache"""
+
+    def test_cache_dir_precedence(self, tmpdir, monkeypatch):
+        """test the cache directory argument overrides the environment variable,
+        and that there is no disk cache by default"""
+        monkeypatch.delenv(so.FACTOR_CACHE_ENV, raising=False)
+        assert so.factor_cache_dir() is None
+
+        monkeypatch.setenv(so.FACTOR_CACHE_ENV, str(tmpdir.join("env")))
+        assert so.factor_cache_dir() == str(tmpdir.join("env"))
+        assert so.factor_cache_dir(str(tmpdir)) == str(tmpdir)
+
+    def test_in_memory_by_default(self, tmpdir, monkeypatch):
+        """test the factors are only cached in memory if no cache directory is configured"""
+        monkeypatch.delenv(so.FACTOR_CACHE_ENV, raising=False)
+        monkeypatch.setenv("HOME", str(tmpdir))
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmpdir))
+        factors = so.cached_bs_factors(4)
+
+        assert not isinstance(factors, np.memmap)
+        assert not factors.flags.writeable
+        assert np.array_equal(factors, so.generate_bs_factors(4))
+        assert so.cached_bs_factors(4) is factors
+        assert not tmpdir.listdir()
+
+    def test_env_read_at_call_time(self, tmpdir, monkeypatch):
+        """test the environment variable is read at every call"""
+        monkeypatch.delenv(so.FACTOR_CACHE_ENV, raising=False)
+        so.cached_squeeze_factors(4)
+
+        monkeypatch.setenv(so.FACTOR_CACHE_ENV, str(tmpdir))
+        factors = so.cached_squeeze_factors(4)
+
+        filename = "fock_squeeze_factors_v{}_4.npy".format(so.FACTOR_CACHE_VERSION)
+        assert tmpdir.join(filename).check()
+        assert isinstance(factors, np.memmap)
+
+    @pytest.mark.parametrize("D", [4, 7, 12])
+    def test_bs_factors(self, D, tmpdir):
+        """test the cached beamsplitter factors are memory-mapped, versioned,
+        and agree with the generated factors"""
+        directory = str(tmpdir.join("cache"))
+        factors = so.cached_bs_factors(D, directory)
+
+        filename = "fock_beamsplitter_factors_v{}_{}.npy".format(so.FACTOR_CACHE_VERSION, D)
+        assert tmpdir.join("cache", filename).check()
+        assert isinstance(factors, np.memmap)
+        assert not factors.flags.writeable
+        assert np.array_equal(factors, so.generate_bs_factors(D))
+
+    def test_squeeze_factors(self, tmpdir, tol):
+        """test the cached squeezing factors agree with the generated factors"""
+        factors = so.cached_squeeze_factors(4, str(tmpdir))
+        assert isinstance(factors, np.memmap)
+        assert np.allclose(factors, SQUEEZE_FACTOR_4, atol=tol, rtol=0)
+
+    def test_reuses_cache_file(self, tmpdir, monkeypatch):
+        """test an existing cache entry is loaded rather than regenerated"""
+        directory = str(tmpdir)
+        so._cached_factors("beamsplitter", 4, so.generate_bs_factors, directory)
+
+        def fail(D):
+            raise AssertionError("factors were regenerated")
+
+        factors = so._cached_factors("beamsplitter", 4, fail, directory)
+        assert np.array_equal(factors, so.generate_bs_factors(4))
+        assert not [f for f in tmpdir.listdir() if f.ext == ".tmp"]
+
+    def test_unwritable_directory(self, tmpdir):
+        """test the factors are still returned if the cache cannot be written"""
+        blocker = tmpdir.join("file")
+        blocker.write("")
+        factors = so._cached_factors("beamsplitter", 4, so.generate_bs_factors, str(blocker.join("cache")))
+        assert np.array_equal(factors, so.generate_bs_factors(4))
+
+
 class TestSqueezingFactors:
     """Tests for the squeezing prefactors"""
 
@@ -97,6 +97,53 @@ class TestGaussianBackendDecompositions:
         state = eng.run(prog)
         assert np.allclose(state.cov(), S @ S.T * hbar / 2, atol=tol)
 
+    def test_fused_transforms(self, setup_eng, hbar, tol):
+        """Test that fusing consecutive interferometers and Gaussian transforms
+        in the optimizer does not change the resulting state"""
+        eng, prog = setup_eng(3)
+
+        with prog.context as q:
+            ops.Sgate(0.2) | q[0]
+            ops.Sgate(0.3) | q[2]
+            ops.Interferometer(u1) | q
+            ops.GaussianTransform(S) | q
+            ops.Interferometer(u2) | q
+            ops.BSgate(0.4, 0.1) | (q[0], q[2])
+            ops.BSgate(0.2, 0.1) | (q[0], q[2])
+
+        state = eng.run(prog)
+        expected = sf.Engine("gaussian", hbar=hbar).run(prog.compile("gaussian", optimize=False), compile=False)
+        assert len(eng.run_progs[-1]) < len(prog.compile("gaussian", optimize=False))
+        assert np.allclose(state.cov(), expected.cov(), atol=tol, rtol=0)
+        assert np.allclose(state.means(), expected.means(), atol=tol, rtol=0)
+
+    def test_optimized_random_circuits(self, setup_eng, hbar, tol):
+        """Test that optimizing random multimode circuits with non-zero phases
+        does not change the resulting state"""
+        eng, _ = setup_eng(3)
+        rng = np.random.RandomState(7)
+        single = [ops.Sgate, ops.Dgate, ops.Rgate]
+        two = [ops.BSgate, ops.S2gate, ops.CXgate]
+
+        for _ in range(30):
+            prog = sf.Program(3)
+            with prog.context as q:
+                for _ in range(8):
+                    G = [single, two][rng.randint(2)][rng.randint(3)]
+                    par = rng.uniform(-1, 1, size=2) * [0.3, np.pi]
+                    G = G(*par[: 1 if G in (ops.Rgate, ops.CXgate) else 2])
+                    if rng.randint(2):
+                        G = G.H
+                    if G.ns == 1:
+                        G | q[rng.randint(3)]
+                    else:
+                        G | [q[i] for i in rng.choice(3, size=2, replace=False)]
+
+            state = sf.Engine("gaussian", hbar=hbar).run(prog.compile("gaussian"), compile=False)
+            expected = sf.Engine("gaussian", hbar=hbar).run(prog.compile("gaussian", optimize=False), compile=False)
+            assert np.allclose(state.cov(), expected.cov(), atol=tol, rtol=0)
+            assert np.allclose(state.means(), expected.means(), atol=tol, rtol=0)
+
     def test_graph_embed(self, setup_eng, tol):
         """Test that embedding a traceless adjacency matrix A
         results in the property Amat/A = c J, where c is a real constant,
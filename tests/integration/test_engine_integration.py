@@ -233,3 +233,196 @@ class TestProperExecution:
 
         state4 = eng.run(p2)
         assert state3 == state4
+
+
+@pytest.mark.backends("gaussian", "fock")
+class TestExecutionPlan:
+    """Tests for the execution plans of programs"""
+
+    def test_plan_reused(self, setup_eng, tol):
+        """Test that the execution plan of a program is reused after a reset,
+        and that running it gives the same state as applying the operations"""
+        eng, prog = setup_eng(2)
+        with prog.context as q:
+            ops.Coherent(a, b) | q[0]
+            ops.Sgate(c) | q[1]
+            ops.BSgate(a, b) | q
+            ops.Rgate(0) | q[0]
+            ops.Dgate(b).H | q[1]
+            ops.LossChannel(0.8) | q[0]
+
+        state1 = eng.run(prog)
+        compiled = eng.run_progs[-1]
+        plan = eng._plans[compiled]
+        # each command is lowered into at most one backend call
+        assert all(len(calls) <= 1 for _, calls in plan[1])
+
+        eng.reset()
+        state2 = eng.run(prog)
+        assert eng._plans[compiled] is plan
+        assert state1 == state2
+
+        eng.reset()
+        for cmd in compiled.circuit:
+            cmd.op.apply(cmd.reg, eng.backend, hbar=eng.hbar)
+        assert eng.backend.state() == state1
+
+    def test_measurement_dependence(self, setup_eng, tol):
+        """Test that operations depending on measurement results are applied at run time"""
+        eng, prog = setup_eng(2)
+        with prog.context as q:
+            ops.Dgate(a) | q[0]
+            ops.MeasureX | q[0]
+            ops.Dgate(ops.RR(q[0], lambda x: 0.1 * x)) | q[1]
+
+        for _ in range(2):
+            state = eng.run(prog)
+            x = q[0].val
+            assert np.allclose(state.quad_expectation(1)[0], 0.1 * x * np.sqrt(2 * eng.hbar), atol=tol, rtol=0)
+            eng.reset()
+
+    @pytest.mark.backends("gaussian")
+    def test_not_applicable(self, setup_eng):
+        """Test that an operation the backend cannot apply raises an error before the program is run"""
+        eng, prog = setup_eng(1)
+        with prog.context as q:
+            ops.Dgate(a) | q[0]
+            ops.Kgate(a) | q[0]
+
+        with pytest.raises(sf.backends.base.NotApplicableError, match="cannot be used with"):
+            eng.run(prog, compile=False)
+
+
+@pytest.mark.backends("gaussian", "fock")
+class TestFreeParameters:
+    """Tests for programs with free parameters"""
+
+    @staticmethod
+    def circuit(prog, r, phi):
+        """Builds a circuit on the given program"""
+        with prog.context as q:
+            ops.Sgate(r) | q[0]
+            ops.Sgate(r / 2, phi) | q[0]
+            ops.Pgate(np.sin(phi)) | q[1]
+            ops.BSgate(phi, 2 * r) | q
+            ops.CXgate(r + phi) | q
+        return prog
+
+    def test_matches_numeric_program(self, setup_eng, tol):
+        """Test that running a program with free parameters is equivalent
+        to running the program with the values inserted"""
+        eng, _ = setup_eng(2)
+        prog = sf.Program(2)
+        self.circuit(prog, *prog.params("r", "phi"))
+
+        for r, phi in [(0.1, 0.3), (0.2, -0.4)]:
+            state = eng.run(prog, args={"r": r, "phi": phi})
+            eng.reset()
+            expected = sf.Engine(eng.backend_name, **eng.kwargs).run(self.circuit(sf.Program(2), r, phi))
+            assert np.allclose(state.mean_photon(1)[0], expected.mean_photon(1)[0], atol=tol, rtol=0)
+            assert np.allclose(state.quad_expectation(0)[0], expected.quad_expectation(0)[0], atol=tol, rtol=0)
+
+    def test_run_sweep_program(self, setup_eng, tol):
+        """Test that a program with free parameters can be used in a parameter sweep"""
+        eng, _ = setup_eng(2)
+        prog = sf.Program(2)
+        sweep_circuit(*prog.params("r", "phi"), prog=prog)
+        grid = [{"r": r, "phi": 0.7} for r in (0.1, 0.2, 0.3)]
+        res = list(eng.run_sweep(prog, grid, processes=2, observable=sweep_observable, seed=5))
+        expected = list(eng.run_sweep(sweep_circuit, grid, processes=1, observable=sweep_observable, seed=5))
+        assert np.allclose(res, expected, atol=tol, rtol=0)
+
+    def test_run_sweep_math_functions(self, setup_eng, tol):
+        """Test that programs using the math functions of the parameters module on
+        free parameters can be sent to worker processes"""
+        eng, _ = setup_eng(2)
+        prog = sf.Program(2)
+        r, phi = prog.params("r", "phi")
+        sweep_circuit(sf.parameters.sin(r), sf.parameters.sqrt(phi), prog=prog)
+        grid = [{"r": r, "phi": 0.7} for r in (0.1, 0.2)]
+        res = list(eng.run_sweep(prog, grid, processes=2, observable=sweep_observable, seed=5))
+
+        grid = [{"r": np.sin(p["r"]), "phi": np.sqrt(p["phi"])} for p in grid]
+        expected = list(eng.run_sweep(sweep_circuit, grid, processes=1, observable=sweep_observable, seed=5))
+        assert np.allclose(res, expected, atol=tol, rtol=0)
+
+
+def sweep_circuit(r, phi, prog=None):
+    """Program factory for the parameter sweep tests"""
+    if prog is None:
+        prog = sf.Program(2)
+    with prog.context as q:
+        ops.Sgate(r) | q[0]
+        ops.BSgate(phi) | q
+        ops.MeasureX | q[1]
+    return prog
+
+
+def sweep_observable(state):
+    """Observable for the parameter sweep tests"""
+    return state.mean_photon(0)[0]
+
+
+@pytest.mark.backends("gaussian", "fock")
+class TestRunSweep:
+    """Tests for parameter sweeps run in worker processes"""
+
+    grid = [{"r": r, "phi": phi} for r in np.linspace(0.1, 0.4, 4) for phi in (0.2, 0.7)]
+
+    def test_matches_run(self, setup_eng, tol):
+        """Test that the observables of a sweep are returned in order, and agree with
+        running the programs one at a time with the same seeds"""
+        eng, _ = setup_eng(2)
+        res = eng.run_sweep(sweep_circuit, self.grid, processes=2, chunksize=3, observable=sweep_observable, seed=3)
+        res = list(res)
+
+        expected = []
+        for index, point in enumerate(self.grid):
+            np.random.seed(np.random.SeedSequence([3, index]).generate_state(4))
+            state = sf.Engine(eng.backend_name, **eng.kwargs).run(sweep_circuit(**point))
+            expected.append(sweep_observable(state))
+
+        assert np.allclose(res, expected, atol=tol, rtol=0)
+
+    def test_states(self, setup_eng, tol):
+        """Test that the states are returned if no observable is given"""
+        eng, _ = setup_eng(2)
+        states = list(eng.run_sweep(sweep_circuit, self.grid[:3], processes=2, modes=[0], seed=1))
+        res = list(eng.run_sweep(sweep_circuit, self.grid[:3], processes=1, observable=sweep_observable, seed=1))
+
+        assert len(states) == 3
+        assert all(s.num_modes == 1 for s in states)
+        assert np.allclose([s.mean_photon(0)[0] for s in states], res, atol=tol, rtol=0)
+
+    def test_seeded(self, setup_eng):
+        """Test that seeded sweeps do not depend on the number of processes and the chunk size"""
+        eng, _ = setup_eng(2)
+        res1 = list(eng.run_sweep(sweep_circuit, self.grid, processes=1, seed=42, observable=sweep_observable))
+        res2 = list(eng.run_sweep(sweep_circuit, self.grid, processes=2, chunksize=2, seed=42, observable=sweep_observable))
+
+        # the measurement of mode 1 conditions mode 0, so the observables are random
+        assert np.allclose(res1, res2, atol=1e-12, rtol=0)
+        assert len(set(np.round(res1, 8))) == len(self.grid)
+
+    def test_unseeded(self, setup_eng):
+        """Test that unseeded sweeps do not repeat the random state of the parent process
+        in the workers"""
+        eng, _ = setup_eng(2)
+        grid = [{"r": 0.3, "phi": 0.7}] * 8
+        np.random.seed(7)
+        res1 = list(eng.run_sweep(sweep_circuit, grid, processes=2, observable=sweep_observable))
+        np.random.seed(7)
+        res2 = list(eng.run_sweep(sweep_circuit, grid, processes=2, observable=sweep_observable))
+
+        # identical points give different measurement results, also across sweeps
+        assert len(set(np.round(res1 + res2, 8))) == 2 * len(grid)
+
+    def test_lazy_grid(self, setup_eng):
+        """Test that the grid can be a generator, and that results are streamed"""
+        eng, _ = setup_eng(2)
+        grid = ({"r": 0.1, "phi": 0.1 * k} for k in range(1000))
+        res = eng.run_sweep(sweep_circuit, grid, processes=2, observable=sweep_observable)
+
+        first = [next(res) for _ in range(5)]
+        res.close()
+        assert len(first) == 5
@@ -17,6 +17,7 @@ import pytest
 import numpy as np
 
 from strawberryfields import ops
+from strawberryfields.backends.base import NotApplicableError
 
 
 class TestMeasurement:
@@ -40,6 +41,28 @@ class TestMeasurement:
         # Fock measurements put the modes into vacuum state
         assert np.all(eng.backend.is_vacuum(tol))
 
+    @pytest.mark.backends("fock")
+    def test_fock_measurement_shots(self, setup_eng, tol):
+        """Test Fock measurements with several shots return
+        the samples of each mode"""
+        shots = 50
+        eng, prog = setup_eng(3)
+
+        with prog.context as q:
+            ops.Fock(1) | q[0]
+            ops.BSgate() | (q[0], q[2])
+            ops.Fock(2) | q[1]
+            ops.Measure | q
+
+        eng.run(prog, shots=shots)
+        for r in q:
+            assert r.val.shape == (shots,)
+        assert np.all(q[0].val + q[2].val == 1)
+        assert np.all(q[1].val == 2)
+
+        # Fock measurements put the modes into vacuum state
+        assert np.all(eng.backend.is_vacuum(tol))
+
     @pytest.mark.backends("gaussian")
     def test_heterodyne(self, setup_eng, tol):
         """Test Fock measurements return expected results"""
@@ -57,6 +80,170 @@ class TestMeasurement:
         # Heterodyne measurements put the modes into vacuum state
         assert eng.backend.is_vacuum(tol)
 
+    @pytest.mark.backends("gaussian")
+    def test_dyne_measurement_shots(self, setup_eng, tol):
+        """Test homodyne and heterodyne measurements with several shots
+        return the samples of each mode"""
+        shots = 400
+        eng, prog = setup_eng(2)
+        a = [0.43 - 0.12j, 0.02 + 0.2j]
+
+        with prog.context as q:
+            ops.Coherent(a[0]) | q[0]
+            ops.Coherent(a[1]) | q[1]
+            ops.MeasureX | q[0]
+            ops.MeasureHD | q[1]
+
+        eng.run(prog, shots=shots)
+        assert q[0].val.shape == (shots,)
+        assert q[1].val.shape == (shots,)
+        atol = 10 / np.sqrt(shots)
+        assert np.allclose(q[0].val.mean(), np.sqrt(2 * eng.hbar) * a[0].real, atol=atol)
+        assert np.allclose(q[1].val.mean(), a[1], atol=atol)
+
+        # the measured modes are reset to the vacuum state
+        assert eng.backend.is_vacuum(tol)
+
+    @pytest.mark.backends("gaussian")
+    def test_gaussian_fock_measurement(self, setup_eng, tol):
+        """Test Fock measurements of a two-mode squeezed state
+        return equal photon numbers in both modes"""
+        eng, prog = setup_eng(2)
+
+        with prog.context as q:
+            ops.S2gate(0.5) | q
+            ops.Measure | q
+
+        eng.run(prog)
+        assert q[0].val == q[1].val
+
+        # Fock measurements put the modes into vacuum state
+        assert eng.backend.is_vacuum(tol)
+
+    @pytest.mark.backends("gaussian")
+    def test_gaussian_fock_measurement_shots(self, setup_eng):
+        """Test Fock measurements with several shots return
+        the samples of each mode"""
+        shots = 50
+        eng, prog = setup_eng(3)
+
+        with prog.context as q:
+            ops.S2gate(0.5) | (q[0], q[2])
+            ops.Measure | q
+
+        eng.run(prog, shots=shots)
+        for r in q:
+            assert r.val.shape == (shots,)
+        assert np.all(q[0].val == q[2].val)
+        assert np.all(q[1].val == 0)
+
+    @pytest.mark.backends("gaussian")
+    def test_threshold_measurement_shots(self, setup_eng, tol):
+        """Test threshold measurements of a two-mode squeezed state
+        return equal clicks in both modes"""
+        shots = 50
+        eng, prog = setup_eng(3)
+
+        with prog.context as q:
+            ops.S2gate(1) | (q[0], q[2])
+            ops.MeasureThreshold() | q
+
+        eng.run(prog, shots=shots)
+        for r in q:
+            assert r.val.shape == (shots,)
+            assert np.all((r.val == 0) | (r.val == 1))
+        assert np.all(q[0].val == q[2].val)
+        assert np.all(q[1].val == 0)
+
+        # threshold measurements put the modes into vacuum state
+        assert eng.backend.is_vacuum(tol)
+
+    @pytest.mark.backends("gaussian")
+    @pytest.mark.parametrize("meas", [ops.MeasureFock(), ops.MeasureThreshold()])
+    def test_gaussian_nonterminal_measurement(self, setup_eng, meas):
+        """Test that the Gaussian backend refuses Fock and threshold measurements
+        followed by operations acting on the measured modes"""
+        eng, prog = setup_eng(2)
+
+        with prog.context as q:
+            ops.S2gate(0.5) | q
+            meas | q[0]
+            ops.Dgate(0.1) | q[0]
+
+        with pytest.raises(NotApplicableError):
+            eng.run(prog)
+
+    @pytest.mark.backends("gaussian")
+    @pytest.mark.parametrize("meas", [ops.MeasureFock(), ops.MeasureThreshold()])
+    def test_gaussian_conditioned_measurement(self, setup_eng, meas):
+        """Test that the Gaussian backend refuses Fock and threshold measurements
+        whose results are used by later operations"""
+        eng, prog = setup_eng(2)
+
+        with prog.context as q:
+            ops.S2gate(0.5) | q
+            meas | q[0]
+            ops.Dgate(q[0]) | q[1]
+
+        with pytest.raises(NotApplicableError):
+            eng.run(prog)
+
+    @pytest.mark.backends("fock")
+    def test_fock_nonterminal_homodyne_shots(self, setup_eng):
+        """Test that the Fock backend refuses homodyne measurements with several shots
+        whose results are used by later operations"""
+        eng, prog = setup_eng(2)
+
+        with prog.context as q:
+            ops.Coherent(0.5) | q[0]
+            ops.MeasureX | q[0]
+            ops.Xgate(q[0]) | q[1]
+
+        with pytest.raises(NotApplicableError):
+            eng.run(prog, shots=3)
+
+    @pytest.mark.backends("gaussian")
+    @pytest.mark.parametrize("meas", [ops.MeasureHomodyne(0), ops.MeasureHeterodyne()])
+    def test_gaussian_nonterminal_dyne_shots(self, setup_eng, meas):
+        """Test that the Gaussian backend refuses homodyne and heterodyne measurements
+        with several shots whose results are used by later operations"""
+        eng, prog = setup_eng(2)
+
+        with prog.context as q:
+            ops.S2gate(0.5) | q
+            meas | q[0]
+            ops.Xgate(q[0]) | q[1]
+
+        with pytest.raises(NotApplicableError):
+            eng.run(prog, shots=3)
+
+    @pytest.mark.backends("fock")
+    def test_fock_nonterminal_shots(self, setup_eng):
+        """Test that the Fock backend refuses Fock measurements with several shots
+        whose results are used by later operations"""
+        eng, prog = setup_eng(2)
+
+        with prog.context as q:
+            ops.Coherent(0.5) | q[0]
+            ops.MeasureFock() | q[0]
+            ops.Dgate(q[0]) | q[1]
+
+        with pytest.raises(NotApplicableError):
+            eng.run(prog, shots=3)
+
+    @pytest.mark.backends("gaussian")
+    def test_gaussian_measurement_other_modes(self, setup_eng, tol):
+        """Test that Fock measurements followed by operations on other modes are terminal"""
+        eng, prog = setup_eng(2)
+
+        with prog.context as q:
+            ops.MeasureFock() | q[0]
+            ops.Dgate(0.1) | q[1]
+
+        eng.run(prog)
+        assert q[0].val == 0
+        assert np.allclose(eng.backend.state().displacement(), [0, 0.1], atol=tol, rtol=0)
+
 
 class TestPostselection:
     """Measurement tests that include post-selection"""
@@ -92,6 +279,60 @@ class TestPostselection:
         eng.run(prog)
         assert np.allclose(q[0].val, alpha, atol=tol, rtol=0)
 
+    @pytest.mark.backends("gaussian")
+    @pytest.mark.parametrize("meas", [ops.MeasureFock(select=[1]), ops.MeasureThreshold(select=[1])])
+    def test_gaussian_not_supported(self, setup_eng, meas):
+        """Test that the Gaussian backend refuses post-selected Fock and threshold
+        measurements instead of trying to decompose them"""
+        eng, prog = setup_eng(1)
+
+        with prog.context as q:
+            ops.Sgate(0.5) | q[0]
+            meas | q[0]
+
+        with pytest.raises(NotApplicableError):
+            eng.run(prog)
+
+    @pytest.mark.backends("gaussian")
+    @pytest.mark.parametrize("meas", [ops.MeasureHomodyne(0, select=0.1), ops.MeasureHeterodyne(select=0.1)])
+    def test_gaussian_dyne_shots_not_supported(self, setup_eng, meas):
+        """Test that the Gaussian backend refuses post-selected homodyne and heterodyne
+        measurements with several shots instead of trying to decompose them"""
+        eng, prog = setup_eng(1)
+
+        with prog.context as q:
+            ops.Sgate(0.5) | q[0]
+            meas | q[0]
+
+        with pytest.raises(NotApplicableError):
+            eng.run(prog, shots=3)
+
+    @pytest.mark.backends("fock")
+    def test_fock_homodyne_shots_not_supported(self, setup_eng):
+        """Test that the Fock backend refuses post-selected homodyne measurements
+        with several shots instead of trying to decompose them"""
+        eng, prog = setup_eng(1)
+
+        with prog.context as q:
+            ops.Coherent(0.5) | q[0]
+            ops.MeasureHomodyne(0, select=0.1) | q[0]
+
+        with pytest.raises(NotApplicableError):
+            eng.run(prog, shots=3)
+
+    @pytest.mark.backends("fock")
+    def test_fock_shots_not_supported(self, setup_eng):
+        """Test that the Fock backend refuses post-selected Fock measurements
+        with several shots instead of trying to decompose them"""
+        eng, prog = setup_eng(1)
+
+        with prog.context as q:
+            ops.Coherent(0.5) | q[0]
+            ops.MeasureFock(select=[0]) | q[0]
+
+        with pytest.raises(NotApplicableError):
+            eng.run(prog, shots=3)
+
     @pytest.mark.backends("fock", "tf")
     def test_measure_fock(self, setup_eng, cutoff, batch_size):
         """Test that Fock post-selection on Fock states